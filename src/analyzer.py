@@ -7,13 +7,7 @@ import sys
 import json
 import logging
 from datetime import datetime
-from dotenv import load_dotenv
-from typing import Dict
-
-from feed_collector import FeedCollector
-from surprise_analyzer import SurpriseAnalyzer
-from x_collector import XCollector
-from news_sources import X_SEARCH_KEYWORDS, X_ACCOUNTS
+from typing import Dict, Optional
 
 # ロギング設定
 logging.basicConfig(
@@ -23,15 +17,31 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
+def main(run_id: Optional[str] = None, resume: bool = True, replay_run_id: Optional[str] = None,
+         output_dir: str = "output", profile: Optional[str] = None):
     """
     メイン処理
+
+    Args:
+        run_id: ラン ID（既定: 当日の日付。同じ日の再実行は途中から再開）
+        resume: Falseの場合はチェックポイントを使わず最初から実行
+        replay_run_id: 指定した場合、そのランのスナップショットをネットワークなしで再分析
+        output_dir: 出力ディレクトリ
+        profile: プロファイルのモード（cpu / memory / all。既定: 環境変数 NEWS_PROFILE。結果は output/profile/<ラン ID>/）
     """
+    # 重い依存（feedparser, BeautifulSoup, requests等）は実行時にのみ読み込む
+    import pytz
+    from dotenv import load_dotenv
+    from checkpoint import default_run_id, prune_checkpoints
+    from deadline import DEFAULT_RUN_BUDGET
+    from pipeline import NewsPipeline
+    from profiling import profile_stage, profiling
+
     # 環境変数読み込み
     load_dotenv()
 
-    # 必須環境変数チェック
-    required_vars = [
+    # 必須環境変数チェック（リプレイはAPIを使わない）
+    required_vars = [] if replay_run_id else [
         'GROQ_API_KEY',
     ]
 
@@ -43,82 +53,178 @@ def main():
     # 設定
     timezone = os.getenv('TIMEZONE', 'Asia/Tokyo')
     hours_lookback = int(os.getenv('HOURS_LOOKBACK', '24'))
+    run_id = run_id or default_run_id(datetime.now(pytz.timezone(timezone)))
+    run_budget = float(os.getenv('RUN_BUDGET_SECONDS', str(DEFAULT_RUN_BUDGET))) or None
+    checkpoint_dir = os.path.join(output_dir, "checkpoints")
 
     logger.info("=== AI News Analyzer Started (Free Edition) ===")
     logger.info(f"Timezone: {timezone}")
     logger.info(f"Lookback period: {hours_lookback} hours")
+    logger.info(f"Run ID: {run_id}")
+    logger.info(f"Run budget: {f'{run_budget:.0f}s' if run_budget else 'unlimited'}")
+
+    with profiling(run_id, profile, os.path.join(output_dir, "profile")):
+        pipeline = NewsPipeline(
+            api_key=os.getenv('GROQ_API_KEY'),
+            run_id=run_id,
+            timezone=timezone,
+            hours_lookback=hours_lookback,
+            checkpoint_dir=checkpoint_dir,
+            trend_file=os.path.join(output_dir, "trends.json.gz"),
+            enrich_top_k=int(os.getenv('ENRICH_TOP_K', '0')),
+            content_cache_dir=os.path.join(output_dir, "content_cache"),
+            run_budget=run_budget,
+            health_file=os.path.join(output_dir, "source_health.json"),
+            picks=int(os.getenv('ANALYSIS_PICKS', '1')),
+            link_cache_file=os.path.join(output_dir, "link_cache.json") if os.getenv('EXPAND_LINKS', '0') == '1'
+            else None
+        )
+
+        if replay_run_id:
+            result = pipeline.replay(replay_run_id)
+            if not result:
+                sys.exit(1)
+        else:
+            # ステップ1〜2: ニュース収集（RSS + X）とサプライズ度分析
+            logger.info("\n[STEP 1] Collecting news from multiple sources...")
+            result = pipeline.run(resume=resume)
+            if not result:
+                sys.exit(0)
+
+        # 結果をログ出力
+        logger.info("\n=== Analysis Result ===")
+        logger.info(f"Selected article: {result['article']['title']}")
+        logger.info(f"Source: {result['article']['source']}")
+        logger.info(f"URL: {result['article']['link']}")
+        logger.info(f"Surprise score: {result['analysis'].get('surprise_score', 'N/A')}")
+        for pick in result.get('picks', [])[1:]:
+            logger.info(f"#{pick['rank']}: {pick['article']['title']} ({pick['analysis'].get('surprise_score', 'N/A')})")
+        if result.get('skipped_sources'):
+            logger.warning(f"Skipped sources: {len(result['skipped_sources'])}")
+
+        # 結果をJSONファイルに保存（リプレイ結果は通常の履歴と区別する）
+        # ファイル名の時刻はラン ID と同じタイムゾーンで付け、チェックポイントはラン ID から引けるよう記録する
+        os.makedirs(output_dir, exist_ok=True)
+        created_at = datetime.now(pytz.timezone(timezone))
+        result['run_id'] = replay_run_id or run_id
+        result['created_at'] = created_at.isoformat()
+        if replay_run_id:
+            result_name, report_name = f"replay_{replay_run_id}.json", f"replay_{replay_run_id}.md"
+        else:
+            timestamp = created_at.strftime('%Y%m%d_%H%M%S')
+            result_name, report_name = f"analysis_{timestamp}.json", f"report_{timestamp}.md"
+
+        output_file = os.path.join(output_dir, result_name)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+        logger.info(f"Result saved to: {output_file}")
+
+        # ステップ3: レポート生成（Markdown形式）
+        logger.info("\n[STEP 3] Generating detailed report...")
+        report_file = os.path.join(output_dir, report_name)
+        with profile_stage('report'):
+            generate_report(result, report_file)
+        logger.info(f"Report saved to: {report_file}")
+
+        if not replay_run_id:
+            # 配信フィード・週次ダイジェストを差分更新
+            from feed_publisher import FeedPublisher
+
+            with profile_stage('publish'):
+                FeedPublisher(os.path.join(output_dir, "feeds")).publish(result, run_id)
+
+            # 古いチェックポイントを整理
+            prune_checkpoints(checkpoint_dir)
 
-    # ステップ1: ニュース収集（RSS + X）
-    logger.info("\n[STEP 1] Collecting news from multiple sources...")
+    logger.info("\n=== AI News Analyzer Completed ===")
+    logger.info("Report will be posted to GitHub Issues by Actions workflow")
 
-    # 1-1: RSSフィードから収集
-    logger.info("[STEP 1-1] Collecting from RSS feeds...")
-    collector = FeedCollector(timezone=timezone, hours_lookback=hours_lookback)
-    rss_articles = collector.collect_all_feeds()
-    logger.info(f"RSS articles collected: {len(rss_articles)}")
 
-    # 1-2: Xから収集
-    logger.info("[STEP 1-2] Collecting from X (Twitter)...")
-    x_collector = XCollector(timezone=timezone, hours_lookback=hours_lookback)
+def _parse_datetime_fields(article: Dict) -> Dict:
+    """
+    JSONから読み込んだ記事の日時文字列をdatetimeに戻す
 
-    # Nitter検索
-    x_search_articles = x_collector.collect_from_search(X_SEARCH_KEYWORDS, max_tweets=50)
-    logger.info(f"X search articles collected: {len(x_search_articles)}")
+    Args:
+        article: 記事
 
-    # RSSHub（特定アカウント）
-    x_account_articles = x_collector.collect_from_rsshub(X_ACCOUNTS)
-    logger.info(f"X account articles collected: {len(x_account_articles)}")
+    Returns:
+        published を datetime に変換した記事
+    """
+    published = article.get('published')
+    if isinstance(published, str):
+        article['published'] = datetime.fromisoformat(published)
+    return article
 
-    # 全記事を統合
-    all_articles = rss_articles + x_search_articles + x_account_articles
-    logger.info(f"Total articles collected: {len(all_articles)}")
 
-    if not all_articles:
-        logger.warning("No articles found in the specified time range")
-        sys.exit(0)
+def load_result(input_file: str) -> Dict:
+    """
+    保存済みの分析結果JSONを読み込む
 
-    # AI関連記事のみフィルタリング
-    ai_articles = [article for article in all_articles if collector.is_ai_related(article)]
-    logger.info(f"AI-related articles: {len(ai_articles)} out of {len(all_articles)}")
+    Args:
+        input_file: analysis_*.json のパス
 
-    if not ai_articles:
-        logger.warning("No AI-related articles found")
-        sys.exit(0)
+    Returns:
+        分析結果（日時フィールドはdatetimeに復元済み）
+    """
+    with open(input_file, 'r', encoding='utf-8') as f:
+        result = json.load(f)
 
-    # ステップ2: サプライズ度分析
-    logger.info("\n[STEP 2] Analyzing articles with Claude Code (Groq LLaMA 3.1 70B)...")
-    analyzer = SurpriseAnalyzer(api_key=os.getenv('GROQ_API_KEY'))
-    result = analyzer.analyze_articles(ai_articles)
+    if result.get('article'):
+        _parse_datetime_fields(result['article'])
+    for candidate in result.get('all_candidates', []):
+        _parse_datetime_fields(candidate)
+    for pick in result.get('picks', []):
+        _parse_datetime_fields(pick['article'])
 
-    if not result:
-        logger.error("Analysis failed")
-        sys.exit(1)
+    return result
 
-    # 結果をログ出力
-    logger.info("\n=== Analysis Result ===")
-    logger.info(f"Selected article: {result['article']['title']}")
-    logger.info(f"Source: {result['article']['source']}")
-    logger.info(f"URL: {result['article']['link']}")
-    logger.info(f"Surprise score: {result['analysis'].get('surprise_score', 'N/A')}")
 
-    # 結果をJSONファイルに保存
-    output_dir = "output"
-    os.makedirs(output_dir, exist_ok=True)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_file = os.path.join(output_dir, f"analysis_{timestamp}.json")
+def _format_coverage(article: Dict) -> str:
+    """
+    ストーリーの報道状況（他ソースでも報じられている場合のみ）をMarkdownで返す
+    """
+    related = article.get('related') or []
+    if not related:
+        return ""
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=2, default=str)
-    logger.info(f"Result saved to: {output_file}")
+    lines = [f"\n### 報道状況\n{article.get('coverage_breadth', 1)}ソース / {article.get('story_size', 1)}件"
+             f"（{article.get('coverage_velocity', 0)}件/時）\n"]
+    lines += [f"- [{item['title']}]({item['link']}) - {item['source']}" for item in related]
+    return "\n".join(lines) + "\n"
 
-    # ステップ3: レポート生成（Markdown形式）
-    logger.info("\n[STEP 3] Generating detailed report...")
-    report_file = os.path.join(output_dir, f"report_{timestamp}.md")
-    generate_report(result, report_file)
-    logger.info(f"Report saved to: {report_file}")
 
-    logger.info("\n=== AI News Analyzer Completed ===")
-    logger.info("Report will be posted to GitHub Issues by Actions workflow")
+def _format_trend(article: Dict) -> str:
+    """
+    普段より言及が急増している語（スパイク語がある場合のみ）をMarkdownで返す
+    """
+    if not article.get('trend_terms'):
+        return ""
+    return f"\n### 急上昇ワード\n{', '.join(article['trend_terms'])}（スパイクスコア {article['trend_spike']}）\n"
+
+
+def _format_other_picks(result: Dict) -> str:
+    """
+    ランキング形式の2位以降の選定（ある場合のみ）をMarkdownで返す
+    """
+    picks = result.get('picks') or []
+    if len(picks) < 2:
+        return ""
+
+    report = "\n## 🏅 その他の注目ニュース\n"
+    for pick in picks[1:]:
+        article, analysis = pick['article'], pick['analysis']
+        reasons = "".join(f"- {reason}\n" for reason in analysis.get('surprise_reasons', []))
+        report += f"""
+### {pick['rank']}位: {analysis.get('title_ja', article['title'])}
+- **ソース**: {article['source']}
+- **URL**: {article['link']}
+- **サプライズスコア**: {analysis.get('surprise_score', 'N/A')} / 100
+
+{analysis.get('summary', article['summary'])}
+
+{reasons}"""
+
+    return report + "\n---\n"
 
 
 def generate_report(result: Dict, output_file: str):
@@ -151,7 +257,7 @@ def generate_report(result: Dict, output_file: str):
 
 ### 公開日時
 {article['published'].strftime('%Y-%m-%d %H:%M %Z')}
-
+{_format_coverage(article)}{_format_trend(article)}
 ---
 
 ## 📝 概要
@@ -195,7 +301,7 @@ def generate_report(result: Dict, output_file: str):
 {analysis.get('other_candidates_comparison', 'N/A')}
 
 ---
-
+{_format_other_picks(result)}
 ## 📋 全候補リスト
 
 """
@@ -223,6 +329,19 @@ def generate_report(result: Dict, output_file: str):
 - **収集ソース**: RSS, X (Nitter), X (RSSHub)
 """
 
+    usage = result.get('llm_usage')
+    if usage and not usage.get('cached_response'):
+        report += (
+            f"- **トークン使用量**: 入力 {usage['prompt_tokens']}（うちキャッシュ {usage['cached_tokens']}）/ "
+            f"出力 {usage['completion_tokens']}（プロンプト v{usage['prompt_version']}）\n"
+        )
+
+    # 時間予算切れ・エラーで収集できなかったソース
+    skipped = result.get('skipped_sources') or []
+    if skipped:
+        report += f"- **収集できなかったソース**: {len(skipped)}件\n"
+        report += "".join(f"  - {item['source']}（{item['reason']}）\n" for item in skipped)
+
     # ファイルに書き込み
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(report)
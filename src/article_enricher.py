@@ -0,0 +1,427 @@
+"""
+候補記事の本文取得（エンリッチメント）
+
+RSSの要約（最大500文字）だけではLLMが見出しで判断しがちなため、上位K件の候補に限って記事ページを取得し、
+本文を抽出して article['content'] に付与する。
+
+- 同時接続数を制限したスレッドプールで取得し、同じホストへのリクエストは直列化して間隔を空ける
+- 本文は readability 風の簡易抽出器（lxml）で抽出する
+- 抽出結果は正規化URLをキーにディスクへキャッシュし（有効期限・合計サイズで削除）、
+  同じ記事は実行をまたいで1回だけ取得する
+- チェックポイント・分析結果JSONには本文を保存せず、ハッシュと文字数だけを残す（drop_content）。
+  本文が必要になればキャッシュから戻す（ArticleEnricher.restore）
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from deadline import Deadline, unlimited
+from profiling import profiled
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join("output", "content_cache")
+
+# キャッシュの有効期限（時間）と合計サイズの上限（バイト）
+CACHE_TTL_HOURS = 24 * 14
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# 同じホストへのリクエストの最小間隔（秒）
+PER_HOST_DELAY = 1.0
+
+# 抽出する本文の最大文字数
+MAX_CONTENT_CHARS = 5000
+
+# 本文の取得対象外（記事ページではない）ホスト
+SKIP_HOSTS = ('x.com', 'twitter.com', 'nitter.net', 'rsshub.app')
+
+# 正規化で取り除くトラッキング用のクエリパラメータ
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid|ncid|guccounter)$', re.I)
+
+# 本文ではない要素
+_REMOVE_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'iframe', 'svg',
+                'button', 'figure']
+
+# XML宣言（XHTML のページに多い）。lxml は str に付いた encoding 付きの宣言を受け付けない
+_XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+_XML_DECLARED_ENCODING = re.compile(rb'^\s*<\?xml[^>]*?encoding=["\']([A-Za-z0-9._-]+)["\']')
+
+# class / id による本文らしさの判定
+_POSITIVE_HINTS = re.compile(r'article|content|entry|post|story|main|body|text', re.I)
+_NEGATIVE_HINTS = re.compile(r'comment|sidebar|footer|nav|menu|promo|related|share|social|ad-|ads|banner|'
+                             r'subscribe|newsletter|cookie|popup|recommend', re.I)
+
+
+def canonical_url(url: str) -> str:
+    """
+    キャッシュのキーにする正規化URL
+
+    スキーム・ホストの小文字化、既定ポート・フラグメント・トラッキング用パラメータの除去、
+    クエリのソート、末尾スラッシュの除去を行う。
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or 'https'
+    host = (parts.hostname or '').lower()
+    if parts.port and not ((scheme == 'http' and parts.port == 80) or (scheme == 'https' and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key)
+    ))
+    path = parts.path.rstrip('/') or '/'
+
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def _node_weight(node) -> int:
+    hints = f"{node.get('class', '')} {node.get('id', '')}"
+    weight = 0
+    if _POSITIVE_HINTS.search(hints):
+        weight += 25
+    if _NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    return weight
+
+
+def _normalize_space(text: str) -> str:
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _parse_html(html: Union[str, bytes]):
+    """
+    HTMLを解析（bytes はXML宣言・meta の文字コードで、str はデコード済みとして扱う）
+    """
+    import lxml.html
+
+    if isinstance(html, str):
+        return lxml.html.fromstring(_XML_DECLARATION.sub('', html, count=1))
+
+    match = _XML_DECLARED_ENCODING.match(html)
+    parser = lxml.html.HTMLParser(encoding=match.group(1).decode('ascii')) if match else None
+    return lxml.html.fromstring(html, parser=parser)
+
+
+def extract_main_text(html: Union[str, bytes], max_chars: int = MAX_CONTENT_CHARS) -> str:
+    """
+    HTMLから記事本文を抽出（readability 風の簡易版）
+
+    <article> / articleBody があればそれを使い、なければ段落の文字数を親要素に加点して
+    最も得点の高い要素の段落を本文とする。
+
+    Args:
+        html: 記事ページのHTML（bytes の場合はページで宣言された文字コードでデコードする）
+        max_chars: 最大文字数
+
+    Returns:
+        本文（抽出できない場合は空文字）
+    """
+    import lxml.etree
+
+    if not html or not html.strip():
+        return ""
+
+    try:
+        doc = _parse_html(html)
+    except (lxml.etree.ParserError, lxml.etree.XMLSyntaxError, LookupError) as e:
+        logger.debug(f"Could not parse HTML: {e}")
+        return ""
+
+    for element in list(doc.iter(*_REMOVE_TAGS)):
+        element.drop_tree()
+
+    root = None
+    candidates = doc.xpath('//*[@itemprop="articleBody"]') or doc.xpath('//article')
+    if candidates:
+        root = max(candidates, key=lambda node: len(node.text_content()))
+    else:
+        scores = {}
+        for paragraph in doc.iter('p'):
+            length = len(_normalize_space(paragraph.text_content()))
+            if length < 25:
+                continue
+            # 段落の長さとカンマの数で加点（本文の段落ほど長く、読点・カンマが多い）
+            score = 1 + min(length // 100, 3) + paragraph.text_content().count(',') + \
+                paragraph.text_content().count('、')
+            parent = paragraph.getparent()
+            if parent is None:
+                continue
+            scores[parent] = scores.get(parent, _node_weight(parent)) + score
+            grandparent = parent.getparent()
+            if grandparent is not None:
+                scores[grandparent] = scores.get(grandparent, _node_weight(grandparent)) + score / 2
+        if scores:
+            root = max(scores, key=scores.get)
+
+    if root is None:
+        return ""
+
+    paragraphs = [_normalize_space(p.text_content()) for p in root.iter('p', 'h2', 'h3', 'li')]
+    text = "\n".join(p for p in paragraphs if p) or _normalize_space(root.text_content())
+    return text[:max_chars]
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def drop_content(articles: List[Dict]) -> List[Dict]:
+    """
+    記事の本文（content）を除き、ハッシュ（content_sha256）と文字数（content_length）に置き換える
+
+    Args:
+        articles: 記事のリスト（その場で更新する。元の記事を残す場合はコピーを渡す）
+
+    Returns:
+        同じ記事のリスト
+    """
+    for article in articles:
+        content = article.pop('content', None)
+        if content is not None:
+            article['content_sha256'] = _content_hash(content)
+            article['content_length'] = len(content)
+    return articles
+
+
+class ContentCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_hours: float = CACHE_TTL_HOURS,
+                 max_bytes: int = CACHE_MAX_BYTES):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリ
+            ttl_hours: 有効期限（時間）
+            max_bytes: 合計サイズの上限（超えたら最終利用が古いものから削除）
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_bytes = max_bytes
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(canonical_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        キャッシュ済みの抽出結果を返す（ない・期限切れの場合はNone）
+        """
+        path = self._path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get("fetched_at", 0) > self.ttl_seconds:
+            return None
+
+        # 最終利用時刻を更新（サイズ超過時の削除順に使う）
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, url: str, content: str):
+        """
+        抽出結果を保存（一時ファイルに書いてから置き換える）
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"url": canonical_url(url), "fetched_at": time.time(), "content": content}, f,
+                      ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """
+        期限切れのエントリを削除し、合計サイズが上限を超えていれば最終利用が古いものから削除
+
+        Returns:
+            削除したエントリ数
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        now = time.time()
+        removed = 0
+        total = 0
+        # 最終利用が新しい順に残し、期限切れ・上限超過分を削除
+        for mtime, size, path in sorted(entries, reverse=True):
+            if now - mtime > self.ttl_seconds or total + size > self.max_bytes:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+                continue
+            total += size
+
+        if removed:
+            logger.info(f"Evicted {removed} entries from content cache")
+        return removed
+
+
+class ArticleEnricher:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_workers: int = 4,
+                 per_host_delay: float = PER_HOST_DELAY, request_timeout: float = 10,
+                 ttl_hours: float = CACHE_TTL_HOURS, max_cache_bytes: int = CACHE_MAX_BYTES):
+        """
+        Args:
+            cache_dir: 抽出結果のキャッシュディレクトリ
+            max_workers: 同時に取得するページ数の上限
+            per_host_delay: 同じホストへのリクエストの最小間隔（秒）
+            request_timeout: 取得のタイムアウト（秒）
+            ttl_hours: キャッシュの有効期限（時間）
+            max_cache_bytes: キャッシュの合計サイズの上限（バイト）
+        """
+        self.cache = ContentCache(cache_dir, ttl_hours, max_cache_bytes)
+        self.max_workers = max_workers
+        self.per_host_delay = per_host_delay
+        self.request_timeout = request_timeout
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._host_last_request: Dict[str, float] = {}
+        self._locks_guard = threading.Lock()
+
+    @profiled()
+    def enrich(self, articles: List[Dict], top_k: int = 5, offline: bool = False,
+               deadline: Optional[Deadline] = None) -> List[Dict]:
+        """
+        上位 top_k 件の記事に本文（content）と正規化URL（canonical_url）を付与
+
+        Args:
+            articles: 記事のリスト（スコア順。その場で更新する）
+            top_k: 本文を取得する記事数
+            offline: Trueの場合はキャッシュのみ使用し、ネットワークにアクセスしない
+            deadline: 取得の期限（過ぎたら未取得の記事は要約のまま）
+
+        Returns:
+            同じ記事のリスト
+        """
+        deadline = deadline or unlimited()
+        targets = [article for article in articles[:top_k] if self._should_enrich(article)]
+        misses = []
+
+        for article in targets:
+            article['canonical_url'] = canonical_url(article['link'])
+            cached = self.cache.get(article['link'])
+            if cached is not None:
+                article['content'] = cached['content']
+            else:
+                misses.append(article)
+
+        if misses and not offline:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(misses)))) as executor:
+                contents = list(executor.map(
+                    lambda article: self._fetch_content(article['link'], deadline), misses
+                ))
+            for article, content in zip(misses, contents):
+                if content:
+                    article['content'] = content
+            self.cache.evict()
+
+        enriched = sum(1 for article in targets if article.get('content'))
+        logger.info(
+            f"Enriched {enriched}/{len(targets)} candidates with full text "
+            f"({len(targets) - len(misses)} from cache)"
+        )
+        return articles
+
+    def restore(self, articles: List[Dict]) -> int:
+        """
+        drop_content() で除いた本文をキャッシュから戻す（ハッシュが一致するもののみ）
+
+        Args:
+            articles: 記事のリスト（その場で更新する）
+
+        Returns:
+            本文を戻した記事数
+        """
+        restored = 0
+        for article in articles:
+            if 'content' in article or 'content_sha256' not in article:
+                continue
+            cached = self.cache.get(article['link'])
+            if cached is None or _content_hash(cached['content']) != article['content_sha256']:
+                continue
+            article['content'] = cached['content']
+            del article['content_sha256'], article['content_length']
+            restored += 1
+
+        if restored:
+            logger.info(f"Restored full text of {restored} candidates from cache")
+        return restored
+
+    def _should_enrich(self, article: Dict) -> bool:
+        host = (urlsplit(article.get('link', '')).hostname or '').lower()
+        return bool(host) and not any(host == skip or host.endswith('.' + skip) for skip in SKIP_HOSTS)
+
+    def _host_lock(self, host: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._host_locks.setdefault(host, threading.Lock())
+
+    def _fetch_content(self, url: str, deadline: Optional[Deadline] = None) -> Optional[str]:
+        """
+        ページを取得して本文を抽出し、キャッシュに保存（同じホストへは直列に、間隔を空けて取得）
+        """
+        deadline = deadline or unlimited()
+        host = (urlsplit(url).hostname or '').lower()
+
+        with self._host_lock(host):
+            wait = self._host_last_request.get(host, 0) + self.per_host_delay - time.monotonic()
+            if wait > 0:
+                time.sleep(min(wait, max(deadline.remaining(), 0)))
+            if deadline.expired():
+                logger.warning(f"Enrichment budget exhausted, skipping {url}")
+                return None
+            try:
+                html = self._fetch(url, deadline.timeout(self.request_timeout))
+            except Exception as e:
+                logger.warning(f"Failed to fetch article {url}: {e}")
+                return None
+            finally:
+                self._host_last_request[host] = time.monotonic()
+
+        content = extract_main_text(html)
+        if content:
+            self.cache.put(url, content)
+        return content
+
+    def _fetch(self, url: str, timeout: float) -> Union[str, bytes]:
+        """
+        ページのHTMLを取得
+
+        応答ヘッダで文字コードが指定されていればデコードした str、なければページ内の
+        XML宣言・meta で lxml がデコードできるよう bytes のまま返す。
+        """
+        import requests
+
+        response = requests.get(
+            url,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; ai-news-analyzer)"},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        if 'charset=' in response.headers.get('Content-Type', '').lower():
+            return response.text
+        return response.content
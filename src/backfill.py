@@ -0,0 +1,325 @@
+"""
+過去の分析結果の再スコアリング（バックフィル）
+
+output/analysis_*.json の候補セット（同じ日のチェックポイントがあればフィルタ前の全記事）に対して、
+現在の AI_KEYWORDS / SURPRISE_KEYWORDS / ランキングでフィルタ・予備スコアリングをやり直し、
+必要に応じてキャッシュ済みのLLM分析も再実行して、旧選定と新選定を比較する。
+日ごとの処理はプロセスプールで並列に実行する。
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULT_FILE_PATTERN = re.compile(r'analysis_(\d{8})_(\d{6})\.json$')
+
+# ワーカープロセスごとに1回だけ生成するオブジェクト
+_worker: Dict = {}
+
+
+def list_result_files(output_dir: str, since: Optional[str] = None, until: Optional[str] = None) -> List[str]:
+    """
+    期間内の analysis_*.json を日付順に返す
+
+    Args:
+        output_dir: 出力ディレクトリ
+        since: 開始日（YYYYMMDD または YYYY-MM-DD、この日を含む）
+        until: 終了日（YYYYMMDD または YYYY-MM-DD、この日を含む）
+
+    Returns:
+        ファイルパスのリスト
+    """
+    since = since.replace('-', '') if since else None
+    until = until.replace('-', '') if until else None
+
+    files = []
+    for path in sorted(glob.glob(os.path.join(output_dir, 'analysis_*.json'))):
+        match = RESULT_FILE_PATTERN.search(os.path.basename(path))
+        if not match:
+            continue
+        date = match.group(1)
+        if (since and date < since) or (until and date > until):
+            continue
+        files.append(path)
+
+    return files
+
+
+def _init_worker(use_llm: bool, api_key: Optional[str], cache_dir: Optional[str],
+                 checkpoint_dir: Optional[str], hours_lookback: int, picks: int = 1):
+    """
+    ワーカープロセスの初期化（コレクタ・アナライザを使い回す）
+    """
+    from feed_collector import FeedCollector
+    from surprise_analyzer import SurpriseAnalyzer
+
+    _worker.update({
+        "collector": FeedCollector(hours_lookback=hours_lookback),
+        "analyzer": SurpriseAnalyzer(api_key=api_key, cache_dir=cache_dir, picks=picks),
+        "use_llm": use_llm,
+        "checkpoint_dir": checkpoint_dir,
+        "hours_lookback": hours_lookback,
+    })
+
+
+def result_run_id(path: str, result: Dict) -> str:
+    """
+    分析結果のラン ID を返す（ラン ID を記録していない古い結果はファイル名の日付）
+
+    Args:
+        path: analysis_*.json のパス
+        result: その分析結果
+
+    Returns:
+        チェックポイントのラン ID
+    """
+    return result.get('run_id') or RESULT_FILE_PATTERN.search(os.path.basename(path)).group(1)
+
+
+def load_pool(path: str, result: Dict, collector, checkpoint_dir: Optional[str], hours_lookback: int) -> Dict:
+    """
+    再スコアリング対象の記事プールを読み込む
+
+    同じランのチェックポイントがあれば時刻フィルタ前の全記事、なければ保存済みの候補を使う。
+
+    Args:
+        path: analysis_*.json のパス
+        result: その分析結果
+        collector: 時刻フィルタ・重複削除に使う FeedCollector
+        checkpoint_dir: チェックポイントのディレクトリ（Noneなら保存済みの候補のみ）
+        hours_lookback: スナップショットに適用する取得対象期間
+
+    Returns:
+        {"kind": "snapshot" または "candidates", "articles": 記事のリスト}
+    """
+    from checkpoint import CheckpointStore
+
+    if checkpoint_dir:
+        store = CheckpointStore(result_run_id(path, result), checkpoint_dir)
+        payload = store.load_payload('parsed')
+        if payload:
+            collector.cutoff_time = payload["created_at"] - timedelta(hours=hours_lookback)
+            articles = collector._remove_duplicates(collector._filter_by_time(payload["data"]))
+            return {"kind": "snapshot", "articles": articles}
+
+        filtered = store.load('filtered')
+        if filtered:
+            return {"kind": "snapshot", "articles": filtered}
+
+    return {"kind": "candidates", "articles": result.get('all_candidates', [])}
+
+
+def _pick_summary(article: Optional[Dict], analysis: Dict) -> Optional[Dict]:
+    if not article:
+        return None
+    return {
+        "title": article.get('title', ''),
+        "link": article.get('link', ''),
+        "source": article.get('source', ''),
+        "surprise_score": analysis.get('surprise_score'),
+        "preliminary_score": article.get('preliminary_score', 0),
+    }
+
+
+def rescore_file(path: str) -> Dict:
+    """
+    1日分の結果を現在のロジックで再スコアリング（ワーカープロセスで実行）
+
+    Args:
+        path: analysis_*.json のパス
+
+    Returns:
+        旧選定・新選定と候補の比較
+    """
+    from analyzer import load_result
+    from story_cluster import cluster_stories
+
+    result = load_result(path)
+    collector = _worker["collector"]
+    pool = load_pool(path, result, collector, _worker["checkpoint_dir"], _worker["hours_lookback"])
+    analyzer = _worker["analyzer"]
+
+    # 現在の AI_KEYWORDS でフィルタし、ストーリーにまとめて現在のスコアリングで候補を選び直す
+    # （候補数は本番と同じく選定件数に応じて広げる）
+    ai_articles = [dict(article) for article in pool["articles"] if collector.is_ai_related(article)]
+    candidates = analyzer._select_candidates(cluster_stories(ai_articles), analyzer.max_candidates) \
+        if ai_articles else []
+
+    if not candidates:
+        new_result = {"article": None, "analysis": {}}
+    elif _worker["use_llm"]:
+        new_result = analyzer._analyze_with_claude(candidates)
+    else:
+        new_result = analyzer._fallback_selection(candidates)
+
+    old_links = [candidate.get('link') for candidate in result.get('all_candidates', [])]
+    new_links = [candidate.get('link') for candidate in candidates]
+    old_pick = _pick_summary(result.get('article'), result.get('analysis') or {})
+    new_pick = _pick_summary(new_result.get('article'), new_result.get('analysis') or {})
+
+    return {
+        "file": os.path.basename(path),
+        "date": RESULT_FILE_PATTERN.search(os.path.basename(path)).group(1),
+        "pool": pool["kind"],
+        "pool_size": len(pool["articles"]),
+        "ai_related": len(ai_articles),
+        "old_fallback": bool(result.get('fallback')),
+        "new_fallback": bool(new_result.get('fallback')),
+        "old_pick": old_pick,
+        "new_pick": new_pick,
+        "changed": (old_pick or {}).get('link') != (new_pick or {}).get('link'),
+        "candidate_overlap": len(set(old_links) & set(new_links)),
+        "new_candidates": new_links,
+        "new_picks": [pick['article'].get('link') for pick in new_result.get('picks') or []],
+        "llm_usage": new_result.get('llm_usage'),
+    }
+
+
+def run_backfill(output_dir: str = "output", since: Optional[str] = None, until: Optional[str] = None,
+                 workers: Optional[int] = None, use_llm: bool = False, api_key: Optional[str] = None,
+                 hours_lookback: int = 24, picks: int = 1) -> Dict:
+    """
+    期間内の結果をプロセスプールで再スコアリング
+
+    Args:
+        output_dir: 出力ディレクトリ（analysis_*.json とチェックポイントの場所）
+        since: 開始日
+        until: 終了日
+        workers: ワーカープロセス数（既定: CPUコア数）
+        use_llm: TrueならLLM分析も再実行（応答は output/llm_cache にキャッシュ）
+        api_key: Groq APIキー（Noneならキャッシュ済みの応答のみ使用）
+        hours_lookback: スナップショットに適用する取得対象期間
+        picks: 選定する件数（本番の ANALYSIS_PICKS と揃える）
+
+    Returns:
+        rows（日ごとの比較）とサマリ
+    """
+    files = list_result_files(output_dir, since, until)
+    workers = workers or os.cpu_count() or 1
+    checkpoint_dir = os.path.join(output_dir, "checkpoints")
+    cache_dir = os.path.join(output_dir, "llm_cache") if use_llm else None
+
+    logger.info(f"Backfilling {len(files)} results with {workers} workers")
+
+    start = time.perf_counter()
+    if files:
+        # 1件あたりの処理が軽いため、まとめてワーカーに渡してプロセス間通信を減らす
+        chunksize = max(1, len(files) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(use_llm, api_key, cache_dir, checkpoint_dir, hours_lookback, picks)
+        ) as executor:
+            rows = list(executor.map(rescore_file, files, chunksize=chunksize))
+    else:
+        rows = []
+    elapsed = time.perf_counter() - start
+
+    changed = sum(1 for row in rows if row["changed"])
+
+    # APIを呼んだ日のトークン使用量（固定のシステムメッセージがプレフィックスキャッシュに当たった分を含む）
+    usages = [row["llm_usage"] for row in rows if row.get("llm_usage") and not row["llm_usage"].get("cached_response")]
+    llm_tokens = {
+        key: sum(usage.get(key, 0) for usage in usages)
+        for key in ("prompt_tokens", "cached_tokens", "completion_tokens")
+    }
+
+    return {
+        "since": since,
+        "until": until,
+        "workers": workers,
+        "use_llm": use_llm,
+        "picks": picks,
+        "files": len(rows),
+        "changed": changed,
+        "agreement": round(1 - changed / len(rows), 3) if rows else None,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput": round(len(rows) / elapsed, 1) if elapsed > 0 else None,
+        "api_calls": len(usages),
+        "llm_tokens": llm_tokens,
+        "rows": rows,
+    }
+
+
+def _format_tokens(summary: Dict) -> str:
+    """
+    APIを呼んだ場合のトークン使用量の行
+    """
+    if not summary.get('api_calls'):
+        return ""
+    tokens = summary['llm_tokens']
+    hit_rate = tokens['cached_tokens'] / tokens['prompt_tokens'] * 100 if tokens['prompt_tokens'] else 0
+    return (
+        f"\n- **API呼び出し**: {summary['api_calls']} 回（入力 {tokens['prompt_tokens']} トークン、"
+        f"うちキャッシュ {tokens['cached_tokens']}（{hit_rate:.0f}%）、出力 {tokens['completion_tokens']} トークン）"
+    )
+
+
+def format_report(summary: Dict) -> str:
+    """
+    旧選定と新選定の比較レポートをMarkdownで生成
+
+    Args:
+        summary: run_backfill() の戻り値
+
+    Returns:
+        Markdown文字列
+    """
+    period = f"{summary['since'] or '最初'} 〜 {summary['until'] or '最新'}"
+    agreement = f"{summary['agreement'] * 100:.1f}%" if summary['agreement'] is not None else "N/A"
+
+    report = f"""# バックフィル比較レポート
+
+生成日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+- **対象期間**: {period}
+- **対象日数**: {summary['files']}
+- **選定が変わった日**: {summary['changed']}
+- **一致率**: {agreement}
+- **LLM再分析**: {'あり（キャッシュ利用）' if summary['use_llm'] else 'なし（予備スコアで選定）'}
+- **ワーカー数**: {summary['workers']}
+- **処理時間**: {summary['elapsed_seconds']} 秒（{summary['throughput']} 件/秒）{_format_tokens(summary)}
+
+---
+
+| 日付 | 対象 | 旧選定 | 新選定 | 変化 |
+|------|------|--------|--------|------|
+"""
+
+    for row in summary["rows"]:
+        old_title = (row["old_pick"] or {}).get('title', '-')[:40].replace('|', '\\|')
+        new_title = (row["new_pick"] or {}).get('title', '-')[:40].replace('|', '\\|')
+        pool = f"{row['pool']} ({row['ai_related']}/{row['pool_size']})"
+        report += f"| {row['date']} | {pool} | {old_title} | {new_title} | {'⚠️' if row['changed'] else ''} |\n"
+
+    return report
+
+
+def save_backfill(summary: Dict, output_dir: str = "output") -> str:
+    """
+    比較結果をJSONとMarkdownで保存
+
+    Returns:
+        Markdownレポートのパス
+    """
+    backfill_dir = os.path.join(output_dir, "backfill")
+    os.makedirs(backfill_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    with open(os.path.join(backfill_dir, f"backfill_{timestamp}.json"), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+
+    report_file = os.path.join(backfill_dir, f"backfill_{timestamp}.md")
+    with open(report_file, 'w', encoding='utf-8') as f:
+        f.write(format_report(summary))
+
+    return report_file
@@ -0,0 +1,360 @@
+"""
+収集・ランキングのホットパスのベンチマーク
+
+合成コーパス（synthetic_corpus）を現在の取得量の 1x / 10x / 100x / 1000x で生成し、
+各関数のスループットとピークメモリを計測して、保存済みのベースラインと比較する。
+ベースライン（benchmarks/baseline.json）には 1000x の計測結果も含まれるため、--scales で 1000x を指定すれば比較される。
+
+使い方:
+    python src/cli.py bench                         # 1x, 10x, 100x で計測してベースラインと比較
+    python src/cli.py bench --scales 1,10,100,1000  # 1000x も計測して比較（20分程度かかる）
+    python src/cli.py bench --update-baseline       # 計測結果をベースラインとして保存
+"""
+
+import os
+import json
+import time
+import tempfile
+import platform
+import tracemalloc
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from synthetic_corpus import SyntheticCorpus, BASE_VOLUME
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_BASELINE = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks', 'baseline.json')
+)
+
+# ベースラインに対する許容幅（マシン差・揺らぎを吸収するため緩めに設定）
+THROUGHPUT_TOLERANCE = 0.3
+MEMORY_TOLERANCE = 0.5
+
+# これ未満のピークメモリの増加は揺らぎとみなす（KiB）
+MEMORY_NOISE_KB = 64
+
+# 名前 -> セットアップ関数（scale を受け取り、(計測対象の関数, 処理件数) を返す）
+BENCHMARKS: Dict[str, Callable[[int], Tuple[Callable[[], object], int]]] = {}
+
+
+def register(name: str):
+    """
+    ベンチマークを登録するデコレータ
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+
+def _corpus() -> SyntheticCorpus:
+    return SyntheticCorpus(seed=42)
+
+
+def _feed_collector():
+    from feed_collector import FeedCollector
+    return FeedCollector(timezone="Asia/Tokyo", hours_lookback=24)
+
+
+@register('_parse_date')
+def _setup_parse_date(scale: int):
+    from feedparser import FeedParserDict
+
+    collector = _feed_collector()
+    corpus = _corpus()
+    entries = [
+        FeedParserDict(published_parsed=corpus.article()["published"].utctimetuple())
+        for _ in range(BASE_VOLUME * scale)
+    ]
+
+    def run():
+        for entry in entries:
+            collector._parse_date(entry)
+
+    return run, len(entries)
+
+
+@register('_clean_html')
+def _setup_clean_html(scale: int):
+    collector = _feed_collector()
+    corpus = _corpus()
+    summaries = [
+        corpus.html_summary('ja' if i % 3 == 0 else 'en')
+        for i in range(BASE_VOLUME * scale)
+    ]
+
+    def run():
+        for summary in summaries:
+            collector._clean_html(summary)
+
+    return run, len(summaries)
+
+
+@register('_filter_by_time')
+def _setup_filter_by_time(scale: int):
+    collector = _feed_collector()
+    articles = _corpus().articles(BASE_VOLUME * scale)
+    return (lambda: collector._filter_by_time(articles)), len(articles)
+
+
+@register('_remove_duplicates')
+def _setup_remove_duplicates(scale: int):
+    collector = _feed_collector()
+    articles = _corpus().articles(BASE_VOLUME * scale)
+    return (lambda: collector._remove_duplicates(articles)), len(articles)
+
+
+@register('is_ai_related')
+def _setup_is_ai_related(scale: int):
+    collector = _feed_collector()
+    articles = _corpus().articles(BASE_VOLUME * scale)
+    return (lambda: [article for article in articles if collector.is_ai_related(article)]), len(articles)
+
+
+@register('_select_candidates')
+def _setup_select_candidates(scale: int):
+    from surprise_analyzer import SurpriseAnalyzer
+
+    analyzer = SurpriseAnalyzer(api_key=None)
+    articles = _corpus().articles(BASE_VOLUME * scale)
+    return (lambda: analyzer._select_candidates(articles)), len(articles)
+
+
+@register('cluster_stories')
+def _setup_cluster_stories(scale: int):
+    from story_cluster import cluster_stories
+
+    articles = _corpus().articles(BASE_VOLUME * scale)
+    # 代表記事へのフィールド追加が計測ごとに累積しないよう、毎回コピーを渡す
+    return (lambda: cluster_stories([dict(article) for article in articles])), len(articles)
+
+
+def _candidates(scale: int) -> List[Dict]:
+    """
+    候補リスト（1xで5件）を生成
+    """
+    candidates = _corpus().articles(5 * scale)
+    for i, candidate in enumerate(candidates):
+        candidate['preliminary_score'] = len(candidates) - i
+    return candidates
+
+
+@register('_format_candidates')
+def _setup_format_candidates(scale: int):
+    from surprise_analyzer import SurpriseAnalyzer
+
+    analyzer = SurpriseAnalyzer(api_key=None)
+    candidates = _candidates(scale)
+    return (lambda: analyzer._format_candidates(candidates)), len(candidates)
+
+
+@register('generate_report')
+def _setup_generate_report(scale: int):
+    from analyzer import generate_report
+    from surprise_analyzer import SurpriseAnalyzer
+
+    candidates = _candidates(scale)
+    result = SurpriseAnalyzer(api_key=None)._fallback_selection(candidates)
+    output_file = os.path.join(tempfile.mkdtemp(prefix='bench_report_'), 'report.md')
+    return (lambda: generate_report(result, output_file)), len(candidates)
+
+
+def _legacy_is_english(text: str) -> bool:
+    """
+    置き換え前の XCollector._is_english（比較用: ASCIIが70%以上なら英語）
+    """
+    if not text:
+        return True
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return (ascii_chars / len(text)) > 0.7
+
+
+@register('detect_languages')
+def _setup_detect_languages(scale: int):
+    from language_detector import detect_languages
+
+    texts = [sample["text"] for sample in _corpus().labeled_texts(BASE_VOLUME * scale)]
+    return (lambda: detect_languages(texts)), len(texts)
+
+
+@register('_is_english (legacy)')
+def _setup_legacy_is_english(scale: int):
+    texts = [sample["text"] for sample in _corpus().labeled_texts(BASE_VOLUME * scale)]
+    return (lambda: ['en' if _legacy_is_english(text) else 'ja' for text in texts]), len(texts)
+
+
+LANGUAGE_BENCHMARKS = ('detect_languages', '_is_english (legacy)')
+
+
+def language_accuracy(count: int = BASE_VOLUME * 10) -> Dict[str, float]:
+    """
+    言語判定の正解率を新旧で比較（旧実装は en / ja のみを返す）
+
+    Args:
+        count: 評価に使うテキスト数
+
+    Returns:
+        判定方法 -> 正解率
+    """
+    from language_detector import detect_languages
+
+    samples = _corpus().labeled_texts(count)
+    labels = [sample["language"] for sample in samples]
+    texts = [sample["text"] for sample in samples]
+    predictions = {
+        'detect_languages': detect_languages(texts),
+        '_is_english (legacy)': ['en' if _legacy_is_english(text) else 'ja' for text in texts],
+    }
+
+    return {
+        name: round(sum(p == label for p, label in zip(predicted, labels)) / len(labels), 3)
+        for name, predicted in predictions.items()
+    }
+
+
+def run_benchmark(name: str, scale: int, repeat: Optional[int] = None) -> Dict:
+    """
+    1つのベンチマークを実行
+
+    Args:
+        name: ベンチマーク名
+        scale: 現在の取得量に対する倍率
+        repeat: 計測回数（既定: 件数に応じて自動。最速値を採用）
+
+    Returns:
+        items / seconds / throughput / peak_kb を含む辞書
+    """
+    func, items = BENCHMARKS[name](scale)
+    if repeat is None:
+        repeat = 3 if items < 10000 else 1
+
+    # 時間計測（tracemalloc のオーバーヘッドを含めない）
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    # ピークメモリ計測（計測対象の関数が新たに確保した分のみ）
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "items": items,
+        "seconds": round(best, 6),
+        "throughput": round(items / best, 1) if best > 0 else float('inf'),
+        "peak_kb": round(max(peak - before, 0) / 1024, 1)
+    }
+
+
+def run_suite(names: Optional[List[str]] = None, scales: Optional[List[int]] = None) -> Dict[str, Dict]:
+    """
+    ベンチマークスイートを実行
+
+    Args:
+        names: 実行するベンチマーク名（既定: すべて）
+        scales: 倍率のリスト（既定: DEFAULT_SCALES）
+
+    Returns:
+        "名前@倍率x" -> 計測結果
+    """
+    results = {}
+    for name in names or list(BENCHMARKS):
+        for scale in scales or DEFAULT_SCALES:
+            results[f"{name}@{scale}x"] = run_benchmark(name, scale)
+            logger.info(f"{name}@{scale}x: {results[f'{name}@{scale}x']}")
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict],
+            tolerance: float = THROUGHPUT_TOLERANCE, memory_tolerance: float = MEMORY_TOLERANCE) -> List[Dict]:
+    """
+    計測結果をベースラインと比較
+
+    Args:
+        results: run_suite() の戻り値
+        baseline: ベースラインの計測結果
+        tolerance: スループット低下の許容割合
+        memory_tolerance: ピークメモリ増加の許容割合
+
+    Returns:
+        key / status（ok, regression, new）/ 比率 を含む辞書のリスト
+    """
+    rows = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            rows.append({"key": key, "status": "new", "throughput_ratio": None, "memory_ratio": None, **result})
+            continue
+
+        throughput_ratio = result["throughput"] / base["throughput"] if base["throughput"] else None
+        memory_ratio = result["peak_kb"] / base["peak_kb"] if base["peak_kb"] else None
+
+        regressed = (
+            (throughput_ratio is not None and throughput_ratio < 1 - tolerance)
+            or (memory_ratio is not None and memory_ratio > 1 + memory_tolerance
+                and result["peak_kb"] > MEMORY_NOISE_KB)
+        )
+        rows.append({
+            "key": key,
+            "status": "regression" if regressed else "ok",
+            "throughput_ratio": round(throughput_ratio, 3) if throughput_ratio is not None else None,
+            "memory_ratio": round(memory_ratio, 3) if memory_ratio is not None else None,
+            **result
+        })
+
+    return rows
+
+
+def load_baseline(path: str = DEFAULT_BASELINE) -> Dict[str, Dict]:
+    """
+    ベースラインを読み込む（存在しない場合は空）
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(results: Dict[str, Dict], path: str = DEFAULT_BASELINE):
+    """
+    計測結果をベースラインとして保存（既存のキーは上書き、他のキーは保持）
+    """
+    merged = load_baseline(path)
+    merged.update(results)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "results": dict(sorted(merged.items()))
+        }, f, indent=2)
+        f.write("\n")
+
+
+def format_rows(rows: List[Dict]) -> str:
+    """
+    比較結果を表形式の文字列に整形
+    """
+    lines = [f"{'benchmark':<28} {'items':>8} {'items/s':>12} {'peak KiB':>10} {'vs base':>8} {'mem':>6}  status"]
+    for row in rows:
+        ratio = f"{row['throughput_ratio']:.2f}" if row['throughput_ratio'] is not None else '-'
+        memory = f"{row['memory_ratio']:.2f}" if row['memory_ratio'] is not None else '-'
+        lines.append(
+            f"{row['key']:<28} {row['items']:>8} {row['throughput']:>12.0f} {row['peak_kb']:>10.1f} "
+            f"{ratio:>8} {memory:>6}  {row['status']}"
+        )
+    return "\n".join(lines)
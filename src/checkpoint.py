@@ -0,0 +1,233 @@
+"""
+パイプライン各ステージのチェックポイント保存・読み込み
+
+各ステージの出力を gzip 圧縮したバージョン付きJSONとして
+output/checkpoints/<run_id>/ に保存し、失敗時に最後に成功したステージから再開できるようにする。
+"""
+
+import os
+import json
+import gzip
+import base64
+import shutil
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# チェックポイント形式のバージョン（互換性のない変更時に上げる）
+CHECKPOINT_VERSION = 1
+
+# パイプラインのステージ（実行順）
+STAGES = ['raw', 'parsed', 'filtered', 'candidates', 'analysis']
+
+DEFAULT_CHECKPOINT_DIR = os.path.join("output", "checkpoints")
+
+
+def _encode(obj: Any) -> Any:
+    """
+    JSONにできない値（datetime, bytes）をタグ付きの辞書に変換
+    """
+    if isinstance(obj, datetime):
+        return {"__datetime__": obj.isoformat()}
+    if isinstance(obj, bytes):
+        return {"__bytes__": base64.b64encode(obj).decode('ascii')}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _decode(obj: Dict) -> Any:
+    """
+    タグ付きの辞書を元の値に戻す
+    """
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__bytes__" in obj:
+            return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+def default_run_id(now: Optional[datetime] = None) -> str:
+    """
+    既定のラン ID（日付単位）を返す
+
+    同じ日に再実行した場合は同じ ID になり、前回の途中から再開される。
+
+    Args:
+        now: 基準時刻（タイムゾーン付き推奨）
+
+    Returns:
+        YYYYMMDD 形式のラン ID
+    """
+    return (now or datetime.now()).strftime('%Y%m%d')
+
+
+class CheckpointStore:
+    def __init__(self, run_id: str, base_dir: str = DEFAULT_CHECKPOINT_DIR):
+        """
+        Args:
+            run_id: ラン ID
+            base_dir: チェックポイントの保存先ディレクトリ
+        """
+        self.run_id = run_id
+        self.base_dir = base_dir
+        self.run_dir = os.path.join(base_dir, run_id)
+
+    def path(self, stage: str) -> str:
+        """
+        ステージのチェックポイントファイルパスを返す
+        """
+        return os.path.join(self.run_dir, f"{STAGES.index(stage):02d}_{stage}.json.gz")
+
+    def save(self, stage: str, data: Any, created_at: Optional[datetime] = None):
+        """
+        ステージの出力を保存（一時ファイルに書いてから置き換える）
+
+        Args:
+            stage: ステージ名
+            data: ステージの出力
+            created_at: 作成時刻（既定: 現在時刻。リプレイ時の時刻フィルタの基準になる）
+        """
+        os.makedirs(self.run_dir, exist_ok=True)
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            "run_id": self.run_id,
+            "stage": stage,
+            "created_at": created_at or datetime.now().astimezone(),
+            "data": data
+        }
+
+        path = self.path(stage)
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, default=_encode)
+        os.replace(tmp_path, path)
+
+        logger.info(f"Checkpoint saved: {path}")
+
+    def load_payload(self, stage: str) -> Optional[Dict]:
+        """
+        チェックポイントをメタデータ付きで読み込む
+
+        Args:
+            stage: ステージ名
+
+        Returns:
+            version / run_id / stage / created_at / data を含む辞書（存在しない・互換性がない場合はNone）
+        """
+        path = self.path(stage)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                payload = json.load(f, object_hook=_decode)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+        if payload.get("version") != CHECKPOINT_VERSION:
+            logger.warning(f"Ignoring checkpoint {path} with version {payload.get('version')}")
+            return None
+
+        return payload
+
+    def load(self, stage: str) -> Optional[Any]:
+        """
+        ステージの出力を読み込む
+
+        Args:
+            stage: ステージ名
+
+        Returns:
+            ステージの出力（存在しない場合はNone）
+        """
+        payload = self.load_payload(stage)
+        return payload["data"] if payload else None
+
+    def save_skipped(self, skipped: List[Dict]):
+        """
+        収集できなかったソースを保存（raw 以降から再開したとき・シャードを統合したときに結果へ引き継ぐ）
+        """
+        os.makedirs(self.run_dir, exist_ok=True)
+        path = os.path.join(self.run_dir, "skipped.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(skipped, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load_skipped(self) -> List[Dict]:
+        """
+        保存済みの収集できなかったソース（なければ空）
+        """
+        try:
+            with open(os.path.join(self.run_dir, "skipped.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def completed_stages(self) -> List[str]:
+        """
+        読み込み可能なチェックポイントがあるステージを実行順に返す
+        """
+        return [stage for stage in STAGES if self.load_payload(stage) is not None]
+
+    def last_completed_stage(self) -> Optional[str]:
+        """
+        最後に成功したステージを返す
+
+        途中のステージが欠けている場合は、その直前までを有効とみなす。
+        先頭のステージがないラン（シャードを統合して parsed から始まるランなど）は、
+        最初にあるステージから数える。
+        """
+        last = None
+        for stage in STAGES:
+            if self.load_payload(stage) is None:
+                if last:
+                    break
+                continue
+            last = stage
+        return last
+
+    def clear(self):
+        """
+        このランのチェックポイントをすべて削除
+        """
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+
+def _run_date(run_id: str) -> str:
+    """
+    ラン ID の日付（YYYYMMDD で始まらないラン ID はそれ自体を1日分とみなす）
+    """
+    return run_id[:8] if run_id[:8].isdigit() else run_id
+
+
+def prune_checkpoints(base_dir: str = DEFAULT_CHECKPOINT_DIR, keep: int = 14):
+    """
+    古い日のチェックポイントを削除し、新しい日から keep 日分だけ残す
+
+    保持数は本体のランの日付で数える。シャードのチェックポイントは本体のランのディレクトリの下
+    （<ラン ID>/shards/）にあるため保持数には数えず、本体のランと一緒に削除する。
+    同じ日に別のラン ID で実行したランも1日分として数える（バックフィル・評価は日ごとのスナップショットを使う）。
+
+    Args:
+        base_dir: チェックポイントの保存先ディレクトリ
+        keep: 残す日数
+    """
+    if not os.path.isdir(base_dir):
+        return
+
+    run_ids = sorted(
+        name for name in os.listdir(base_dir)
+        if os.path.isdir(os.path.join(base_dir, name))
+    )
+    dates = sorted({_run_date(run_id) for run_id in run_ids})
+    expired = set(dates[:-keep] if keep > 0 else dates)
+
+    for run_id in run_ids:
+        if _run_date(run_id) in expired:
+            shutil.rmtree(os.path.join(base_dir, run_id), ignore_errors=True)
+            logger.info(f"Pruned checkpoints for run {run_id}")
@@ -0,0 +1,598 @@
+"""
+コマンドラインエントリポイント（サブコマンド形式）
+
+使い方:
+    python src/cli.py collect   # ニュース収集のみ
+    python src/cli.py collect --shard 0/4  # 担当ソースのみ収集してチェックポイントに保存
+    python src/cli.py merge --shards 4     # シャードの収集結果を統合（続けて analyze で分析）
+    python src/cli.py analyze   # 収集 + 分析 + レポート生成（従来の analyzer.py と同じ）
+    python src/cli.py analyze --replay 20260404  # 保存済みスナップショットをオフラインで再分析
+    python src/cli.py report    # 保存済みの分析結果からレポートを再生成
+    python src/cli.py history   # 過去の分析結果を一覧表示
+    python src/cli.py publish   # 最新の分析結果を配信フィード・週次ダイジェストに追加
+    python src/cli.py health    # ソースごとの成功率・応答時間・バックオフ状況を表示
+    python src/cli.py backfill  # 過去の分析結果を現在のロジックで再スコアリング
+    python src/cli.py evaluate  # 予備スコアリングの recall@K と候補数ごとのコストを評価
+    python src/cli.py bench     # 収集・ランキングのホットパスを計測してベースラインと比較
+
+起動を速く保つため、feedparser / BeautifulSoup / lxml / pytz / requests などの
+重い依存は、それを必要とするサブコマンドの中でのみインポートする。
+"""
+
+import os
+import sys
+import json
+import glob
+import argparse
+import logging
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_DIR = "output"
+
+# 起動時に読み込んではいけない重い依存
+HEAVY_MODULES = ('feedparser', 'bs4', 'lxml', 'pytz', 'requests')
+
+# bench で計測するモジュール
+BENCH_MODULES = ['cli', 'analyzer', 'news_sources', 'feed_collector', 'x_collector', 'surprise_analyzer']
+
+
+def cmd_collect(args) -> int:
+    """
+    RSS / X から記事を収集してJSONに保存（シャード指定時はチェックポイントに保存）
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    timezone = args.timezone or os.getenv('TIMEZONE', 'Asia/Tokyo')
+    hours_lookback = args.hours or int(os.getenv('HOURS_LOOKBACK', '24'))
+
+    if args.shard or args.shards:
+        return _collect_shards(args, timezone, hours_lookback)
+
+    from feed_collector import FeedCollector
+    from x_collector import XCollector
+    from news_sources import X_SEARCH_KEYWORDS
+    from source_registry import load_registry
+
+    registry = load_registry()
+    collector = FeedCollector(timezone=timezone, hours_lookback=hours_lookback, sources=registry["feeds"])
+    articles = collector.collect_all_feeds()
+
+    x_collector = XCollector(timezone=timezone, hours_lookback=hours_lookback)
+    articles += x_collector.collect_from_search(X_SEARCH_KEYWORDS, max_tweets=50)
+    articles += x_collector.collect_from_rsshub(registry["x_accounts"])
+    logger.info(f"Total articles collected: {len(articles)}")
+
+    output_file = args.output
+    if not output_file:
+        os.makedirs(args.output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file = os.path.join(args.output_dir, f"articles_{timestamp}.json")
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(articles, f, ensure_ascii=False, indent=2, default=str)
+    logger.info(f"Articles saved to: {output_file}")
+
+    return 0
+
+
+def _collect_shards(args, timezone: str, hours_lookback: int) -> int:
+    """
+    1つのシャード（--shard i/N）または全シャードをローカルの並列プロセスで（--shards N）収集
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from pipeline import collect_shard, merge_shards
+    from source_registry import parse_shard
+
+    run_id = args.run_id or _default_run_id(timezone)
+    checkpoint_dir = os.path.join(args.output_dir, "checkpoints")
+    health_file = os.path.join(args.output_dir, "source_health.json")
+    resume = not args.no_resume
+
+    if args.shard:
+        try:
+            index, count = parse_shard(args.shard)
+        except ValueError as e:
+            logger.error(str(e))
+            return 2
+        total = collect_shard(run_id, index, count, timezone, hours_lookback, checkpoint_dir, resume, health_file)
+        logger.info(f"Shard {index}/{count} of run {run_id} collected {total} articles")
+        return 0
+
+    count = args.shards
+    with ProcessPoolExecutor(max_workers=min(count, args.processes or os.cpu_count() or 1)) as executor:
+        futures = [
+            executor.submit(collect_shard, run_id, index, count, timezone, hours_lookback, checkpoint_dir, resume,
+                            health_file)
+            for index in range(count)
+        ]
+        totals = [future.result() for future in futures]
+    logger.info(f"Collected {sum(totals)} articles from {count} shards of run {run_id}")
+
+    return 0 if merge_shards(run_id, count, checkpoint_dir) is not None else 1
+
+
+def _default_run_id(timezone: str) -> str:
+    """
+    既定のラン ID（タイムゾーンでの当日の日付）
+    """
+    import pytz
+    from checkpoint import default_run_id
+
+    return default_run_id(datetime.now(pytz.timezone(timezone)))
+
+
+def cmd_merge(args) -> int:
+    """
+    シャードの収集結果を統合して本体のランの parsed チェックポイントを作成
+    """
+    from dotenv import load_dotenv
+    from pipeline import merge_shards
+
+    load_dotenv()
+    run_id = args.run_id or _default_run_id(os.getenv('TIMEZONE', 'Asia/Tokyo'))
+    merged = merge_shards(
+        run_id, args.shards, os.path.join(args.output_dir, "checkpoints"), allow_partial=args.allow_partial
+    )
+    if merged is None:
+        logger.error(f"Could not merge shards of run {run_id}")
+        return 1
+
+    logger.info(f"Run `analyze --run-id {run_id}` to analyze the merged articles")
+    return 0
+
+
+def cmd_analyze(args) -> int:
+    """
+    収集・分析・レポート生成を一括実行
+    """
+    import analyzer
+
+    try:
+        analyzer.main(
+            run_id=args.run_id,
+            resume=not args.no_resume,
+            replay_run_id=args.replay,
+            output_dir=args.output_dir,
+            profile=args.profile
+        )
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+
+    return 0
+
+
+def cmd_report(args) -> int:
+    """
+    保存済みの分析結果JSONからMarkdownレポートを再生成
+    """
+    from analyzer import load_result, generate_report
+
+    input_file = args.input or _latest_result_file(args.output_dir)
+    if not input_file:
+        logger.error(f"No analysis result found in {args.output_dir}")
+        return 1
+
+    result = load_result(input_file)
+
+    output_file = args.output
+    if not output_file:
+        basename = os.path.basename(input_file).replace('analysis_', 'report_', 1)
+        output_file = os.path.join(os.path.dirname(input_file), os.path.splitext(basename)[0] + '.md')
+
+    generate_report(result, output_file)
+    logger.info(f"Report saved to: {output_file}")
+
+    return 0
+
+
+def cmd_history(args) -> int:
+    """
+    過去の分析結果を新しい順に一覧表示
+    """
+    files = sorted(glob.glob(os.path.join(args.output_dir, 'analysis_*.json')), reverse=True)
+    if args.limit:
+        files = files[:args.limit]
+
+    rows = []
+    for path in files:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable result {path}: {e}")
+            continue
+
+        article = result.get('article') or {}
+        analysis = result.get('analysis') or {}
+        rows.append({
+            "file": os.path.basename(path),
+            "title": analysis.get('title_ja') or article.get('title', ''),
+            "source": article.get('source', ''),
+            "surprise_score": analysis.get('surprise_score'),
+            "fallback": bool(result.get('fallback')),
+        })
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+
+    for row in rows:
+        mark = '*' if row['fallback'] else ' '
+        print(f"{row['file']}  {str(row['surprise_score']):>4}{mark} {row['source']}: {row['title'][:60]}")
+
+    return 0
+
+
+def cmd_publish(args) -> int:
+    """
+    保存済みの分析結果を配信フィード・週次ダイジェストに追加（--all で履歴全体から初期化）
+    """
+    from analyzer import load_result
+    from feed_publisher import FeedPublisher
+
+    if args.all:
+        files = sorted(glob.glob(os.path.join(args.output_dir, 'analysis_*.json')))
+    else:
+        latest = args.input or _latest_result_file(args.output_dir)
+        files = [latest] if latest else []
+    if not files:
+        logger.error(f"No analysis result found in {args.output_dir}")
+        return 1
+
+    publisher = FeedPublisher(os.path.join(args.output_dir, "feeds"), base_url=args.base_url)
+    for path in files:
+        result = load_result(path)
+        timestamp = os.path.splitext(os.path.basename(path))[0].replace('analysis_', '', 1)
+        try:
+            # 作成時刻を記録していない古い結果は、ファイル名のローカル時刻を使う
+            published_at = datetime.fromisoformat(result['created_at']) if result.get('created_at') else \
+                datetime.strptime(timestamp, '%Y%m%d_%H%M%S').astimezone()
+        except ValueError:
+            published_at = datetime.fromtimestamp(os.path.getmtime(path)).astimezone()
+        # analyzer.py と同じラン ID で配信する（同じランの再配信は置き換え）
+        publisher.publish(result, result.get('run_id') or published_at.strftime('%Y%m%d'), published_at)
+
+    logger.info(f"Published {len(files)} results to {publisher.feed_dir}")
+    return 0
+
+
+def cmd_health(args) -> int:
+    """
+    ソースごとの健全性（成功率・応答時間・最後に成功した時刻・バックオフ状況）を表示
+    """
+    from source_health import SourceHealth
+
+    health = SourceHealth(os.path.join(args.output_dir, "source_health.json"))
+
+    if args.reset:
+        for source_id in args.reset:
+            if not health.reset(source_id):
+                logger.error(f"No health record for {source_id}")
+                return 1
+        health.save()
+        logger.info(f"Reset backoff for {', '.join(args.reset)}")
+        return 0
+
+    rows = health.report()
+    if args.failing:
+        rows = [row for row in rows if row['status'] != 'healthy']
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+
+    if not rows:
+        print("No source health records")
+        return 0
+
+    print(f"{'source':<32} {'status':<8} {'success':>7} {'latency':>9} {'fails':>5}  last success / next attempt")
+    for row in rows:
+        rate = f"{row['success_rate'] * 100:.0f}%" if row['success_rate'] is not None else '-'
+        latency = f"{row['latency_ms']:.0f}ms" if row['latency_ms'] is not None else '-'
+        when = (row['last_success'] or 'never')[:16]
+        if row['status'] == 'backoff':
+            when += f" / {row['next_attempt'][:16]}"
+        print(f"{row['source'][:32]:<32} {row['status']:<8} {rate:>7} {latency:>9} {row['consecutive_failures']:>5}  {when}")
+
+    return 0
+
+
+def cmd_backfill(args) -> int:
+    """
+    過去の分析結果を現在のロジックで再スコアリングし、旧選定と比較
+    """
+    from dotenv import load_dotenv
+    from backfill import run_backfill, save_backfill
+
+    load_dotenv()
+    summary = run_backfill(
+        output_dir=args.output_dir,
+        since=args.since,
+        until=args.until,
+        workers=args.workers,
+        use_llm=args.llm,
+        api_key=os.getenv('GROQ_API_KEY') if args.llm else None,
+        hours_lookback=int(os.getenv('HOURS_LOOKBACK', '24')),
+        picks=int(os.getenv('ANALYSIS_PICKS', '1'))
+    )
+
+    report_file = save_backfill(summary, args.output_dir)
+    logger.info(
+        f"Backfilled {summary['files']} results: {summary['changed']} changed, "
+        f"{summary['throughput']} files/s with {summary['workers']} workers"
+    )
+    logger.info(f"Report saved to: {report_file}")
+
+    return 0
+
+
+def cmd_evaluate(args) -> int:
+    """
+    過去の記事プールで予備スコアリングの recall@K と候補数ごとの想定コストを評価
+    """
+    from dotenv import load_dotenv
+    from evaluation import create_judge, run_evaluation, save_evaluation, save_labels
+
+    load_dotenv()
+    try:
+        judge = create_judge(
+            args.judge,
+            labels=args.labels,
+            api_key=os.getenv('GROQ_API_KEY') if args.judge == 'llm' else None,
+            cache_dir=os.path.join(args.output_dir, "llm_cache")
+        )
+        summary = run_evaluation(
+            output_dir=args.output_dir,
+            judge=judge,
+            ks=[int(k) for k in args.ks.split(',')] if args.ks else None,
+            pre_rankers=args.pre_rankers.split(',') if args.pre_rankers else None,
+            since=args.since,
+            until=args.until,
+            snapshots_only=args.snapshots_only,
+            picks=int(os.getenv('ANALYSIS_PICKS', '1')),
+            hours_lookback=int(os.getenv('HOURS_LOOKBACK', '24'))
+        )
+    except (OSError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+
+    for name, rows in summary['metrics'].items():
+        for row in rows:
+            recall = f"{row['recall'] * 100:5.1f}%" if row['recall'] is not None else "  N/A"
+            print(f"{name:<10} K={row['k']:<3} recall {recall}  "
+                  f"~{row['prompt_tokens']} prompt / {row['completion_tokens']} completion tokens, "
+                  f"~{row['latency_seconds']}s")
+
+    if args.save_labels:
+        save_labels(summary, args.save_labels)
+        logger.info(f"Judge picks saved to: {args.save_labels}")
+
+    report_file = save_evaluation(summary, args.output_dir)
+    logger.info(f"Evaluated {summary['runs']} runs with the {summary['judge']} judge")
+    logger.info(f"Report saved to: {report_file}")
+    return 0
+
+
+def cmd_bench(args) -> int:
+    """
+    ホットパスのベンチマーク（--imports の場合はインポート時間）を計測
+    """
+    if args.imports:
+        return _bench_imports(args.modules or BENCH_MODULES)
+
+    import benchmark
+
+    baseline = args.baseline or benchmark.DEFAULT_BASELINE
+    scales = [int(scale) for scale in args.scales.split(',')] if args.scales else None
+    results = benchmark.run_suite(args.only or None, scales)
+    rows = benchmark.compare(results, benchmark.load_baseline(baseline), tolerance=args.tolerance)
+    print(benchmark.format_rows(rows))
+
+    if not args.only or any(name in benchmark.LANGUAGE_BENCHMARKS for name in args.only):
+        for name, accuracy in benchmark.language_accuracy().items():
+            print(f"language accuracy: {name:<24} {accuracy * 100:.1f}%")
+
+    if args.update_baseline:
+        benchmark.save_baseline(results, baseline)
+        logger.info(f"Baseline updated: {baseline}")
+        return 0
+
+    regressions = [row['key'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        logger.error(f"Performance regressions: {', '.join(regressions)}")
+        return 1
+
+    return 0
+
+
+def _bench_imports(modules: List[str]) -> int:
+    """
+    各モジュールのコールドスタート時のインポート時間を計測
+    """
+    print(f"{'module':<20} {'import ms':>10}  heavy deps")
+    for module in modules:
+        timings = measure_import_time(module)
+        total_ms = timings.get(module, 0) / 1000
+        heavy = [name for name in HEAVY_MODULES if name in timings]
+        print(f"{module:<20} {total_ms:>10.1f}  {', '.join(heavy) or '-'}")
+
+    return 0
+
+
+def measure_import_time(module: str, argv: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    `python -X importtime` で新しいプロセスを起動し、各モジュールの累積インポート時間を取得
+
+    Args:
+        module: インポートするモジュール名
+        argv: 指定した場合はモジュールのインポートではなくこの引数でスクリプトを実行
+
+    Returns:
+        モジュール名 -> 累積インポート時間（マイクロ秒）
+    """
+    if argv is None:
+        argv = ['-c', f'import {module}']
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = SRC_DIR + os.pathsep + env.get('PYTHONPATH', '')
+
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + argv,
+        capture_output=True,
+        text=True,
+        cwd=SRC_DIR,
+        env=env
+    )
+
+    return parse_importtime(proc.stderr)
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    `-X importtime` の出力をパース
+
+    Args:
+        stderr: importtime の出力
+
+    Returns:
+        トップレベルパッケージ名およびモジュール名 -> 累積インポート時間（マイクロ秒）
+    """
+    timings = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1].strip())
+        except ValueError:
+            # ヘッダ行（self [us] | cumulative | imported package）
+            continue
+
+        name = parts[2].strip()
+        timings[name] = max(timings.get(name, 0), cumulative)
+        top_level = name.split('.')[0]
+        timings.setdefault(top_level, 0)
+
+    return timings
+
+
+def _latest_result_file(output_dir: str) -> Optional[str]:
+    """
+    最新の analysis_*.json を返す
+    """
+    files = sorted(glob.glob(os.path.join(output_dir, 'analysis_*.json')))
+    return files[-1] if files else None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    引数パーサーを構築
+    """
+    parser = argparse.ArgumentParser(prog='ai-news-analyzer', description='AI News Analyzer')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help='出力ディレクトリ')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    collect = subparsers.add_parser('collect', help='ニュースを収集してJSONに保存')
+    collect.add_argument('--timezone', help='タイムゾーン（既定: 環境変数 TIMEZONE）')
+    collect.add_argument('--hours', type=int, help='何時間前までの記事を取得するか')
+    collect.add_argument('--output', help='出力ファイルパス')
+    sharding = collect.add_mutually_exclusive_group()
+    sharding.add_argument('--shard', metavar='I/N', help='N分割したソースのうち I 番目（0始まり）だけを収集')
+    sharding.add_argument('--shards', type=int, metavar='N', help='N分割した全シャードをローカルで並列に収集して統合')
+    collect.add_argument('--processes', type=int, help='--shards の並列プロセス数（既定: CPUコア数）')
+    collect.add_argument('--run-id', help='シャード収集のラン ID（既定: 当日の日付）')
+    collect.add_argument('--no-resume', action='store_true', help='シャードのチェックポイントを破棄して収集し直す')
+    collect.set_defaults(func=cmd_collect)
+
+    merge = subparsers.add_parser('merge', help='シャードの収集結果を統合')
+    merge.add_argument('--shards', type=int, required=True, metavar='N', help='シャード数')
+    merge.add_argument('--run-id', help='ラン ID（既定: 当日の日付）')
+    merge.add_argument('--allow-partial', action='store_true', help='未完了のシャードがあっても統合する')
+    merge.set_defaults(func=cmd_merge)
+
+    analyze = subparsers.add_parser('analyze', help='収集・分析・レポート生成を実行')
+    analyze.add_argument('--run-id', help='ラン ID（既定: 当日の日付。同じ ID の再実行は途中から再開）')
+    analyze.add_argument('--no-resume', action='store_true', help='チェックポイントを破棄して最初から実行')
+    analyze.add_argument('--replay', metavar='RUN_ID', help='保存済みスナップショットをネットワークなしで再分析')
+    analyze.add_argument('--profile', nargs='?', const='all', choices=['cpu', 'memory', 'all'],
+                         help='ステージごとに cProfile / tracemalloc で計測し output/profile/<ラン ID>/ に保存（既定: all）')
+    analyze.set_defaults(func=cmd_analyze)
+
+    report = subparsers.add_parser('report', help='分析結果JSONからレポートを再生成')
+    report.add_argument('input', nargs='?', help='analysis_*.json（既定: 最新）')
+    report.add_argument('--output', help='出力ファイルパス')
+    report.set_defaults(func=cmd_report)
+
+    history = subparsers.add_parser('history', help='過去の分析結果を一覧表示')
+    history.add_argument('--limit', type=int, default=10, help='表示件数（0で全件）')
+    history.add_argument('--json', action='store_true', help='JSON形式で出力')
+    history.set_defaults(func=cmd_history)
+
+    publish = subparsers.add_parser('publish', help='分析結果を配信フィード・週次ダイジェストに追加')
+    publish.add_argument('input', nargs='?', help='analysis_*.json（既定: 最新）')
+    publish.add_argument('--all', action='store_true', help='全ての分析結果を古い順に追加（初期化用）')
+    publish.add_argument('--base-url', help='フィードを公開するURL（既定: 環境変数 FEED_BASE_URL）')
+    publish.set_defaults(func=cmd_publish)
+
+    health = subparsers.add_parser('health', help='ソースごとの健全性とバックオフ状況を表示')
+    health.add_argument('--failing', action='store_true', help='失敗中・バックオフ中のソースのみ表示')
+    health.add_argument('--json', action='store_true', help='JSON形式で出力')
+    health.add_argument('--reset', nargs='+', metavar='SOURCE_ID', help='指定したソースのバックオフを解除')
+    health.set_defaults(func=cmd_health)
+
+    backfill = subparsers.add_parser('backfill', help='過去の分析結果を現在のロジックで再スコアリング')
+    backfill.add_argument('--since', help='開始日（YYYYMMDD）')
+    backfill.add_argument('--until', help='終了日（YYYYMMDD）')
+    backfill.add_argument('--workers', type=int, help='ワーカープロセス数（既定: CPUコア数）')
+    backfill.add_argument('--llm', action='store_true', help='LLM分析も再実行（応答はキャッシュされる）')
+    backfill.set_defaults(func=cmd_backfill)
+
+    evaluate = subparsers.add_parser('evaluate', help='予備スコアリングの recall@K と候補数ごとのコストを評価')
+    evaluate.add_argument('--judge', choices=['mock', 'labels', 'llm'], default='mock',
+                          help='正解を決める judge（llm は記録済みの応答を使い、APIキーがあれば記録する）')
+    evaluate.add_argument('--labels', help='labels judge の正解JSON（{"YYYYMMDD": "リンク"}）')
+    evaluate.add_argument('--ks', help='評価する候補数（カンマ区切り、既定: 1,3,5,10,20）')
+    evaluate.add_argument('--pre-rankers', help='評価する予備スコアリング（keyword,recency,coverage）')
+    evaluate.add_argument('--since', help='開始日（YYYYMMDD）')
+    evaluate.add_argument('--until', help='終了日（YYYYMMDD）')
+    evaluate.add_argument('--snapshots-only', action='store_true', help='全記事のスナップショットがある日のみ評価')
+    evaluate.add_argument('--save-labels', metavar='PATH', help='judge の選択を labels 形式で保存')
+    evaluate.set_defaults(func=cmd_evaluate)
+
+    bench = subparsers.add_parser('bench', help='収集・ランキングのホットパスを計測してベースラインと比較')
+    bench.add_argument('--scales', help='現在の取得量に対する倍率（カンマ区切り、既定: 1,10,100）')
+    bench.add_argument('--only', nargs='*', help='実行するベンチマーク名')
+    bench.add_argument('--baseline', help='ベースラインJSONのパス（既定: benchmarks/baseline.json）')
+    bench.add_argument('--tolerance', type=float, default=0.3, help='スループット低下の許容割合')
+    bench.add_argument('--update-baseline', action='store_true', help='計測結果をベースラインとして保存')
+    bench.add_argument('--imports', action='store_true', help='代わりにモジュールのインポート時間を計測')
+    bench.add_argument('--modules', nargs='*', help='--imports で計測するモジュール名')
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    CLIのメイン処理
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+実行全体の時間予算（デッドライン）とステージごとの予算
+
+1回の実行の総予算を RunBudget で管理し、各ステージの開始時に残り時間をステージの配分比で分けた
+Deadline を渡す。前のステージが予算を使い切らなかった分は後のステージに回る。
+
+収集側・分析側は Deadline.timeout() でリクエストのタイムアウトを残り時間以下に抑え、
+Deadline.expired() になった時点で未着手の取得を打ち切って、それまでの結果で処理を続ける。
+"""
+
+import time
+import logging
+from typing import Dict, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 既定の総予算（秒）。環境変数 RUN_BUDGET_SECONDS で変更（0 で無制限）
+DEFAULT_RUN_BUDGET = 900
+
+# ステージごとの配分比（残り時間をこの比で後続のステージと分け合う）
+STAGE_SHARES = {
+    'raw': 0.55,
+    'parsed': 0.05,
+    'filtered': 0.05,
+    'candidates': 0.1,
+    'analysis': 0.25,
+}
+
+# リクエストのタイムアウトの下限（秒。残りがわずかでも接続だけは試みる）
+MIN_REQUEST_TIMEOUT = 0.5
+
+
+class Deadline:
+    def __init__(self, seconds: Optional[float] = None, name: str = "run"):
+        """
+        Args:
+            seconds: 予算（秒。Noneなら無制限）
+            name: ログ用の名前
+        """
+        self.name = name
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> float:
+        """
+        残り時間（秒。無制限なら inf、期限切れなら0以下）
+        """
+        if self.expires_at is None:
+            return float('inf')
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, default: float) -> float:
+        """
+        リクエストのタイムアウト（default と残り時間の小さい方）
+
+        requests のタイムアウトは接続・読み込みそれぞれの待ち時間のため、1回のリクエストが
+        これを少し超えることはある。
+        """
+        return max(min(default, self.remaining()), MIN_REQUEST_TIMEOUT)
+
+    def caps(self, default: float) -> bool:
+        """
+        timeout(default) が残り時間で短縮されるかどうか
+
+        短縮したタイムアウトで失敗し、そのまま期限切れになったリクエストは、ソースの障害ではなく
+        予算切れとして扱う（健全性の失敗に数えない）。
+        """
+        return self.remaining() < default
+
+    def child(self, fraction: float, name: Optional[str] = None) -> 'Deadline':
+        """
+        残り時間の一部を予算とする Deadline（1つのステージ内で複数の処理に予算を分けるときに使う）
+        """
+        if self.expires_at is None:
+            return Deadline(None, name or self.name)
+        return Deadline(max(self.remaining(), 0.0) * fraction, name or self.name)
+
+
+class RunBudget:
+    def __init__(self, total_seconds: Optional[float] = None, shares: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            total_seconds: 実行全体の予算（秒。Noneなら無制限）
+            shares: ステージ名 -> 配分比（既定: STAGE_SHARES）
+        """
+        self.total_seconds = total_seconds
+        self.shares = shares or STAGE_SHARES
+        self.deadline = Deadline(total_seconds)
+
+    def stage(self, name: str) -> Deadline:
+        """
+        ステージの予算を割り当てる（残り時間のうち、このステージと後続のステージの配分比で按分した分）
+
+        Args:
+            name: ステージ名
+
+        Returns:
+            ステージの Deadline（実行全体のデッドラインを超えない）
+        """
+        if self.total_seconds is None:
+            return Deadline(None, name)
+
+        stages = list(self.shares)
+        following = stages[stages.index(name):] if name in self.shares else [name]
+        share = self.shares.get(name, 0.0)
+        total_share = sum(self.shares.get(stage, 0.0) for stage in following)
+
+        remaining = max(self.deadline.remaining(), 0.0)
+        seconds = remaining * share / total_share if total_share else remaining
+        logger.info(f"Stage '{name}' budget: {seconds:.1f}s (run remaining: {remaining:.1f}s)")
+        return Deadline(seconds, name)
+
+
+def unlimited() -> Deadline:
+    """
+    無制限の Deadline（予算を指定しない呼び出し用）
+    """
+    return Deadline(None)
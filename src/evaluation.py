@@ -0,0 +1,359 @@
+"""
+予備スコアリングの評価（候補数 K ごとの recall とコスト）
+
+過去の実行の記事プール（同じ日のチェックポイントがあれば全記事、なければ保存済みの候補）を再生し、
+「全記事を見た judge が選ぶ記事」が予備スコアリングの上位 K 件に残る割合（recall@K）と、
+K 件を分析するときの想定入力・出力トークン数とレイテンシを計算する。
+候補数と予備スコアリングの方式を、データに基づいて決めるために使う。
+
+judge:
+    mock   - ローカルの決定的なヒューリスティック（APIを使わない。集計の確認用）
+    labels - 記録済みの正解（JSON: {"<日付 YYYYMMDD>": "<リンク>" または [リンク, ...]}）
+    llm    - 全ストーリーを候補としてLLMに選ばせる（応答は output/llm_cache に記録され、
+             APIキーがなければ記録済みの応答のみで判定する）
+
+プールが保存済みの候補だけの日は、K が候補数以上なら必ず残るため、`snapshots_only` で除外できる。
+"""
+
+import os
+import json
+import heapq
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_KS = [1, 3, 5, 10, 20]
+
+# 1トークンあたりの文字数の目安（英語・日本語混在。過去の llm_usage があれば実測値で補正する）
+CHARS_PER_TOKEN = 3.0
+
+# レイテンシの見積もり（Groq の 70B モデルの目安）
+LATENCY_BASE_SECONDS = 0.5
+PREFILL_TOKENS_PER_SECOND = 3000
+DECODE_TOKENS_PER_SECOND = 250
+
+
+def _rank_keyword(analyzer, stories: List[Dict], k: int) -> List[Dict]:
+    return analyzer._select_candidates(stories, k)
+
+
+def _rank_recency(analyzer, stories: List[Dict], k: int) -> List[Dict]:
+    from surprise_analyzer import _recency
+
+    return heapq.nlargest(k, stories, key=_recency)
+
+
+def _rank_coverage(analyzer, stories: List[Dict], k: int) -> List[Dict]:
+    from surprise_analyzer import _recency
+
+    return heapq.nlargest(
+        k, stories,
+        key=lambda story: (story.get('coverage_breadth', 1), story.get('story_size', 1), _recency(story))
+    )
+
+
+# 予備スコアリングの方式（名前 -> (analyzer, ストーリー, K) -> 上位 K 件）
+PRE_RANKERS: Dict[str, Callable] = {
+    "keyword": _rank_keyword,
+    "recency": _rank_recency,
+    "coverage": _rank_coverage,
+}
+
+
+def _story_links(story: Dict) -> set:
+    """
+    ストーリーに含まれる記事のリンク（代表記事と related）
+    """
+    return {story.get('link')} | {related.get('link') for related in story.get('related', [])}
+
+
+class MockJudge:
+    name = "mock"
+
+    def __init__(self):
+        """
+        ローカルの決定的な judge（本文を含む全文のキーワード・報道の広がり・新しさで選ぶ）
+        """
+        from news_sources import SURPRISE_KEYWORDS
+
+        self.keywords = [(keyword.lower(), points) for keyword, points in SURPRISE_KEYWORDS.items()]
+
+    def choose(self, date: str, stories: List[Dict]) -> Optional[List[str]]:
+        from surprise_analyzer import _recency
+
+        def score(story: Dict):
+            text = f"{story.get('title', '')} {story.get('summary', '')} {story.get('content', '')}".lower()
+            keyword_score = sum(points for keyword, points in self.keywords if keyword in text)
+            return keyword_score + 5 * (story.get('coverage_breadth', 1) - 1), _recency(story)
+
+        return [max(stories, key=score)['link']] if stories else None
+
+
+class LabelsJudge:
+    name = "labels"
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 記録済みの正解のJSON（{"<日付>": "<リンク>" または [リンク, ...]}）
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            self.labels = json.load(f)
+
+    def choose(self, date: str, stories: List[Dict]) -> Optional[List[str]]:
+        label = self.labels.get(date)
+        if not label:
+            return None
+        return [label] if isinstance(label, str) else list(label)
+
+
+class LLMJudge:
+    name = "llm"
+
+    def __init__(self, api_key: Optional[str], cache_dir: str):
+        """
+        Args:
+            api_key: Groq APIキー（Noneなら記録済みの応答のみで判定）
+            cache_dir: LLM応答の記録先
+        """
+        from surprise_analyzer import SurpriseAnalyzer
+
+        self.analyzer = SurpriseAnalyzer(api_key=api_key, cache_dir=cache_dir)
+
+    def choose(self, date: str, stories: List[Dict]) -> Optional[List[str]]:
+        if not stories:
+            return None
+        result = self.analyzer._analyze_with_claude(stories)
+        # 記録がなくAPIも呼べなかった日は判定できないため除外する
+        if result.get('fallback') or not result.get('article'):
+            return None
+        return [result['article']['link']]
+
+
+def create_judge(name: str, labels: Optional[str] = None, api_key: Optional[str] = None,
+                 cache_dir: Optional[str] = None):
+    """
+    judge を作成
+
+    Raises:
+        ValueError: 不明な judge、または labels judge でファイルが指定されていない
+    """
+    if name == "mock":
+        return MockJudge()
+    if name == "labels":
+        if not labels:
+            raise ValueError("The labels judge requires a labels file")
+        return LabelsJudge(labels)
+    if name == "llm":
+        return LLMJudge(api_key, cache_dir or os.path.join("output", "llm_cache"))
+    raise ValueError(f"Unknown judge '{name}' (expected mock, labels or llm)")
+
+
+def _prompt_chars(analyzer, candidates: List[Dict]) -> int:
+    """
+    候補を分析するときのプロンプトの文字数（システムメッセージを含む）
+    """
+    messages = analyzer._create_messages(analyzer._format_candidates(candidates))
+    return sum(len(message['content']) for message in messages)
+
+
+def _calibrate(analyzer, results: List[Dict]) -> Dict:
+    """
+    過去の llm_usage（現在と同じプロンプトのバージョンのみ）から文字数あたりのトークン数と出力トークン数を求める
+    """
+    from surprise_analyzer import PROMPT_VERSION, TOKENS_PER_PICK
+
+    chars = prompt_tokens = 0
+    completions = []
+    for result in results:
+        usage = result.get('llm_usage') or {}
+        if usage.get('prompt_version') != PROMPT_VERSION or not usage.get('prompt_tokens'):
+            continue
+        chars += _prompt_chars(analyzer, result.get('all_candidates', []))
+        prompt_tokens += usage['prompt_tokens']
+        completions.append(usage.get('completion_tokens', 0))
+
+    return {
+        "chars_per_token": round(chars / prompt_tokens, 3) if prompt_tokens else CHARS_PER_TOKEN,
+        "completion_tokens": round(sum(completions) / len(completions)) if completions
+        else TOKENS_PER_PICK * analyzer.picks,
+        "calibrated_runs": len(completions),
+    }
+
+
+def _latency(prompt_tokens: float, completion_tokens: float) -> float:
+    """
+    1回の分析の想定レイテンシ（秒）
+    """
+    return (LATENCY_BASE_SECONDS + prompt_tokens / PREFILL_TOKENS_PER_SECOND
+            + completion_tokens / DECODE_TOKENS_PER_SECOND)
+
+
+def run_evaluation(output_dir: str = "output", judge=None, ks: Optional[List[int]] = None,
+                   pre_rankers: Optional[List[str]] = None, since: Optional[str] = None,
+                   until: Optional[str] = None, snapshots_only: bool = False, picks: int = 1,
+                   hours_lookback: int = 24) -> Dict:
+    """
+    過去の記事プールを再生し、予備スコアリングの recall@K と K ごとの想定コストを計算
+
+    Args:
+        output_dir: 出力ディレクトリ（analysis_*.json とチェックポイントの場所）
+        judge: judge（既定: MockJudge）
+        ks: 評価する候補数
+        pre_rankers: 評価する予備スコアリングの方式（既定: すべて）
+        since: 開始日
+        until: 終了日
+        snapshots_only: Trueならチェックポイントの全記事がある日のみ評価
+        picks: 選定件数（出力トークン数の見積もりに使う）
+        hours_lookback: スナップショットに適用する取得対象期間
+
+    Returns:
+        metrics（方式 -> K ごとの recall とコスト）・rows（日ごとの judge の選択と順位）・サマリ
+    """
+    from analyzer import load_result
+    from backfill import RESULT_FILE_PATTERN, list_result_files, load_pool
+    from feed_collector import FeedCollector
+    from story_cluster import cluster_stories
+    from surprise_analyzer import SurpriseAnalyzer
+
+    judge = judge or MockJudge()
+    ks = sorted(set(ks or DEFAULT_KS))
+    pre_rankers = pre_rankers or list(PRE_RANKERS)
+    unknown = [name for name in pre_rankers if name not in PRE_RANKERS]
+    if unknown:
+        raise ValueError(f"Unknown pre-rankers: {', '.join(unknown)}")
+
+    collector = FeedCollector(hours_lookback=hours_lookback)
+    analyzer = SurpriseAnalyzer(api_key=None, picks=picks)
+    checkpoint_dir = os.path.join(output_dir, "checkpoints")
+
+    results = []
+    rows = []
+    prompt_chars = {name: {k: 0 for k in ks} for name in pre_rankers}
+    for path in list_result_files(output_dir, since, until):
+        result = load_result(path)
+        results.append(result)
+        pool = load_pool(path, result, collector, checkpoint_dir, hours_lookback)
+        if snapshots_only and pool["kind"] != "snapshot":
+            continue
+
+        date = RESULT_FILE_PATTERN.search(os.path.basename(path)).group(1)
+        ai_articles = [dict(article) for article in pool["articles"] if collector.is_ai_related(article)]
+        stories = cluster_stories(ai_articles)
+        chosen = judge.choose(date, stories) if stories else None
+        if not chosen:
+            logger.info(f"{date}: no judge decision, skipped")
+            continue
+
+        ranks = {}
+        for name in pre_rankers:
+            ranked = PRE_RANKERS[name](analyzer, stories, max(ks))
+            ranks[name] = next(
+                (rank for rank, story in enumerate(ranked, 1) if _story_links(story) & set(chosen)), None
+            )
+            for k in ks:
+                prompt_chars[name][k] += _prompt_chars(analyzer, ranked[:k])
+
+        rows.append({
+            "date": date,
+            "pool": pool["kind"],
+            "stories": len(stories),
+            "judge_pick": chosen[0],
+            "ranks": ranks,
+        })
+
+    calibration = _calibrate(analyzer, results)
+    metrics = {}
+    for name in pre_rankers:
+        metrics[name] = []
+        for k in ks:
+            hits = sum(1 for row in rows if row["ranks"][name] is not None and row["ranks"][name] <= k)
+            prompt_tokens = prompt_chars[name][k] / calibration["chars_per_token"] / len(rows) if rows else 0
+            completion_tokens = calibration["completion_tokens"]
+            metrics[name].append({
+                "k": k,
+                "hits": hits,
+                "recall": round(hits / len(rows), 3) if rows else None,
+                "prompt_tokens": round(prompt_tokens),
+                "completion_tokens": completion_tokens,
+                "latency_seconds": round(_latency(prompt_tokens, completion_tokens), 2),
+            })
+
+    return {
+        "judge": judge.name,
+        "since": since,
+        "until": until,
+        "ks": ks,
+        "runs": len(rows),
+        "snapshot_runs": sum(1 for row in rows if row["pool"] == "snapshot"),
+        "calibration": calibration,
+        "metrics": metrics,
+        "rows": rows,
+    }
+
+
+def format_report(summary: Dict) -> str:
+    """
+    評価結果をMarkdownで生成
+
+    Args:
+        summary: run_evaluation() の戻り値
+
+    Returns:
+        Markdown文字列
+    """
+    calibration = summary['calibration']
+    report = f"""# 予備スコアリング評価レポート
+
+生成日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+- **judge**: {summary['judge']}
+- **対象期間**: {summary['since'] or '最初'} 〜 {summary['until'] or '最新'}
+- **評価した日数**: {summary['runs']}（うち全記事のスナップショット {summary['snapshot_runs']}）
+- **トークンの見積もり**: {calibration['chars_per_token']} 文字/トークン、出力 {calibration['completion_tokens']} トークン（実測 {calibration['calibrated_runs']} 回から補正）
+
+| 予備スコアリング | K | recall@K | 入力トークン/回 | 出力トークン/回 | 想定レイテンシ |
+|------------------|---|----------|-----------------|-----------------|----------------|
+"""
+    for name, rows in summary['metrics'].items():
+        for row in rows:
+            recall = f"{row['recall'] * 100:.1f}%" if row['recall'] is not None else "N/A"
+            report += (
+                f"| {name} | {row['k']} | {recall} | {row['prompt_tokens']} | {row['completion_tokens']} | "
+                f"{row['latency_seconds']} 秒 |\n"
+            )
+
+    return report
+
+
+def save_labels(summary: Dict, path: str):
+    """
+    judge の選択を labels judge で使える形式で保存（LLM judge の判定を固定するのに使う）
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({row["date"]: row["judge_pick"] for row in summary["rows"]}, f, ensure_ascii=False, indent=2)
+
+
+def save_evaluation(summary: Dict, output_dir: str = "output") -> str:
+    """
+    評価結果をJSONとMarkdownで保存
+
+    Returns:
+        Markdownレポートのパス
+    """
+    evaluation_dir = os.path.join(output_dir, "evaluation")
+    os.makedirs(evaluation_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    with open(os.path.join(evaluation_dir, f"evaluation_{timestamp}.json"), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+
+    report_file = os.path.join(evaluation_dir, f"evaluation_{timestamp}.md")
+    with open(report_file, 'w', encoding='utf-8') as f:
+        f.write(format_report(summary))
+
+    return report_file
@@ -5,27 +5,79 @@ RSSフィードからニュース記事を収集
 import feedparser
 import requests
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 import pytz
 from bs4 import BeautifulSoup
+import time
 import logging
 
-from news_sources import NEWS_SOURCES, AI_KEYWORDS
+from news_sources import AI_KEYWORDS
+from stream_parser import iter_feed_entries, StreamParseError
+from language_detector import label_articles
+from source_registry import load_registry, slugify
+from deadline import Deadline, unlimited
+from source_health import SourceHealth
+from profiling import profiled
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# ストリーミング解析時の受信チャンクサイズ（バイト）
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# ストリーミング解析時、取得対象期間より古いエントリがこの件数続いたら打ち切る
+# （フィードは基本的に新しい順だが、固定表示などで順序が乱れる場合がある）
+STREAM_STALE_LIMIT = 3
+
+
+def remove_duplicates(articles: List[Dict]) -> List[Dict]:
+    """
+    URLベースで重複記事を除去（最初に現れた記事を残す）
+
+    Args:
+        articles: 記事のリスト
+
+    Returns:
+        重複除去後の記事のリスト
+    """
+    seen_urls = set()
+    unique_articles = []
+
+    for article in articles:
+        if article["link"] not in seen_urls:
+            seen_urls.add(article["link"])
+            unique_articles.append(article)
+
+    return unique_articles
+
 
 class FeedCollector:
-    def __init__(self, timezone: str = "Asia/Tokyo", hours_lookback: int = 24):
+    def __init__(self, timezone: str = "Asia/Tokyo", hours_lookback: int = 24, request_timeout: float = 30,
+                 stream: bool = False, max_entries_per_source: Optional[int] = None,
+                 sources: Optional[List[Dict]] = None, health: Optional[SourceHealth] = None):
         """
         Args:
             timezone: タイムゾーン (例: "Asia/Tokyo")
             hours_lookback: 何時間前までの記事を取得するか
+            request_timeout: フィード取得のタイムアウト（秒）
+            stream: Trueの場合は全ソースをストリーミング解析（ソースごとに "stream": True でも指定可能）
+            max_entries_per_source: ストリーミング解析時のソースあたりの最大件数（ソースの "max_entries" が優先）
+            sources: 収集するフィード（既定: ソースレジストリの全フィード）
+            health: ソースの健全性の記録（指定した場合、失敗し続けるソースはバックオフ中の取得を見送る）
         """
         self.timezone = pytz.timezone(timezone)
         self.hours_lookback = hours_lookback
+        self.request_timeout = request_timeout
+        self.stream = stream
+        self.max_entries_per_source = max_entries_per_source
+        self.sources = sources if sources is not None else load_registry()["feeds"]
         self.cutoff_time = datetime.now(self.timezone) - timedelta(hours=hours_lookback)
+        self.health = health
+        # 直前の取得で収集できなかったソース（{"source", "reason"}。reason は "deadline" / "backoff" / "error"）
+        self.skipped_sources: List[Dict] = []
+        self._last_error: Optional[str] = None
+        # 直前の取得が期限の残り時間で短縮したタイムアウトのまま期限切れになったか
+        self._cut_short = False
 
     def collect_all_feeds(self) -> List[Dict]:
         """
@@ -34,19 +86,8 @@ class FeedCollector:
         Returns:
             記事のリスト
         """
-        all_articles = []
-
-        # 英語ソース
-        for source in NEWS_SOURCES["english"]:
-            articles = self._collect_from_source(source)
-            all_articles.extend(articles)
-            logger.info(f"Collected {len(articles)} articles from {source['name']}")
-
-        # 日本語ソース
-        for source in NEWS_SOURCES["japanese"]:
-            articles = self._collect_from_source(source)
-            all_articles.extend(articles)
-            logger.info(f"Collected {len(articles)} articles from {source['name']}")
+        raw_feeds = self.fetch_raw_feeds()
+        all_articles = self.parse_raw_feeds(raw_feeds)
 
         # 時刻でフィルタリング
         recent_articles = self._filter_by_time(all_articles)
@@ -58,6 +99,67 @@ class FeedCollector:
 
         return unique_articles
 
+    @profiled()
+    def fetch_raw_feeds(self, deadline: Optional[Deadline] = None) -> List[Dict]:
+        """
+        全ソースからフィード本文（未解析）を取得
+
+        Args:
+            deadline: 取得の期限（過ぎたら残りのソースは取得せず skipped_sources に記録）
+
+        Returns:
+            {"source": ソース情報, "content": フィード本文(bytes)} のリスト
+            （ストリーミング解析するソースは本文を保持せず、"articles" に解析済みの記事を持つ）
+        """
+        deadline = deadline or unlimited()
+        raw_feeds = []
+        self.skipped_sources = []
+
+        for source in self.sources:
+            if deadline.expired():
+                self.skipped_sources.append({"source": source["name"], "reason": "deadline"})
+                continue
+
+            if self.health and not self.health.should_attempt(self._source_id(source)):
+                self.skipped_sources.append({"source": source["name"], "reason": "backoff"})
+                continue
+
+            raw = self._fetch_raw(source, deadline)
+            if raw is not None:
+                raw_feeds.append(raw)
+            else:
+                reason = "deadline" if self._cut_short else "error"
+                self.skipped_sources.append({"source": source["name"], "reason": reason})
+
+        if self.skipped_sources:
+            logger.warning(f"Skipped {len(self.skipped_sources)} of {len(self.sources)} feeds")
+
+        return raw_feeds
+
+    @profiled()
+    def parse_raw_feeds(self, raw_feeds: List[Dict]) -> List[Dict]:
+        """
+        取得済みのフィード本文を解析して記事に変換
+
+        Args:
+            raw_feeds: fetch_raw_feeds() の戻り値
+
+        Returns:
+            記事のリスト（時刻フィルタ・重複削除前）
+        """
+        all_articles = []
+
+        for raw in raw_feeds:
+            if "articles" in raw:
+                articles = raw["articles"]
+            else:
+                articles = self._parse_feed(raw["source"], raw["content"])
+            all_articles.extend(articles)
+            logger.info(f"Collected {len(articles)} articles from {raw['source']['name']}")
+
+        # ソースの言語をヒントに、記事ごとの言語を全ソースまとめて判定
+        return label_articles(all_articles, use_source_hint=True)
+
     def _collect_from_source(self, source: Dict) -> List[Dict]:
         """
         単一ソースから記事を収集
@@ -68,46 +170,224 @@ class FeedCollector:
         Returns:
             記事のリスト
         """
+        if self.health and not self.health.should_attempt(self._source_id(source)):
+            logger.info(f"Skipping {source['name']} (backing off after repeated failures)")
+            return []
+
+        raw = self._fetch_raw(source, unlimited())
+        if raw is None:
+            articles = []
+        elif "articles" in raw:
+            articles = raw["articles"]
+        else:
+            articles = self._parse_feed(source, raw["content"])
+
+        return label_articles(articles, use_source_hint=True)
+
+    def _source_id(self, source: Dict) -> str:
+        """
+        健全性の記録に使うソース ID（レジストリの ID、なければ名前から生成）
+        """
+        return source.get("id") or slugify(source["name"])
+
+    def _fetch_raw(self, source: Dict, deadline: Deadline) -> Optional[Dict]:
+        """
+        単一ソースを取得し、結果と応答時間を健全性の記録に反映
+
+        期限の残り時間で短縮したタイムアウトのまま期限切れで失敗した場合は、健全性の失敗に数えない。
+
+        Returns:
+            fetch_raw_feeds() の要素（取得失敗時はNone）
+        """
+        self._last_error = None
+        capped = deadline.caps(self.request_timeout)
+        started = time.monotonic()
+
+        if self._should_stream(source):
+            articles = self._stream_source(source, deadline)
+            raw = {"source": source, "articles": articles} if articles is not None else None
+        else:
+            content = self._fetch_source(source, deadline.timeout(self.request_timeout))
+            raw = {"source": source, "content": content} if content is not None else None
+
+        self._cut_short = raw is None and capped and deadline.expired()
+        if self._cut_short:
+            logger.warning(f"Fetching {source['name']} ran out of the deadline, not counting it as a failure")
+
+        if self.health:
+            latency = time.monotonic() - started
+            if raw is not None:
+                self.health.record_success(self._source_id(source), latency)
+            elif not self._cut_short:
+                self.health.record_failure(self._source_id(source), self._last_error or "fetch failed", latency)
+
+        return raw
+
+    def _should_stream(self, source: Dict) -> bool:
+        """
+        ソースをストリーミング解析するかどうか
+        """
+        return bool(source.get("stream", self.stream))
+
+    def _stream_source(self, source: Dict, deadline: Optional[Deadline] = None) -> Optional[List[Dict]]:
+        """
+        単一ソースをストリーミング解析で収集
+
+        エントリを1件ずつ処理し、取得対象期間より古いエントリが続いた時点、
+        ソースあたりの最大件数に達した時点、または期限を過ぎた時点で受信を打ち切る。
+        不正なXMLの場合は feedparser による通常の解析にフォールバックする。
+
+        Args:
+            source: ソース情報 (name, url, language, max_entries)
+            deadline: 取得の期限（過ぎたらそれまでに解析した記事を返す）
+
+        Returns:
+            記事のリスト（取得失敗時はNone）
+        """
+        deadline = deadline or unlimited()
+        max_entries = source.get("max_entries", self.max_entries_per_source)
         articles = []
+        stale = 0
 
         try:
-            # RSSフィードを取得
-            feed = feedparser.parse(source["url"])
+            response = requests.get(
+                source["url"],
+                headers={"User-Agent": feedparser.USER_AGENT},
+                timeout=deadline.timeout(self.request_timeout),
+                stream=True
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Error collecting from {source['name']}: {str(e)}")
+            self._last_error = str(e)
+            return None
 
-            for entry in feed.entries:
-                # 必須フィールドの存在確認
-                if not hasattr(entry, 'title') or not hasattr(entry, 'link'):
+        try:
+            for entry in iter_feed_entries(response.iter_content(chunk_size=STREAM_CHUNK_SIZE)):
+                article = self._entry_to_article(source, entry)
+                if not article:
                     continue
 
-                # 公開日時を取得
-                published_date = self._parse_date(entry)
-                if not published_date:
-                    # 日時が取得できない場合は現在時刻とする
-                    published_date = datetime.now(self.timezone)
-
-                # 要約/説明を取得
-                summary = ""
-                if hasattr(entry, 'summary'):
-                    summary = self._clean_html(entry.summary)
-                elif hasattr(entry, 'description'):
-                    summary = self._clean_html(entry.description)
-
-                article = {
-                    "title": entry.title,
-                    "link": entry.link,
-                    "published": published_date,
-                    "summary": summary,
-                    "source": source["name"],
-                    "language": source["language"]
-                }
+                if article["published"] < self.cutoff_time:
+                    stale += 1
+                    if stale >= STREAM_STALE_LIMIT:
+                        break
+                    continue
+                stale = 0
 
                 articles.append(article)
+                if max_entries and len(articles) >= max_entries:
+                    break
+                if deadline.expired():
+                    logger.warning(f"Deadline reached while streaming {source['name']}, keeping {len(articles)} entries")
+                    break
+
+        except StreamParseError as e:
+            logger.warning(f"Streaming parse failed for {source['name']} ({e}), falling back to feedparser")
+            if deadline.expired():
+                return articles
+            content = self._fetch_source(source, deadline.timeout(self.request_timeout))
+            return self._parse_feed(source, content) if content is not None else None
+
+        except Exception as e:
+            logger.error(f"Error collecting from {source['name']}: {str(e)}")
+            self._last_error = str(e)
+            return None
+
+        finally:
+            response.close()
+
+        return articles
+
+    def _fetch_source(self, source: Dict, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        単一ソースのフィード本文を取得
+
+        Args:
+            source: ソース情報 (name, url, language)
+            timeout: タイムアウト（秒。既定: request_timeout）
+
+        Returns:
+            フィード本文（取得失敗時はNone）
+        """
+        try:
+            response = requests.get(
+                source["url"],
+                headers={"User-Agent": feedparser.USER_AGENT},
+                timeout=timeout or self.request_timeout
+            )
+            response.raise_for_status()
+            return response.content
 
         except Exception as e:
             logger.error(f"Error collecting from {source['name']}: {str(e)}")
+            self._last_error = str(e)
+            return None
+
+    def _parse_feed(self, source: Dict, content: bytes) -> List[Dict]:
+        """
+        フィード本文を解析して記事に変換
+
+        Args:
+            source: ソース情報 (name, url, language)
+            content: フィード本文
+
+        Returns:
+            記事のリスト
+        """
+        articles = []
+
+        try:
+            # RSSフィードを解析
+            feed = feedparser.parse(content)
+
+            for entry in feed.entries:
+                article = self._entry_to_article(source, entry)
+                if article:
+                    articles.append(article)
+
+        except Exception as e:
+            logger.error(f"Error parsing feed from {source['name']}: {str(e)}")
 
         return articles
 
+    def _entry_to_article(self, source: Dict, entry) -> Optional[Dict]:
+        """
+        フィードのエントリを記事に変換
+
+        Args:
+            source: ソース情報 (name, url, language)
+            entry: feedparser またはストリーミングパーサのエントリ
+
+        Returns:
+            記事（必須フィールドがない場合はNone）
+        """
+        # 必須フィールドの存在確認
+        if not hasattr(entry, 'title') or not hasattr(entry, 'link'):
+            return None
+
+        # 公開日時を取得
+        published_date = self._parse_date(entry)
+        if not published_date:
+            # 日時が取得できない場合は現在時刻とする
+            published_date = datetime.now(self.timezone)
+
+        # 要約/説明を取得
+        summary = ""
+        if hasattr(entry, 'summary'):
+            summary = self._clean_html(entry.summary)
+        elif hasattr(entry, 'description'):
+            summary = self._clean_html(entry.description)
+
+        return {
+            "title": entry.title,
+            "link": entry.link,
+            "published": published_date,
+            "summary": summary,
+            "source": source["name"],
+            "language": source["language"]
+        }
+
     def _parse_date(self, entry) -> datetime:
         """
         RSSエントリから日時を解析
@@ -176,15 +456,7 @@ class FeedCollector:
         Returns:
             重複除去後の記事のリスト
         """
-        seen_urls = set()
-        unique_articles = []
-
-        for article in articles:
-            if article["link"] not in seen_urls:
-                seen_urls.add(article["link"])
-                unique_articles.append(article)
-
-        return unique_articles
+        return remove_duplicates(articles)
 
     def is_ai_related(self, article: Dict) -> bool:
         """
@@ -0,0 +1,275 @@
+"""
+選定結果の配信フィード（JSON Feed / RSS）と週次ダイジェストの生成
+
+output/ の全履歴から毎回作り直すのではなく、差分で更新する:
+    - feeds/items.json に直近 FEED_WINDOW 件だけを保持し、新しい選定を追加して feed.json / feed.xml を書き直す
+    - 週次ダイジェストは選定が属する週（ISO週）の digests/<年>-W<週>.json / .md だけを書き直す
+
+ANALYSIS_PICKS で複数件を選定した場合は、picks の全件を順位順に項目にする（1位の項目 ID は1件選定の場合と同じ）。
+同じラン ID の再実行はそのランの項目をすべて置き換えるため、再実行しても重複しない。
+履歴の長さに関わらず、1回の配信で読み書きするのはフィードの窓と1週間分のみ。
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+from email.utils import format_datetime
+from typing import Dict, List, Optional
+from xml.etree import ElementTree
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEED_DIR = os.path.join("output", "feeds")
+
+# フィードに載せる項目数
+FEED_WINDOW = 30
+
+FEED_TITLE = "AI News Analyzer - 今日のサプライズニュース"
+FEED_DESCRIPTION = "毎日選定される、サプライズ度の高いAIニュース"
+DEFAULT_HOME_PAGE = "https://github.com/awano27/ai-news-analyzer"
+
+
+def build_items(result: Dict, run_id: str, published_at: datetime) -> List[Dict]:
+    """
+    分析結果の選定（picks。なければ article / analysis の1件）からフィードの項目を作成
+
+    Args:
+        result: 分析結果
+        run_id: ラン ID
+        published_at: 選定日時（タイムゾーン付き）
+
+    Returns:
+        フィードの項目のリスト（順位順）
+    """
+    picks = result.get('picks') or [{"rank": 1, "article": result['article'], "analysis": result.get('analysis')}]
+    return [
+        build_item(pick['article'], pick.get('analysis') or {}, run_id, published_at, rank=pick.get('rank', 1),
+                   fallback=bool(result.get('fallback')))
+        for pick in picks
+    ]
+
+
+def build_item(article: Dict, analysis: Dict, run_id: str, published_at: datetime, rank: int = 1,
+               fallback: bool = False) -> Dict:
+    """
+    選定した記事からフィードの項目（JSON Feed 1.1 の item 形式）を作成
+
+    Args:
+        article: 選定した記事
+        analysis: その記事の分析
+        run_id: ラン ID（項目の ID になる。2位以降は順位を付ける）
+        published_at: 選定日時（タイムゾーン付き）
+        rank: 選定の順位
+        fallback: キーワードスコアによる選定かどうか
+
+    Returns:
+        フィードの項目
+    """
+    summary = analysis.get('summary') or article.get('summary', '')
+    reasons = analysis.get('surprise_reasons') or []
+
+    content = summary
+    if reasons:
+        content += "\n\nなぜサプライズか:\n" + "\n".join(f"- {reason}" for reason in reasons)
+
+    return {
+        "id": f"ai-news-analyzer:{run_id}" if rank == 1 else f"ai-news-analyzer:{run_id}:{rank}",
+        "url": article['link'],
+        "title": analysis.get('title_ja') or article['title'],
+        "summary": summary,
+        "content_text": content,
+        "date_published": published_at.isoformat(),
+        "tags": [article.get('source', '')],
+        "_ai_news_analyzer": {
+            "run_id": run_id,
+            "rank": rank,
+            "source": article.get('source', ''),
+            "original_title": article['title'],
+            "surprise_score": analysis.get('surprise_score'),
+            "fallback": fallback,
+        },
+    }
+
+
+def _write_atomic(path: str, text: str):
+    """
+    一時ファイルに書いてから置き換える（配信中のファイルが壊れた状態で読まれないように）
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _read_items(path: str) -> List[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable feed state {path}: {e}")
+        return []
+
+
+def _meta(item: Dict) -> Dict:
+    return item.get('_ai_news_analyzer', {})
+
+
+def _upsert(items: List[Dict], new_items: List[Dict]) -> List[Dict]:
+    """
+    同じランの項目を置き換えて追加し、新しい順（同じランの中は順位順）に並べる
+    """
+    run_ids = {_meta(item).get('run_id') for item in new_items}
+    ids = {item['id'] for item in new_items}
+    items = [
+        existing for existing in items
+        if existing['id'] not in ids and _meta(existing).get('run_id') not in run_ids
+    ]
+    items.extend(new_items)
+    items.sort(key=lambda existing: (existing['date_published'], -_meta(existing).get('rank', 1)), reverse=True)
+    return items
+
+
+def week_key(published_at: datetime) -> str:
+    """
+    週次ダイジェストのキー（ISO週。例: "2026-W42"）
+    """
+    year, week, _ = published_at.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class FeedPublisher:
+    def __init__(self, feed_dir: str = DEFAULT_FEED_DIR, window: int = FEED_WINDOW,
+                 base_url: Optional[str] = None):
+        """
+        Args:
+            feed_dir: フィード・ダイジェストの出力ディレクトリ
+            window: フィードに載せる項目数
+            base_url: フィードを公開するURL（既定: 環境変数 FEED_BASE_URL。feed_url の生成に使う）
+        """
+        self.feed_dir = feed_dir
+        self.window = window
+        self.base_url = (base_url or os.getenv('FEED_BASE_URL') or '').rstrip('/')
+
+    def publish(self, result: Dict, run_id: str, published_at: Optional[datetime] = None) -> Dict[str, str]:
+        """
+        選定結果をフィードと週次ダイジェストに追加
+
+        Args:
+            result: 分析結果
+            run_id: ラン ID
+            published_at: 選定日時（既定: 現在時刻）
+
+        Returns:
+            更新したファイルの種類 -> パス
+        """
+        published_at = published_at or datetime.now().astimezone()
+        new_items = build_items(result, run_id, published_at)
+
+        state_path = os.path.join(self.feed_dir, "items.json")
+        items = _upsert(_read_items(state_path), new_items)[:self.window]
+        _write_atomic(state_path, json.dumps(items, ensure_ascii=False, indent=2))
+
+        paths = {
+            "json_feed": os.path.join(self.feed_dir, "feed.json"),
+            "rss": os.path.join(self.feed_dir, "feed.xml"),
+        }
+        _write_atomic(paths["json_feed"], self.render_json_feed(items))
+        _write_atomic(paths["rss"], self.render_rss(items))
+
+        paths.update(self._update_digest(new_items, week_key(published_at)))
+
+        logger.info(f"Published {len(new_items)} picks of run {run_id} to feeds ({len(items)} items in window)")
+        return paths
+
+    def _update_digest(self, new_items: List[Dict], week: str) -> Dict[str, str]:
+        """
+        項目が属する週のダイジェストだけを書き直す
+        """
+        digest_dir = os.path.join(self.feed_dir, "digests")
+        state_path = os.path.join(digest_dir, f"{week}.json")
+        items = _upsert(_read_items(state_path), new_items)
+        _write_atomic(state_path, json.dumps(items, ensure_ascii=False, indent=2))
+
+        digest_path = os.path.join(digest_dir, f"{week}.md")
+        _write_atomic(digest_path, render_digest(week, items))
+        return {"digest": digest_path}
+
+    def render_json_feed(self, items: List[Dict]) -> str:
+        """
+        JSON Feed 1.1 を生成
+        """
+        feed = {
+            "version": "https://jsonfeed.org/version/1.1",
+            "title": FEED_TITLE,
+            "description": FEED_DESCRIPTION,
+            "home_page_url": DEFAULT_HOME_PAGE,
+            "language": "ja",
+            "items": items,
+        }
+        if self.base_url:
+            feed["feed_url"] = f"{self.base_url}/feed.json"
+        return json.dumps(feed, ensure_ascii=False, indent=2)
+
+    def render_rss(self, items: List[Dict]) -> str:
+        """
+        RSS 2.0 を生成
+        """
+        rss = ElementTree.Element("rss", {"version": "2.0"})
+        channel = ElementTree.SubElement(rss, "channel")
+        ElementTree.SubElement(channel, "title").text = FEED_TITLE
+        ElementTree.SubElement(channel, "link").text = DEFAULT_HOME_PAGE
+        ElementTree.SubElement(channel, "description").text = FEED_DESCRIPTION
+        ElementTree.SubElement(channel, "language").text = "ja"
+        if items:
+            ElementTree.SubElement(channel, "lastBuildDate").text = format_datetime(
+                datetime.fromisoformat(items[0]['date_published'])
+            )
+
+        for item in items:
+            entry = ElementTree.SubElement(channel, "item")
+            ElementTree.SubElement(entry, "title").text = item['title']
+            ElementTree.SubElement(entry, "link").text = item['url']
+            ElementTree.SubElement(entry, "guid", {"isPermaLink": "false"}).text = item['id']
+            ElementTree.SubElement(entry, "pubDate").text = format_datetime(
+                datetime.fromisoformat(item['date_published'])
+            )
+            ElementTree.SubElement(entry, "description").text = item['content_text']
+            for tag in item.get('tags', []):
+                if tag:
+                    ElementTree.SubElement(entry, "category").text = tag
+
+        return '<?xml version="1.0" encoding="UTF-8"?>\n' + ElementTree.tostring(rss, encoding='unicode')
+
+
+def render_digest(week: str, items: List[Dict]) -> str:
+    """
+    週次ダイジェスト（Markdown）を生成
+
+    Args:
+        week: 週のキー（例: "2026-W42"）
+        items: その週の項目（新しい順）
+
+    Returns:
+        Markdown
+    """
+    lines = [f"# AIニュース週次ダイジェスト {week}", "", f"{len(items)}件の選定ニュース", ""]
+    for item in sorted(items, key=lambda existing: (existing['date_published'], _meta(existing).get('rank', 1))):
+        meta = _meta(item)
+        score = meta.get('surprise_score')
+        rank = meta.get('rank', 1)
+        lines += [
+            f"## {item['date_published'][:10]} {item['title']}" + (f"（{rank}位）" if rank > 1 else ""),
+            "",
+            f"- **ソース**: {meta.get('source', '')}",
+            f"- **URL**: {item['url']}",
+            f"- **サプライズスコア**: {score if score is not None else 'N/A'} / 100",
+            "",
+            item['summary'],
+            "",
+        ]
+    return "\n".join(lines)
@@ -0,0 +1,106 @@
+"""
+文字種にもとづく高速な言語判定（ja / en / zh / ko）
+
+1文字ずつPythonで数える代わりに、事前にコンパイルしたUnicode範囲の正規表現で
+文字種ごとの文字数を C レベルで数え、多数のテキストをまとめて判定する。
+ASCII のみのテキストは str.isascii() で即座に英語と判定する。
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+SUPPORTED_LANGUAGES = ('en', 'ja', 'zh', 'ko')
+
+# 文字種ごとのUnicode範囲（中点 U+30FB は中国語でも使われるため、かなに含めない）
+_KANA = re.compile('[\u3040-\u30fa\u30fc-\u30ff\u31f0-\u31ff\uff66-\uff9f]')
+_HANGUL = re.compile('[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]')
+_HAN = re.compile('[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
+_LATIN = re.compile('[A-Za-z\u00c0-\u024f]')
+
+# 判定に必要な最小文字数（英文中の記号的な1文字で誤判定しないため）
+MIN_SCRIPT_CHARS = 2
+
+# 漢字のみのテキストを中国語とみなす、ラテン文字に対する漢字数の比率
+HAN_TO_LATIN_RATIO = 1 / 3
+
+
+def _count(pattern: re.Pattern, text: str) -> int:
+    """
+    パターンに一致する文字数を数える（一致部分を除去した長さとの差で求める）
+    """
+    return len(text) - len(pattern.sub('', text))
+
+
+def detect_language(text: str, hint: Optional[str] = None) -> str:
+    """
+    テキストの言語を判定
+
+    Args:
+        text: テキスト
+        hint: ソースの言語など、CJK文字を含む場合に優先する言語
+
+    Returns:
+        'en' / 'ja' / 'zh' / 'ko'
+    """
+    if not text or text.isascii():
+        return 'en'
+
+    kana = _count(_KANA, text)
+    # かなは日本語にしか現れないため、英語の製品名が多い日本語の投稿や
+    # 「富士通、国産LLMを公開」のような見出しも日本語と判定できる
+    if kana >= MIN_SCRIPT_CHARS or (kana and _HAN.search(text)):
+        return 'ja'
+
+    hangul = _count(_HANGUL, text)
+    han = _count(_HAN, text)
+    if hangul >= MIN_SCRIPT_CHARS and hangul >= han:
+        return 'ko'
+
+    if kana + hangul + han and hint in ('ja', 'zh', 'ko'):
+        return hint
+
+    if han >= MIN_SCRIPT_CHARS and han >= _count(_LATIN, text) * HAN_TO_LATIN_RATIO:
+        # かなを含まない漢字主体のテキスト（「」は日本語の見出しに多い）
+        return 'ja' if '「' in text else 'zh'
+
+    return 'en'
+
+
+def detect_languages(texts: Sequence[str], hints: Optional[Sequence[Optional[str]]] = None) -> List[str]:
+    """
+    複数のテキストの言語をまとめて判定
+
+    Args:
+        texts: テキストのリスト
+        hints: テキストごとのヒント（ソースの言語など）
+
+    Returns:
+        言語コードのリスト（texts と同じ順序）
+    """
+    if hints is None:
+        hints = [None] * len(texts)
+
+    return [
+        'en' if not text or text.isascii() else detect_language(text, hint)
+        for text, hint in zip(texts, hints)
+    ]
+
+
+def label_articles(articles: List[Dict], use_source_hint: bool = False) -> List[Dict]:
+    """
+    記事のタイトルと要約から言語を判定し、language フィールドを上書き
+
+    Args:
+        articles: 記事のリスト（その場で更新する）
+        use_source_hint: Trueなら既存の language（ソースの言語）をヒントとして使う
+
+    Returns:
+        同じ記事のリスト
+    """
+    texts = [f"{article.get('title', '')} {article.get('summary', '')}" for article in articles]
+    hints = [article.get('language') for article in articles] if use_source_hint else None
+
+    for article, language in zip(articles, detect_languages(texts, hints)):
+        article['language'] = language
+
+    return articles
@@ -0,0 +1,262 @@
+"""
+X の投稿の外部リンク展開と、RSS 記事への統合
+
+X の投稿の多くは、フィードで取得済みの公式ブログやニュース記事を紹介しているが、link は投稿の URL のため
+URL ベースの重複削除では統合されず、同じ話題が候補の枠を二重に使ってしまう。
+
+- 投稿の本文（summary / title）から外部リンクを抜き出す
+- 短縮URL・リダイレクトを同時接続数を制限した HEAD リクエストで最終 URL まで解決する
+  （結果は output/link_cache.json に保存し、同じリンクは実行をまたいで1回だけ解決する）
+- 正規化した最終 URL がフィードの記事と一致した投稿は、記事の social_mentions に統合して投稿自体は除く
+"""
+
+import os
+import re
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from article_enricher import SKIP_HOSTS, canonical_url
+from deadline import Deadline, unlimited
+from profiling import profiled
+from source_kinds import is_x_post
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_LINK_CACHE = os.path.join("output", "link_cache.json")
+
+LINK_CACHE_VERSION = 1
+
+# キャッシュに残すリンク数の上限（解決した日時が古いものから削除）
+LINK_CACHE_MAX_ENTRIES = 20000
+
+# 同時に解決するリンク数・1回の解決のタイムアウト（秒）・たどるリダイレクトの上限
+MAX_WORKERS = 8
+REQUEST_TIMEOUT = 5
+MAX_REDIRECTS = 5
+
+# 1投稿あたりに解決するリンク数
+MAX_LINKS_PER_POST = 3
+
+# 統合した投稿1件あたりの予備スコアの加点と上限
+SOCIAL_POINTS = 1
+MAX_SOCIAL_BONUS = 3
+
+_URL_PATTERN = re.compile(r'https?://[^\s<>"\'（）「」]+')
+_TRAILING_PUNCTUATION = '.,;:!?)]}…'
+
+
+def _is_skipped_host(url: str) -> bool:
+    host = (urlsplit(url).hostname or '').lower()
+    return not host or any(host == skip or host.endswith('.' + skip) for skip in SKIP_HOSTS)
+
+
+def extract_links(text: str) -> List[str]:
+    """
+    テキストから外部リンクを抜き出す（X 自身へのリンクは除く）
+
+    Args:
+        text: 投稿の本文
+
+    Returns:
+        出現順の重複のないリンクのリスト
+    """
+    links = []
+    for match in _URL_PATTERN.findall(text or ''):
+        url = match.rstrip(_TRAILING_PUNCTUATION)
+        if url not in links and not _is_skipped_host(url):
+            links.append(url)
+    return links
+
+
+def social_bonus(article: Dict) -> int:
+    """
+    記事に統合された X の投稿数に応じた予備スコアの加点
+    """
+    return min(len(article.get('social_mentions', [])) * SOCIAL_POINTS, MAX_SOCIAL_BONUS)
+
+
+class LinkCache:
+    def __init__(self, path: str = DEFAULT_LINK_CACHE, max_entries: int = LINK_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            path: キャッシュファイル（存在しなければ空の状態から始める）
+            max_entries: 保存するリンク数の上限
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.links: Dict[str, Dict] = self._load()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable link cache {self.path}: {e}")
+            return {}
+
+        if state.get("version") != LINK_CACHE_VERSION:
+            logger.warning(f"Ignoring link cache {self.path} with version {state.get('version')}")
+            return {}
+        return state.get("links", {})
+
+    def get(self, url: str) -> Optional[str]:
+        entry = self.links.get(url)
+        return entry["resolved"] if entry else None
+
+    def put(self, url: str, resolved: str):
+        self.links[url] = {"resolved": resolved, "resolved_at": datetime.now().astimezone().isoformat()}
+        self._dirty = True
+
+    def save(self):
+        """
+        キャッシュを保存（上限を超えた分は解決した日時が古いものから削除。一時ファイルに書いてから置き換える）
+        """
+        if not self._dirty:
+            return
+        if len(self.links) > self.max_entries:
+            newest = sorted(self.links.items(), key=lambda item: item[1]["resolved_at"], reverse=True)
+            self.links = dict(newest[:self.max_entries])
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": LINK_CACHE_VERSION, "links": self.links}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+class LinkExpander:
+    def __init__(self, cache_file: str = DEFAULT_LINK_CACHE, max_workers: int = MAX_WORKERS,
+                 request_timeout: float = REQUEST_TIMEOUT):
+        """
+        Args:
+            cache_file: 解決結果のキャッシュファイル
+            max_workers: 同時に解決するリンク数の上限
+            request_timeout: 1回の解決のタイムアウト（秒）
+        """
+        self.cache = LinkCache(cache_file)
+        self.max_workers = max_workers
+        self.request_timeout = request_timeout
+
+    def resolve_many(self, urls: List[str], offline: bool = False,
+                     deadline: Optional[Deadline] = None) -> Dict[str, str]:
+        """
+        リンクを最終 URL まで解決
+
+        Args:
+            urls: リンクのリスト
+            offline: Trueの場合はキャッシュのみ使用し、ネットワークにアクセスしない
+            deadline: 解決の期限（過ぎたら未解決のリンクは諦める）
+
+        Returns:
+            リンク -> 最終 URL（解決できなかったリンクは含まない）
+        """
+        deadline = deadline or unlimited()
+        urls = list(dict.fromkeys(urls))
+        resolved = {}
+        misses = []
+        for url in urls:
+            cached = self.cache.get(url)
+            if cached:
+                resolved[url] = cached
+            else:
+                misses.append(url)
+
+        if misses and not offline:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(misses)))) as executor:
+                results = list(executor.map(lambda url: self._resolve(url, deadline), misses))
+            for url, final_url in zip(misses, results):
+                if final_url:
+                    resolved[url] = final_url
+                    self.cache.put(url, final_url)
+            self.cache.save()
+
+        logger.info(
+            f"Resolved {len(resolved)}/{len(urls)} links ({len(urls) - len(misses)} from cache)"
+        )
+        return resolved
+
+    def _resolve(self, url: str, deadline: Deadline) -> Optional[str]:
+        """
+        HEAD リクエストでリダイレクトをたどる（HEAD を受け付けないサーバーには本文を読まない GET で再試行）
+        """
+        import requests
+
+        if deadline.expired():
+            return None
+
+        session = requests.Session()
+        session.max_redirects = MAX_REDIRECTS
+        headers = {"User-Agent": "Mozilla/5.0 (compatible; ai-news-analyzer)"}
+        try:
+            response = session.head(url, allow_redirects=True, timeout=deadline.timeout(self.request_timeout),
+                                    headers=headers)
+            if response.status_code in (403, 405, 501):
+                response = session.get(url, allow_redirects=True, stream=True,
+                                       timeout=deadline.timeout(self.request_timeout), headers=headers)
+                response.close()
+            if response.status_code >= 400:
+                logger.debug(f"Could not resolve {url}: HTTP {response.status_code}")
+                return None
+            return response.url
+        except requests.RequestException as e:
+            logger.debug(f"Could not resolve {url}: {e}")
+            return None
+        finally:
+            session.close()
+
+    @profiled()
+    def merge_posts(self, articles: List[Dict], offline: bool = False,
+                    deadline: Optional[Deadline] = None) -> List[Dict]:
+        """
+        外部リンクがフィードの記事と一致する X の投稿を、その記事の social_mentions に統合
+
+        Args:
+            articles: 記事のリスト（フィードの記事と X の投稿）
+            offline: Trueの場合はキャッシュ済みの解決結果のみ使用
+            deadline: 解決の期限
+
+        Returns:
+            統合した投稿を除いた記事のリスト（元の並び順）
+        """
+        by_url = {}
+        post_links = {}
+        for index, article in enumerate(articles):
+            if is_x_post(article):
+                links = extract_links(f"{article.get('summary', '')} {article.get('title', '')}")
+                if links:
+                    post_links[index] = links[:MAX_LINKS_PER_POST]
+            else:
+                by_url.setdefault(canonical_url(article['link']), article)
+
+        if not post_links or not by_url:
+            return articles
+
+        resolved = self.resolve_many(
+            [url for links in post_links.values() for url in links], offline=offline, deadline=deadline
+        )
+
+        merged = set()
+        for index, links in post_links.items():
+            for url in links:
+                final_url = resolved.get(url, url)
+                target = by_url.get(canonical_url(final_url))
+                if target is None:
+                    continue
+                post = articles[index]
+                target.setdefault('social_mentions', []).append(
+                    {"source": post.get('source', ''), "link": post['link'], "title": post.get('title', '')}
+                )
+                merged.add(index)
+                break
+
+        logger.info(f"Merged {len(merged)}/{len(post_links)} X posts with outbound links into feed articles")
+        return [article for index, article in enumerate(articles) if index not in merged]
@@ -0,0 +1,438 @@
+"""
+ニュース収集・分析パイプライン（ステージ単位のチェックポイント付き）
+
+ステージ:
+    raw        - フィード本文の取得（ネットワーク）
+    parsed     - フィード解析後の全記事
+    filtered   - 時刻フィルタ・重複削除（X の投稿のリンク展開による統合を含む）・AI関連判定後の記事
+    candidates - ストーリー単位にまとめた代表記事から選んだ、詳細分析に回す候補（必要に応じて本文を取得）
+    analysis   - LLMによる分析結果
+
+各ステージの出力は CheckpointStore に保存され、同じラン ID で再実行すると
+最後に成功したステージの次から再開する。
+
+run_budget を指定すると、各ステージは残り時間を配分したステージ予算の範囲で実行し、
+予算を使い切ったら未取得のソースを打ち切ってそれまでの結果で続行する。
+収集できなかったソースは分析結果の skipped_sources に記録する。
+
+シャード実行（shard=(i, N)）では担当ソースの raw / parsed までを
+<ラン ID>/shards/<i>-of-<N> に保存し、merge_shards() で本体のランの parsed に統合する。
+統合後に同じラン ID で実行すると filtered から再開する。
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from checkpoint import STAGES, CheckpointStore, DEFAULT_CHECKPOINT_DIR
+from deadline import RunBudget, unlimited
+from profiling import profile_stage
+from source_health import SourceHealth
+from source_registry import load_registry, select_shard, shard_run_id
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# リプレイ時に再開できるステージ（ネットワークを使わずに再計算できるもの）
+REPLAYABLE_STAGES = ['raw', 'parsed', 'filtered']
+
+
+class NewsPipeline:
+    def __init__(self, api_key: Optional[str], run_id: str, timezone: str = "Asia/Tokyo",
+                 hours_lookback: int = 24, checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR,
+                 shard: Optional[Tuple[int, int]] = None, registry: Optional[Dict[str, List[Dict]]] = None,
+                 trend_file: Optional[str] = None, enrich_top_k: int = 0,
+                 content_cache_dir: Optional[str] = None, run_budget: Optional[float] = None,
+                 health_file: Optional[str] = None, picks: int = 1, link_cache_file: Optional[str] = None):
+        """
+        Args:
+            api_key: Groq APIキー（オフライン実行時はNone可）
+            run_id: ラン ID（チェックポイントのキー）
+            timezone: タイムゾーン
+            hours_lookback: 何時間前までの記事を対象とするか
+            checkpoint_dir: チェックポイントの保存先ディレクトリ
+            shard: (シャード番号, シャード数)。指定した場合は担当ソースのみ収集する
+            registry: ソースレジストリ（既定: load_registry()）
+            trend_file: トレンド状態ファイルのパス（指定した場合のみトレンドスパイクを検出）
+            enrich_top_k: 本文を取得する上位候補の数（0なら取得しない）
+            content_cache_dir: 本文のキャッシュディレクトリ（既定: output/content_cache）
+            run_budget: 実行全体の時間予算（秒。Noneなら無制限）
+            health_file: ソースの健全性の記録ファイル（指定した場合のみ記録し、失敗し続けるソースをバックオフ）
+            picks: 選定する件数（2以上の場合は1回のLLM呼び出しでランキングを作成）
+            link_cache_file: リンク展開のキャッシュファイル（指定した場合のみ、外部リンクがフィードの記事と
+                             一致する X の投稿をその記事に統合）
+        """
+        from feed_collector import FeedCollector
+        from surprise_analyzer import SurpriseAnalyzer
+        from x_collector import XCollector
+
+        registry = registry or load_registry()
+        if shard:
+            registry = select_shard(registry, *shard)
+            logger.info(
+                f"Shard {shard[0]}/{shard[1]}: {len(registry['feeds'])} feeds, "
+                f"{len(registry['x_accounts'])} X accounts"
+            )
+
+        self.run_id = run_id
+        self.shard = shard
+        self.registry = registry
+        self.hours_lookback = hours_lookback
+        self.checkpoint_dir = checkpoint_dir
+        self.trend_file = trend_file
+        self.enrich_top_k = enrich_top_k
+        self.content_cache_dir = content_cache_dir
+        self.link_cache_file = link_cache_file
+        self.health = SourceHealth(health_file) if health_file else None
+        self.store = CheckpointStore(shard_run_id(run_id, *shard) if shard else run_id, checkpoint_dir)
+        self.collector = FeedCollector(
+            timezone=timezone,
+            hours_lookback=hours_lookback,
+            stream=os.getenv('FEED_STREAMING', '0') == '1',
+            sources=registry["feeds"],
+            health=self.health
+        )
+        self.x_collector = XCollector(timezone=timezone, hours_lookback=hours_lookback, health=self.health)
+        self.analyzer = SurpriseAnalyzer(api_key=api_key, picks=picks)
+        self.offline = False
+        self.budget = RunBudget(run_budget)
+        self.stage_deadline = unlimited()
+        self.skipped_sources: List[Dict] = []
+
+    def run(self, resume: bool = True, until: Optional[str] = None) -> Optional[Any]:
+        """
+        パイプラインを実行（チェックポイントがあれば途中から再開）
+
+        Args:
+            resume: Falseの場合は既存のチェックポイントを破棄して最初から実行
+            until: 指定した場合はこのステージまでで終了（シャード実行では 'parsed'）
+
+        Returns:
+            最後に実行したステージの出力（通常は分析結果。対象記事がない場合はNone）
+        """
+        if not resume:
+            self.store.clear()
+
+        until = until or STAGES[-1]
+        data = None
+        start_stage = STAGES[0]
+
+        last_stage = self.store.last_completed_stage() if resume else None
+        if last_stage:
+            logger.info(f"Resuming run {self.store.run_id} after stage '{last_stage}'")
+            data = self.store.load(last_stage)
+            self.skipped_sources = self.store.load_skipped()
+            if STAGES.index(last_stage) >= STAGES.index(until):
+                return data
+            start_stage = STAGES[STAGES.index(last_stage) + 1]
+
+        return self._run_from(start_stage, data, save=True, until=until)
+
+    def replay(self, snapshot_run_id: str) -> Optional[Dict]:
+        """
+        保存済みスナップショットをネットワークなしで再分析
+
+        最も早いステージのスナップショットから解析・フィルタ・候補選定をやり直し、
+        分析はAPIを呼ばずにキーワードスコアで行う。元のチェックポイントは変更しない。
+
+        Args:
+            snapshot_run_id: 再分析するラン ID
+
+        Returns:
+            分析結果（スナップショットがない・対象記事がない場合はNone）
+        """
+        snapshot = CheckpointStore(snapshot_run_id, self.checkpoint_dir)
+
+        for stage in REPLAYABLE_STAGES:
+            payload = snapshot.load_payload(stage)
+            if payload is None:
+                continue
+
+            logger.info(f"Replaying run {snapshot_run_id} from stage '{stage}' (offline)")
+
+            # 時刻フィルタはスナップショット作成時点を基準にする
+            cutoff_time = payload["created_at"] - timedelta(hours=self.hours_lookback)
+            self.collector.cutoff_time = cutoff_time
+            self.x_collector.cutoff_time = cutoff_time
+            self.offline = True
+
+            next_stage = STAGES[STAGES.index(stage) + 1]
+            return self._run_from(next_stage, payload["data"], save=False)
+
+        logger.error(f"No replayable snapshot found for run {snapshot_run_id}")
+        return None
+
+    def _run_from(self, start_stage: str, data: Any, save: bool, until: Optional[str] = None) -> Optional[Any]:
+        """
+        指定したステージから最後（または until）まで実行
+
+        Args:
+            start_stage: 最初に実行するステージ
+            data: 直前のステージの出力
+            save: 各ステージの出力をチェックポイントとして保存するか
+            until: 最後に実行するステージ（既定: analysis）
+
+        Returns:
+            最後に実行したステージの出力（対象記事がない場合はNone）
+        """
+        end = STAGES.index(until or STAGES[-1]) + 1
+        for stage in STAGES[STAGES.index(start_stage):end]:
+            self.stage_deadline = self.budget.stage(stage)
+            with profile_stage(stage):
+                data = getattr(self, f"_stage_{stage}")(data)
+            if not data:
+                # 記事のないシャードも完了として記録し、統合を妨げないようにする
+                if save and self.shard:
+                    self.store.save(stage, data)
+                return None
+
+            # フォールバック結果は「成功」とみなさず、次回はLLM分析をやり直す
+            if save and not (stage == 'analysis' and data.get('fallback')):
+                self.store.save(stage, self._checkpoint_data(stage, data))
+
+        return data
+
+    def _checkpoint_data(self, stage: str, data: Any) -> Any:
+        """
+        チェックポイントに保存する内容（候補の本文はキャッシュにあるため、ハッシュと文字数だけを残す）
+        """
+        if stage != 'candidates':
+            return data
+        from article_enricher import drop_content
+
+        return drop_content([dict(article) for article in data])
+
+    def _stage_raw(self, _: Any) -> Dict:
+        """
+        RSS / X からフィード本文を取得
+        """
+        from news_sources import X_SEARCH_KEYWORDS
+
+        # ステージ予算を RSS / X検索 / Xアカウントで分ける（余った分は後の取得に回る）
+        deadline = self.stage_deadline
+
+        logger.info("[STEP 1-1] Collecting from RSS feeds...")
+        rss = self.collector.fetch_raw_feeds(deadline.child(0.6))
+
+        logger.info("[STEP 1-2] Collecting from X (Twitter)...")
+        # X検索は取得と解析が一体のため、解析済みの投稿をそのまま保存する
+        # （キーワード検索はソースではないため、シャード実行では 0 番のシャードだけが行う）
+        # 収集できなかったソースは呼び出しごとにリセットされるため、それぞれの直後に集める
+        skipped = list(self.collector.skipped_sources)
+        x_search = []
+        if not self.shard or self.shard[0] == 0:
+            x_search = self.x_collector.collect_from_search(X_SEARCH_KEYWORDS, max_tweets=50,
+                                                            deadline=deadline.child(0.5))
+            skipped.extend(self.x_collector.skipped_sources)
+        x_accounts = self.x_collector.fetch_rsshub_raw(self.registry["x_accounts"], deadline)
+        skipped.extend(self.x_collector.skipped_sources)
+
+        if self.health:
+            self.health.save()
+
+        self.store.save_skipped(skipped)
+        return {"rss": rss, "x_search": x_search, "x_accounts": x_accounts, "skipped": skipped}
+
+    def _stage_parsed(self, raw: Dict) -> List[Dict]:
+        """
+        取得したフィード本文を解析して記事に変換
+        """
+        self.skipped_sources = raw.get("skipped", [])
+        # ソース種別ごとのリストを連結した新しいリストは作らず、1つのリストに追加していく
+        all_articles = self.collector.parse_raw_feeds(raw["rss"])
+        logger.info(f"RSS articles collected: {len(all_articles)}")
+        logger.info(f"X search articles collected: {len(raw['x_search'])}")
+        all_articles.extend(raw["x_search"])
+        x_account_articles = self.x_collector.parse_rsshub_raw(raw["x_accounts"])
+        logger.info(f"X account articles collected: {len(x_account_articles)}")
+        all_articles.extend(x_account_articles)
+        del x_account_articles
+
+        logger.info(f"Total articles collected: {len(all_articles)}")
+
+        if not all_articles:
+            logger.warning("No articles found in the specified time range")
+
+        return all_articles
+
+    def _stage_filtered(self, articles: List[Dict]) -> List[Dict]:
+        """
+        時刻フィルタ・重複削除・AI関連判定
+        """
+        # 途中のリストは次の処理に渡したら参照を外し、同時に保持するのは直前の段階の1つだけにする
+        articles = self.collector._filter_by_time(articles)
+        logger.info(f"Total recent articles (last {self.hours_lookback}h): {len(articles)}")
+
+        articles = self.collector._remove_duplicates(articles)
+        if self.link_cache_file:
+            articles = self._merge_x_posts(articles)
+        unique_count = len(articles)
+        logger.info(f"Unique articles after deduplication: {unique_count}")
+
+        articles = [article for article in articles if self.collector.is_ai_related(article)]
+        logger.info(f"AI-related articles: {len(articles)} out of {unique_count}")
+
+        if not articles:
+            logger.warning("No AI-related articles found")
+
+        return articles
+
+    def _merge_x_posts(self, articles: List[Dict]) -> List[Dict]:
+        """
+        外部リンクがフィードの記事と一致する X の投稿を記事に統合（リプレイ時はキャッシュ済みの解決結果のみ使用）
+        """
+        from link_expander import LinkExpander
+
+        expander = LinkExpander(cache_file=self.link_cache_file)
+        return expander.merge_posts(articles, offline=self.offline, deadline=self.stage_deadline)
+
+    def _stage_candidates(self, articles: List[Dict]) -> List[Dict]:
+        """
+        同じ話題の記事をストーリーにまとめ、代表記事から詳細分析に回す候補を選定
+        """
+        from story_cluster import cluster_stories
+
+        stories = cluster_stories(articles)
+        logger.info(f"Stories: {len(stories)} from {len(articles)} articles")
+
+        if self.trend_file:
+            self._annotate_trends(articles, stories)
+
+        candidates = self.analyzer.select_candidates(stories)
+
+        if self.enrich_top_k:
+            self._enrich(candidates)
+
+        return candidates
+
+    def _enrich(self, candidates: List[Dict]):
+        """
+        上位候補の記事本文を取得（リプレイ時はキャッシュのみ使用）
+        """
+        self._enricher().enrich(candidates, top_k=self.enrich_top_k, offline=self.offline,
+                                deadline=self.stage_deadline)
+
+    def _enricher(self):
+        from article_enricher import ArticleEnricher, DEFAULT_CACHE_DIR
+
+        return ArticleEnricher(cache_dir=self.content_cache_dir or DEFAULT_CACHE_DIR)
+
+    def _annotate_trends(self, articles: List[Dict], stories: List[Dict]):
+        """
+        今回の記事で語の出現数を数え、代表記事にトレンドスパイクを付与してベースラインを更新
+
+        リプレイ時はベースラインを更新しない。
+        """
+        from trend_tracker import TrendTracker
+
+        tracker = TrendTracker.load(self.trend_file)
+        tracker.observe(articles)
+        tracker.annotate(stories)
+
+        trending = tracker.trending(5)
+        if trending:
+            logger.info("Trending terms: " + ", ".join(f"{row['term']} ({row['score']})" for row in trending))
+
+        if not self.offline and tracker.commit(self.run_id, datetime.now().astimezone()):
+            tracker.save(self.trend_file)
+
+    def _stage_analysis(self, candidates: List[Dict]) -> Dict:
+        """
+        候補をLLMで分析（オフライン時はキーワードスコアで選定）
+        """
+        from article_enricher import drop_content
+
+        # 候補のチェックポイントから再開した場合は、除いておいた本文をキャッシュから戻す
+        if any('content_sha256' in candidate for candidate in candidates):
+            self._enricher().restore(candidates)
+
+        logger.info("\n[STEP 2] Analyzing articles with Claude Code (Groq LLaMA 3.1 70B)...")
+        result = self.analyzer.analyze_candidates(candidates, offline=self.offline, deadline=self.stage_deadline)
+
+        # 分析結果JSON・チェックポイントには本文を保存しない（picks の記事は候補と同じ辞書）
+        drop_content(candidates)
+
+        # 収集できなかったソース（再開時・シャード統合後はチェックポイントに保存した分）
+        result['skipped_sources'] = self.skipped_sources
+        return result
+
+
+def collect_shard(run_id: str, index: int, count: int, timezone: str = "Asia/Tokyo", hours_lookback: int = 24,
+                  checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR, resume: bool = True,
+                  health_file: Optional[str] = None) -> int:
+    """
+    1つのシャードの raw / parsed までを実行（別プロセス・別マシンから呼び出せる）
+
+    Args:
+        run_id: 本体のラン ID
+        index: シャード番号（0 始まり）
+        count: シャード数
+        timezone: タイムゾーン
+        hours_lookback: 何時間前までの記事を対象とするか
+        checkpoint_dir: チェックポイントの保存先ディレクトリ（マシン間では共有ストレージを指定）
+        resume: Falseの場合はシャードのチェックポイントを破棄して最初から実行
+        health_file: ソースの健全性の記録ファイル（シャード間で共有し、担当ソースの記録だけを更新する）
+
+    Returns:
+        収集した記事数
+    """
+    pipeline = NewsPipeline(
+        api_key=None,
+        run_id=run_id,
+        timezone=timezone,
+        hours_lookback=hours_lookback,
+        checkpoint_dir=checkpoint_dir,
+        shard=(index, count),
+        health_file=health_file
+    )
+    articles = pipeline.run(resume=resume, until='parsed')
+    return len(articles or [])
+
+
+def merge_shards(run_id: str, shard_count: int, checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR,
+                 allow_partial: bool = False) -> Optional[List[Dict]]:
+    """
+    各シャードの parsed チェックポイントを統合し、本体のランの parsed として保存
+
+    Args:
+        run_id: 本体のラン ID
+        shard_count: シャード数
+        checkpoint_dir: チェックポイントの保存先ディレクトリ
+        allow_partial: Trueなら未完了のシャードがあっても完了分だけで統合
+
+    Returns:
+        統合・重複削除後の記事（未完了のシャードがあり allow_partial でない場合はNone）
+    """
+    from feed_collector import remove_duplicates
+
+    articles = []
+    skipped = []
+    created_at = []
+    missing = []
+
+    for index in range(shard_count):
+        shard_store = CheckpointStore(shard_run_id(run_id, index, shard_count), checkpoint_dir)
+        payload = shard_store.load_payload('parsed')
+        if payload is None:
+            missing.append(index)
+            continue
+        articles.extend(payload["data"])
+        skipped.extend(shard_store.load_skipped())
+        created_at.append(payload["created_at"])
+
+    if missing:
+        logger.warning(f"Shards not completed for run {run_id}: {', '.join(map(str, missing))} of {shard_count}")
+        if not allow_partial or not created_at:
+            return None
+
+    # シャード間で同じ記事が重複しうる（同じ記事を複数のソースが配信する場合など）
+    merged = remove_duplicates(articles)
+    logger.info(f"Merged {len(articles)} articles from {len(created_at)} shards into {len(merged)} unique articles")
+
+    # 時刻フィルタ（リプレイ時）の基準は最後に完了したシャードの時刻とする
+    store = CheckpointStore(run_id, checkpoint_dir)
+    store.save('parsed', merged, created_at=max(created_at))
+    # 各シャードで収集できなかったソースを本体のランの結果に引き継ぐ
+    store.save_skipped(skipped)
+    return merged
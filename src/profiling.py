@@ -0,0 +1,255 @@
+"""
+ステージ単位のプロファイリング（オプトイン）
+
+環境変数 NEWS_PROFILE（cpu / memory / all）または `cli.py analyze --profile` で有効にすると、
+パイプラインの各ステージと収集・分析の主要な処理を cProfile / tracemalloc で計測し、
+output/profile/<ラン ID>/ に次のファイルを保存する:
+
+    <連番>-<ステージ>.pstats     cProfile の統計（`python -m pstats` や snakeviz で開ける）
+    <連番>-<ステージ>.alloc.txt  ステージ中に増えたメモリの確保元（上位）
+    summary.json                ステージごとの実行時間・ピークメモリ・累積時間の上位関数
+
+ステージは入れ子にでき（例: raw の中の fetch_raw_feeds）、子のステージの間は親の cProfile を止めるため、
+各ステージの統計には子のステージ分を含まない。
+
+無効時は profile_stage() が共有の空のコンテキストを返し、@profiled はグローバル変数を1回参照するだけなので、
+オーバーヘッドはほぼない（cProfile / tracemalloc も有効時にのみ読み込む）。
+記事単位で呼ばれる関数には付けず、ステージ単位の関数にのみ付けること。
+"""
+
+import os
+import re
+import io
+import json
+import time
+import logging
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = os.path.join("output", "profile")
+
+PROFILE_MODES = ('cpu', 'memory', 'all')
+
+# summary.json / alloc.txt に残す上位件数
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 25
+
+# tracemalloc で保持するスタックの深さ（確保元の特定には1フレームで十分）
+TRACEMALLOC_FRAMES = 1
+
+_NULL_CONTEXT = nullcontext()
+
+# 実行中のプロファイラ（無効時はNone）
+_active: Optional['StageProfiler'] = None
+
+
+class StageProfiler:
+    def __init__(self, output_dir: str, cpu: bool = True, memory: bool = True):
+        """
+        Args:
+            output_dir: 統計ファイルの出力先（output/profile/<ラン ID>）
+            cpu: cProfile で実行時間を計測するか
+            memory: tracemalloc でメモリの確保元を計測するか
+        """
+        self.output_dir = output_dir
+        self.cpu = cpu
+        self.memory = memory
+        self.stages: List[Dict] = []
+        self._stack: List[Dict] = []
+        self._started_tracemalloc = False
+
+    def start(self):
+        import tracemalloc
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+
+    def stop(self):
+        import tracemalloc
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._write_summary()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        ステージを計測するコンテキスト（入れ子のステージは「親/子」の名前で記録）
+        """
+        import cProfile
+        import tracemalloc
+
+        parent = self._stack[-1] if self._stack else None
+        frame = {
+            "name": f"{parent['name']}/{name}" if parent else name,
+            "profile": cProfile.Profile() if self.cpu else None,
+            "child_peak": 0,
+        }
+
+        # 親の cProfile を止めて子だけを計測する（cProfile は同時に1つしか有効にできない）
+        if parent and parent["profile"]:
+            parent["profile"].disable()
+        if self.memory:
+            frame["snapshot"] = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+
+        self._stack.append(frame)
+        started = time.perf_counter()
+        if frame["profile"]:
+            frame["profile"].enable()
+        try:
+            yield
+        finally:
+            if frame["profile"]:
+                frame["profile"].disable()
+            elapsed = time.perf_counter() - started
+            self._stack.pop()
+            self._record(frame, elapsed)
+
+            if parent:
+                if self.memory:
+                    parent["child_peak"] = max(parent["child_peak"], frame["peak"])
+                if parent["profile"]:
+                    parent["profile"].enable()
+
+    def _record(self, frame: Dict, elapsed: float):
+        """
+        ステージの統計をファイルに書き出し、サマリに追加
+        """
+        import tracemalloc
+
+        prefix = os.path.join(self.output_dir, f"{len(self.stages) + 1:02d}-{_safe_name(frame['name'])}")
+        entry = {"stage": frame["name"], "wall_seconds": round(elapsed, 4)}
+
+        if frame["profile"]:
+            frame["profile"].dump_stats(f"{prefix}.pstats")
+            entry["pstats"] = os.path.basename(f"{prefix}.pstats")
+            entry["top_cumulative"] = _top_functions(frame["profile"])
+
+        if self.memory:
+            frame["peak"] = max(tracemalloc.get_traced_memory()[1], frame["child_peak"])
+            diff = tracemalloc.take_snapshot().compare_to(frame["snapshot"], 'lineno')[:TOP_ALLOCATIONS]
+            with open(f"{prefix}.alloc.txt", 'w', encoding='utf-8') as f:
+                f.write(f"# {frame['name']}: peak {frame['peak'] / 1024:.1f} KiB\n")
+                f.writelines(f"{stat}\n" for stat in diff)
+            entry["peak_kib"] = round(frame["peak"] / 1024, 1)
+            entry["allocations"] = os.path.basename(f"{prefix}.alloc.txt")
+
+        self.stages.append(entry)
+
+    def _write_summary(self):
+        with open(os.path.join(self.output_dir, "summary.json"), 'w', encoding='utf-8') as f:
+            json.dump({"stages": self.stages}, f, ensure_ascii=False, indent=2)
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '.', name).strip('.')
+
+
+def _top_functions(profile) -> List[Dict]:
+    """
+    累積時間の上位関数（サマリ用）
+    """
+    import pstats
+
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, _, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "cumulative_seconds": round(cumulative, 4),
+        })
+    rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+def parse_mode(mode: Optional[str]) -> Optional[Dict[str, bool]]:
+    """
+    プロファイルのモード（cpu / memory / all。"1" は all）を解析
+
+    Returns:
+        {"cpu": bool, "memory": bool}（無効ならNone）
+
+    Raises:
+        ValueError: 不明なモード
+    """
+    if not mode or mode.lower() in ('0', 'off', 'false'):
+        return None
+    mode = mode.lower()
+    if mode in ('1', 'true', 'on'):
+        mode = 'all'
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}' (expected one of {', '.join(PROFILE_MODES)})")
+    return {"cpu": mode in ('cpu', 'all'), "memory": mode in ('memory', 'all')}
+
+
+@contextmanager
+def profiling(run_id: str, mode: Optional[str] = None, output_dir: str = DEFAULT_PROFILE_DIR):
+    """
+    実行全体のプロファイリングを有効にするコンテキスト（モードが無効なら何もしない）
+
+    Args:
+        run_id: ラン ID（出力先のサブディレクトリ）
+        mode: cpu / memory / all（既定: 環境変数 NEWS_PROFILE）
+        output_dir: 出力先の親ディレクトリ
+    """
+    global _active
+
+    try:
+        options = parse_mode(mode if mode is not None else os.getenv('NEWS_PROFILE'))
+    except ValueError as e:
+        logger.warning(f"Profiling disabled: {e}")
+        options = None
+    if not options or _active is not None:
+        yield None
+        return
+
+    profiler = StageProfiler(os.path.join(output_dir, run_id), **options)
+    profiler.start()
+    _active = profiler
+    logger.info(f"Profiling enabled ({', '.join(key for key, on in options.items() if on)}): {profiler.output_dir}")
+    try:
+        yield profiler
+    finally:
+        _active = None
+        profiler.stop()
+        logger.info(f"Profile written to {profiler.output_dir} ({len(profiler.stages)} stages)")
+
+
+def profile_stage(name: str):
+    """
+    プロファイリング中ならステージを計測するコンテキスト、そうでなければ空のコンテキストを返す
+    """
+    if _active is None:
+        return _NULL_CONTEXT
+    return _active.stage(name)
+
+
+def profiled(name: Optional[str] = None):
+    """
+    関数の呼び出しをステージとして計測するデコレータ（無効時はそのまま呼び出す）
+
+    Args:
+        name: ステージ名（既定: 関数の修飾名）
+    """
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
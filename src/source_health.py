@@ -0,0 +1,235 @@
+"""
+ソースごとの健全性の記録と、失敗し続けるソースのバックオフ
+
+ソースごとに試行回数・成功回数・応答時間・最後に成功した時刻・連続失敗回数を
+output/source_health.json に保存する。連続して失敗したソースは指数的に間隔を広げながら
+（1日 → 2日 → 4日 …、最大14日）試行を見送り、間隔が明けた実行で1回だけ再試行（プローブ）する。
+プローブに成功すれば通常どおり毎回取得する。
+"""
+
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEALTH_FILE = os.path.join("output", "source_health.json")
+
+HEALTH_VERSION = 1
+
+# この回数連続で失敗したらバックオフを始める
+FAILURE_THRESHOLD = 2
+
+# バックオフの初期間隔と上限（時間）
+BACKOFF_BASE_HOURS = 24
+BACKOFF_MAX_HOURS = 24 * 14
+
+# 応答時間の指数移動平均の係数
+LATENCY_ALPHA = 0.3
+
+
+def _empty_record() -> Dict:
+    return {
+        "attempts": 0,
+        "successes": 0,
+        "consecutive_failures": 0,
+        "latency_ms": None,
+        "last_success": None,
+        "last_failure": None,
+        "last_error": None,
+        "next_attempt": None,
+    }
+
+
+@contextmanager
+def _file_lock(path: str):
+    """
+    プロセス間の排他ロック（path の横の .lock ファイルに flock。fcntl のない環境ではロックしない）
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(f"{path}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SourceHealth:
+    def __init__(self, path: str = DEFAULT_HEALTH_FILE):
+        """
+        Args:
+            path: 健全性の記録ファイル（存在しなければ空の状態から始める）
+        """
+        self.path = path
+        self.records: Dict[str, Dict] = self._load()
+        self._updated: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable source health file {self.path}: {e}")
+            return {}
+
+        if state.get("version") != HEALTH_VERSION:
+            logger.warning(f"Ignoring source health file {self.path} with version {state.get('version')}")
+            return {}
+        return state.get("sources", {})
+
+    def should_attempt(self, source_id: str, now: Optional[datetime] = None) -> bool:
+        """
+        ソースを今回取得するかどうか（バックオフ中ならFalse。間隔が明けていればプローブとしてTrue）
+        """
+        record = self.records.get(source_id)
+        if not record or not record.get("next_attempt"):
+            return True
+
+        now = now or datetime.now().astimezone()
+        if now < datetime.fromisoformat(record["next_attempt"]):
+            return False
+
+        logger.info(f"Probing {source_id} after {record['consecutive_failures']} consecutive failures")
+        return True
+
+    def record_success(self, source_id: str, latency: float, now: Optional[datetime] = None):
+        """
+        取得の成功を記録（バックオフを解除）
+
+        Args:
+            source_id: ソース ID
+            latency: 応答時間（秒）
+            now: 現在時刻
+        """
+        now = now or datetime.now().astimezone()
+        with self._lock:
+            record = self._record(source_id, latency)
+            record["successes"] += 1
+            record["consecutive_failures"] = 0
+            record["last_success"] = now.isoformat()
+            record["next_attempt"] = None
+
+    def record_failure(self, source_id: str, error: str, latency: Optional[float] = None,
+                       now: Optional[datetime] = None):
+        """
+        取得の失敗を記録（連続失敗が閾値に達したら次の試行を指数的に先送り）
+
+        Args:
+            source_id: ソース ID
+            error: エラーの内容
+            latency: 失敗までの時間（秒）
+            now: 現在時刻
+        """
+        now = now or datetime.now().astimezone()
+        with self._lock:
+            record = self._record(source_id, latency)
+            record["consecutive_failures"] += 1
+            record["last_failure"] = now.isoformat()
+            record["last_error"] = str(error)[:200]
+
+            excess = record["consecutive_failures"] - FAILURE_THRESHOLD
+            if excess >= 0:
+                backoff = min(BACKOFF_BASE_HOURS * 2 ** excess, BACKOFF_MAX_HOURS)
+                record["next_attempt"] = (now + timedelta(hours=backoff)).isoformat()
+                logger.warning(
+                    f"{source_id} failed {record['consecutive_failures']} times in a row, "
+                    f"backing off for {backoff}h"
+                )
+
+    def _record(self, source_id: str, latency: Optional[float]) -> Dict:
+        """
+        試行を1回数え、応答時間の移動平均を更新した記録を返す
+        """
+        record = self.records.setdefault(source_id, _empty_record())
+        record["attempts"] += 1
+        if latency is not None:
+            latency_ms = latency * 1000
+            previous = record["latency_ms"]
+            record["latency_ms"] = round(
+                latency_ms if previous is None else previous + LATENCY_ALPHA * (latency_ms - previous), 1
+            )
+        self._updated[source_id] = record
+        return record
+
+    def reset(self, source_id: str) -> bool:
+        """
+        ソースのバックオフを解除（次回の実行で必ず試行する）
+
+        Returns:
+            記録があった場合はTrue
+        """
+        record = self.records.get(source_id)
+        if not record:
+            return False
+        record["consecutive_failures"] = 0
+        record["next_attempt"] = None
+        self._updated[source_id] = record
+        return True
+
+    def save(self):
+        """
+        記録を保存
+
+        シャード実行では複数のプロセスが同じファイルを更新するため、ファイルロックを取ったうえで
+        保存直前に読み直し、今回更新したソースの記録だけを上書きする（一時ファイルに書いてから置き換える）。
+        """
+        with self._lock, _file_lock(self.path):
+            records = self._load()
+            records.update(self._updated)
+            self.records = records
+
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": HEALTH_VERSION, "sources": records}, f, ensure_ascii=False, indent=2,
+                          sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def report(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        ソースごとの健全性（状態の悪い順）
+
+        Returns:
+            source / status / success_rate / latency_ms / last_success / consecutive_failures /
+            next_attempt / last_error を含む辞書のリスト
+            （status: healthy / failing（連続失敗中） / backoff（試行を見送り中））
+        """
+        now = now or datetime.now().astimezone()
+        rows = []
+        for source_id, record in self.records.items():
+            if record.get("next_attempt") and now < datetime.fromisoformat(record["next_attempt"]):
+                status = "backoff"
+            elif record["consecutive_failures"]:
+                status = "failing"
+            else:
+                status = "healthy"
+
+            rows.append({
+                "source": source_id,
+                "status": status,
+                "success_rate": round(record["successes"] / record["attempts"], 3) if record["attempts"] else None,
+                "latency_ms": record["latency_ms"],
+                "last_success": record["last_success"],
+                "consecutive_failures": record["consecutive_failures"],
+                "next_attempt": record["next_attempt"],
+                "last_error": record["last_error"],
+            })
+
+        order = {"backoff": 0, "failing": 1, "healthy": 2}
+        rows.sort(key=lambda row: (order[row["status"]], -row["consecutive_failures"], row["source"]))
+        return rows
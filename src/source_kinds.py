@@ -0,0 +1,17 @@
+"""
+記事のソースの種類の判定
+
+収集・統合・分析の各モジュールで共通に使うため、他のモジュールに依存しない軽量なモジュールとする。
+"""
+
+from typing import Dict
+
+# X の投稿のソース名の接頭辞（"X (@OpenAI)"）
+X_SOURCE_PREFIX = "X ("
+
+
+def is_x_post(article: Dict) -> bool:
+    """
+    記事が X の投稿かどうか（フィードの記事ならFalse）
+    """
+    return article.get('source', '').startswith(X_SOURCE_PREFIX)
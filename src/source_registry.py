@@ -0,0 +1,152 @@
+"""
+収集ソースのレジストリとシャーディング
+
+ソースは外部のレジストリファイル（既定: config/sources.json、環境変数 SOURCE_REGISTRY で変更可）から
+安定したソース ID 付きで読み込む。ファイルがない場合は news_sources.py の定義を使う。
+
+シャーディングはソース ID のハッシュで決まるため、ソースの追加・削除や並び順の変更があっても
+他のソースの割り当ては変わらず、同じ i/N を指定したプロセス・マシンは常に同じソースを担当する。
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'sources.json')
+)
+
+REGISTRY_VERSION = 1
+
+# フィードの必須フィールド
+FEED_FIELDS = ('id', 'name', 'url', 'language')
+
+
+def slugify(name: str) -> str:
+    """
+    ソース名から ID を生成（"TechCrunch AI" -> "techcrunch-ai"）
+    """
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def _builtin_registry() -> Dict[str, List[Dict]]:
+    """
+    news_sources.py の定義からレジストリを構築
+    """
+    from news_sources import NEWS_SOURCES, X_ACCOUNTS
+
+    feeds = [
+        dict(source, id=slugify(source["name"]))
+        for source in NEWS_SOURCES["english"] + NEWS_SOURCES["japanese"]
+    ]
+    x_accounts = [{"id": f"x-{slugify(account)}", "account": account} for account in X_ACCOUNTS]
+    return {"feeds": feeds, "x_accounts": x_accounts}
+
+
+def _validate(registry: Dict, path: str):
+    """
+    レジストリの内容を検証
+
+    Raises:
+        ValueError: 必須フィールドの欠落、ソース ID の重複、未対応のバージョン
+    """
+    if registry.get("version", REGISTRY_VERSION) != REGISTRY_VERSION:
+        raise ValueError(f"Unsupported source registry version in {path}: {registry.get('version')}")
+
+    seen = set()
+    for feed in registry.get("feeds", []):
+        missing = [field for field in FEED_FIELDS if not feed.get(field)]
+        if missing:
+            raise ValueError(f"Feed {feed.get('id') or feed.get('name')} in {path} is missing {', '.join(missing)}")
+    for entry in registry.get("feeds", []) + registry.get("x_accounts", []):
+        if not entry.get("id"):
+            raise ValueError(f"Source without id in {path}: {entry}")
+        if entry["id"] in seen:
+            raise ValueError(f"Duplicate source id in {path}: {entry['id']}")
+        seen.add(entry["id"])
+
+
+def load_registry(path: Optional[str] = None) -> Dict[str, List[Dict]]:
+    """
+    ソースレジストリを読み込む
+
+    Args:
+        path: レジストリファイルのパス（既定: 環境変数 SOURCE_REGISTRY または config/sources.json）
+
+    Returns:
+        {"feeds": フィードのリスト, "x_accounts": Xアカウントのリスト}
+        （無効化されたソース（"enabled": false）は除く）
+
+    Raises:
+        ValueError: レジストリの内容が不正な場合
+    """
+    path = path or os.getenv('SOURCE_REGISTRY') or DEFAULT_REGISTRY
+
+    if not os.path.exists(path):
+        logger.info(f"Source registry {path} not found, using built-in sources")
+        return _builtin_registry()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    _validate(registry, path)
+
+    return {
+        key: [entry for entry in registry.get(key, []) if entry.get("enabled", True)]
+        for key in ("feeds", "x_accounts")
+    }
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    シャード指定（"i/N"、i は 0 始まり）を解析
+
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', spec or '')
+    if not match:
+        raise ValueError(f"Invalid shard spec '{spec}' (expected i/N, e.g. 0/4)")
+
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or index >= count:
+        raise ValueError(f"Invalid shard spec '{spec}' (need 0 <= i < N)")
+    return index, count
+
+
+def shard_of(source_id: str, count: int) -> int:
+    """
+    ソース ID が属するシャード番号を返す（プロセス・マシン間で同じ結果になるよう sha1 を使う）
+    """
+    digest = hashlib.sha1(source_id.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+def select_shard(registry: Dict[str, List[Dict]], index: int, count: int) -> Dict[str, List[Dict]]:
+    """
+    レジストリのうち、指定したシャードが担当するソースだけを返す
+
+    Args:
+        registry: load_registry() の戻り値
+        index: シャード番号（0 始まり）
+        count: シャード数
+
+    Returns:
+        load_registry() と同じ形式のレジストリ
+    """
+    return {
+        key: [entry for entry in entries if shard_of(entry["id"], count) == index]
+        for key, entries in registry.items()
+    }
+
+
+def shard_run_id(run_id: str, index: int, count: int) -> str:
+    """
+    シャードのチェックポイントを保存するラン ID（本体のランのディレクトリの下に置く）
+    """
+    return os.path.join(run_id, 'shards', f"{index}-of-{count}")
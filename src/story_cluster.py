@@ -0,0 +1,258 @@
+"""
+記事のストーリー単位のクラスタリング
+
+大きな発表があると、公式ブログ・TechCrunch・The Verge・ITmedia・複数のXアカウントが同じ話題を報じる。
+これらを1つのストーリーにまとめ、代表記事だけを候補選定・LLM分析に回す。
+代表記事には「何ソースが報じたか（coverage_breadth）」「どれだけ速く報道が広がったか（coverage_velocity）」を付与し、
+候補選定のスコアに加える。
+
+ほぼ線形時間で動くよう、全ペアの比較はしない:
+    - タイトルの語集合の MinHash を LSH（バンド分割）でバケットに分け、同じバケットの記事だけを比較
+    - 固有名詞（英字の固有名・製品名、カタカナ語）の転置インデックスで、特定的な固有名詞を含む2つ以上の固有名詞を共有する記事を結合
+    - 結合は Union-Find で行う
+"""
+
+import re
+import zlib
+import random
+import logging
+from datetime import datetime
+from typing import Dict, List, Set
+
+from profiling import profiled
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# MinHash のハッシュ関数の数とLSHのバンド分割（推定Jaccard係数がおよそ0.6以上のペアを拾う）
+NUM_HASHES = 32
+LSH_BANDS = 8
+LSH_ROWS = NUM_HASHES // LSH_BANDS
+
+# 同じバケットに入ったペアを同じストーリーとみなすタイトルの語集合のJaccard係数
+TITLE_SIMILARITY = 0.5
+
+# 同じストーリーとみなすのに必要な共有固有名詞の数（うち1つ以上は特定的な固有名詞であること）
+MIN_SHARED_ENTITIES = 2
+
+# 出現する記事数がこれ以下の固有名詞（"GPT-5.5" など）を特定的とみなす
+# （max(SPECIFIC_ENTITY_POSTINGS, 記事数 × SPECIFIC_ENTITY_FRACTION)。"OpenAI" のような頻出語は該当しない）
+SPECIFIC_ENTITY_POSTINGS = 10
+SPECIFIC_ENTITY_FRACTION = 0.05
+
+# これより多くの記事に出現する固有名詞は結合に使わない（比較回数を記事数に比例する範囲に抑える）
+MAX_ENTITY_POSTINGS = 50
+
+# 同じストーリーとみなす公開時刻の差の上限（時間）
+STORY_WINDOW_HOURS = 48
+
+# 代表記事に残す関連記事の数
+MAX_RELATED = 10
+
+# 文頭などで大文字になるだけの一般語（固有名詞として扱わない）
+ENTITY_STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "for", "to", "in", "on", "with", "by", "at", "from", "as",
+    "new", "how", "why", "what", "who", "when", "is", "are", "it", "its", "this", "that", "these",
+    "ai", "x", "rt", "via", "update", "report", "news", "breaking",
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20260404)
+_HASH_PARAMS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_HASHES)]
+
+_LATIN_TOKEN = re.compile(r'[A-Za-z0-9][A-Za-z0-9.+\-]*[A-Za-z0-9+]|[A-Za-z0-9]')
+_KATAKANA_RUN = re.compile('[\u30a1-\u30fa\u30fc]{3,}')
+_CJK_RUN = re.compile('[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+')
+
+
+def _tokens(text: str) -> Set[str]:
+    """
+    類似度計算用の語集合（英字は単語、CJKは文字バイグラム）
+    """
+    tokens = {token.lower() for token in _LATIN_TOKEN.findall(text)}
+    for run in _CJK_RUN.findall(text):
+        tokens.update(run[i:i + 2] for i in range(max(len(run) - 1, 1)))
+    return tokens
+
+
+def extract_entities(text: str) -> Set[str]:
+    """
+    固有名詞らしい語を抽出（大文字・数字を含む英字の語、3文字以上のカタカナ語）
+
+    Args:
+        text: テキスト
+
+    Returns:
+        小文字に正規化した固有名詞の集合
+    """
+    entities = set()
+    for token in _LATIN_TOKEN.findall(text):
+        if not (token[0].isupper() or any(c.isdigit() for c in token)) or token.isdigit():
+            continue
+        normalized = token.lower().rstrip('.')
+        if normalized not in ENTITY_STOPWORDS:
+            entities.add(normalized)
+
+    entities.update(_KATAKANA_RUN.findall(text))
+    return entities
+
+
+def _minhash(tokens: Set[str]) -> List[int]:
+    """
+    語集合の MinHash シグネチャ（プロセス間で同じ値になるよう crc32 を使う）
+    """
+    hashes = [zlib.crc32(token.encode('utf-8')) for token in tokens] or [0]
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _HASH_PARAMS]
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # 経路圧縮
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i: int, j: int):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def _within_window(a: Dict, b: Dict) -> bool:
+    published_a, published_b = a.get('published'), b.get('published')
+    if not isinstance(published_a, datetime) or not isinstance(published_b, datetime):
+        return True
+    return abs((published_a - published_b).total_seconds()) <= STORY_WINDOW_HOURS * 3600
+
+
+def _representative(members: List[Dict]) -> Dict:
+    """
+    ストーリーの代表記事（最初に報じた記事。同時刻なら要約が長いもの）
+    """
+    def key(article):
+        published = article.get('published')
+        timestamp = published.timestamp() if isinstance(published, datetime) else float('inf')
+        return (timestamp, -len(article.get('summary', '')))
+
+    return min(members, key=key)
+
+
+def _coverage_velocity(members: List[Dict]) -> float:
+    """
+    最初の記事以降、1時間あたり何件の記事が続いたか（単独の記事は0）
+    """
+    times = [article['published'] for article in members if isinstance(article.get('published'), datetime)]
+    if len(times) < 2:
+        return 0.0
+    hours = max((max(times) - min(times)).total_seconds() / 3600, 0.5)
+    return round((len(times) - 1) / hours, 2)
+
+
+@profiled()
+def cluster_stories(articles: List[Dict]) -> List[Dict]:
+    """
+    記事をストーリーにまとめ、ストーリーごとの代表記事を返す
+
+    代表記事には次のフィールドを追加する:
+        story_size: ストーリーの記事数
+        coverage_breadth: 報じたソースの数
+        coverage_velocity: 最初の記事以降の1時間あたりの記事数
+        related: 他の記事（title / source / link、最大 MAX_RELATED 件）
+
+    Args:
+        articles: 記事のリスト
+
+    Returns:
+        代表記事のリスト（元の並び順で最初に出現した順）
+    """
+    n = len(articles)
+    if n == 0:
+        return []
+
+    uf = _UnionFind(n)
+
+    # 1. タイトルの MinHash + LSH で似たタイトルを結合
+    token_sets = [_tokens(article.get('title', '')) for article in articles]
+    buckets: Dict[tuple, int] = {}
+    for i, tokens in enumerate(token_sets):
+        if not tokens:
+            continue
+        signature = _minhash(tokens)
+        for band in range(LSH_BANDS):
+            key = (band, tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]))
+            head = buckets.setdefault(key, i)
+            if head == i or uf.find(head) == uf.find(i):
+                continue
+            other = token_sets[head]
+            similarity = len(tokens & other) / len(tokens | other)
+            if similarity >= TITLE_SIMILARITY and _within_window(articles[i], articles[head]):
+                uf.union(i, head)
+
+    # 2. 特定的な固有名詞を含む複数の固有名詞を共有する記事を結合
+    entity_sets = [extract_entities(f"{article.get('title', '')} {article.get('summary', '')[:300]}")
+                   for article in articles]
+    postings: Dict[str, List[int]] = {}
+    for i, entities in enumerate(entity_sets):
+        for entity in entities:
+            postings.setdefault(entity, []).append(i)
+
+    specific_postings = max(SPECIFIC_ENTITY_POSTINGS, int(n * SPECIFIC_ENTITY_FRACTION))
+    for i, entities in enumerate(entity_sets):
+        shared: Dict[int, int] = {}
+        specific: Set[int] = set()
+        for entity in entities:
+            posting = postings[entity]
+            if len(posting) > MAX_ENTITY_POSTINGS:
+                continue
+            for j in posting:
+                if j > i:
+                    shared[j] = shared.get(j, 0) + 1
+                    if len(posting) <= specific_postings:
+                        specific.add(j)
+        for j in specific:
+            if shared[j] >= MIN_SHARED_ENTITIES and _within_window(articles[i], articles[j]):
+                uf.union(i, j)
+
+    # 3. ストーリーごとに代表記事を選び、報道の広がりを付与
+    stories: Dict[int, List[int]] = {}
+    for i in range(n):
+        stories.setdefault(uf.find(i), []).append(i)
+
+    representatives = []
+    for indices in stories.values():
+        members = [articles[i] for i in indices]
+        representative = _representative(members)
+        representative['story_size'] = len(members)
+        representative['coverage_breadth'] = len({article.get('source') for article in members})
+        representative['coverage_velocity'] = _coverage_velocity(members)
+        representative['related'] = [
+            {"title": article.get('title', ''), "source": article.get('source', ''), "link": article.get('link', '')}
+            for article in members if article is not representative
+        ][:MAX_RELATED]
+        representatives.append(representative)
+
+    logger.info(f"Clustered {n} articles into {len(representatives)} stories")
+    return representatives
+
+
+def coverage_bonus(article: Dict) -> int:
+    """
+    報道の広がりに応じた予備スコアの加点
+
+    Args:
+        article: cluster_stories() の代表記事（クラスタリングしていない記事は0点）
+
+    Returns:
+        加点（他ソース1つにつき2点、最大6点。1時間に1件以上のペースで報じられていれば+1点）
+    """
+    breadth = article.get('coverage_breadth', 1)
+    bonus = min(max(breadth - 1, 0), 3) * 2
+    if article.get('coverage_velocity', 0) >= 1:
+        bonus += 1
+    return bonus
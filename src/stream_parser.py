@@ -0,0 +1,147 @@
+"""
+大規模フィード向けのストリーミング RSS/Atom パーサ
+
+feedparser は文書全体を読み込んで全エントリを構築してから返すが、
+こちらは XMLPullParser で受信したチャンクを逐次解析し、エントリを1件ずつ返す。
+処理済みのエントリは木から取り除くため、フィードの大きさに関わらずメモリ使用量は一定に保たれる。
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from typing import Iterable, Iterator, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# エントリを表す要素（RSS 2.0 / RSS 1.0 の item, Atom の entry）
+ENTRY_TAGS = {'item', 'entry'}
+
+# 要約として使う要素（先にあるものを優先）
+SUMMARY_TAGS = ['summary', 'description', 'encoded', 'content']
+
+# 公開日時として使う要素（先にあるものを優先）
+DATE_TAGS = ['pubDate', 'published', 'date', 'issued']
+UPDATED_TAGS = ['updated', 'modified']
+
+
+class StreamParseError(Exception):
+    """ストリーミング解析できないフィード（不正なXMLなど）"""
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_datetime(text: Optional[str]):
+    """
+    RFC 822（RSS）または ISO 8601（Atom）の日時を UTC の struct_time に変換
+
+    Returns:
+        time.struct_time（解析できない場合はNone）
+    """
+    if not text:
+        return None
+    text = text.strip()
+
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.utctimetuple()
+
+
+def _entry_from_element(elem: ET.Element) -> SimpleNamespace:
+    """
+    item / entry 要素を feedparser のエントリと同じ属性名を持つオブジェクトに変換
+
+    存在しないフィールドは属性自体を持たない（hasattr で判定できる）。
+    """
+    fields = {}
+    texts = {}
+
+    for child in elem:
+        name = _local_name(child.tag)
+
+        if name == 'link':
+            href = child.get('href')
+            if href is not None:
+                # Atom: rel が alternate（または省略）のリンクを採用
+                if child.get('rel', 'alternate') == 'alternate' and 'link' not in fields:
+                    fields['link'] = href.strip()
+            elif child.text and 'link' not in fields:
+                fields['link'] = child.text.strip()
+            continue
+
+        if name not in texts:
+            texts[name] = child.text or ''
+
+    if 'title' in texts:
+        fields['title'] = texts['title'].strip()
+
+    for name in SUMMARY_TAGS:
+        if texts.get(name):
+            fields['summary'] = texts[name]
+            break
+
+    for name in DATE_TAGS:
+        parsed = _parse_datetime(texts.get(name))
+        if parsed:
+            fields['published_parsed'] = parsed
+            break
+
+    for name in UPDATED_TAGS:
+        parsed = _parse_datetime(texts.get(name))
+        if parsed:
+            fields['updated_parsed'] = parsed
+            break
+
+    return SimpleNamespace(**fields)
+
+
+def iter_feed_entries(chunks: Iterable[bytes]) -> Iterator[SimpleNamespace]:
+    """
+    フィード本文のチャンク列を逐次解析し、エントリを1件ずつ返す
+
+    Args:
+        chunks: フィード本文のチャンク（requests の iter_content など）
+
+    Yields:
+        title / link / summary / published_parsed / updated_parsed を（存在すれば）持つエントリ
+
+    Raises:
+        StreamParseError: 不正なXMLの場合（呼び出し側で feedparser にフォールバックする）
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack = []
+
+    def drain():
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            if _local_name(elem.tag) in ENTRY_TAGS:
+                yield _entry_from_element(elem)
+                # 処理済みのエントリを木から外してメモリを解放
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from drain()
+        parser.close()
+        yield from drain()
+    except ET.ParseError as e:
+        raise StreamParseError(str(e)) from e
@@ -4,21 +4,126 @@ Claude Codeを使用してニュースのサプライズ度を分析
 """
 
 import requests
+import os
 import json
+import heapq
+import hashlib
 import logging
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import Iterable, List, Dict, Optional
+
+from deadline import Deadline, unlimited
+from profiling import profiled
+from source_kinds import is_x_post
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# プロンプトに含める本文の最大文字数（本文を取得済みの候補のみ）
+CONTENT_PROMPT_CHARS = 1500
+
+# Groq API のタイムアウト（秒。デッドラインの残り時間の方が短ければそちらを使う）
+API_TIMEOUT = 30
+
+# 既定の候補数（ランキング形式では少なくとも選定件数の2倍を候補にする）
+MAX_CANDIDATES = 5
+
+# 選定1件あたりの応答トークン数の目安（ランキング形式の max_tokens の計算に使う）
+TOKENS_PER_PICK = 700
+
+# システムメッセージのバージョン（内容を変えたら上げる。結果の llm_usage に記録する）
+PROMPT_VERSION = "2"
+
+# システムメッセージは毎回同じバイト列になるよう定数とし、実行ごとに変わる値（日時・件数・候補）を含めない
+_PROMPT_HEADER = """あなたはAIニュース特化のリサーチャー兼アナリストです。
+
+{task}
+
+## 評価基準（サプライズ度）
+
+1. **インパクト**: 性能・価格・ユーザー数・ビジネスインパクトが"桁違い"と言えるか
+2. **新規性**: 既存の延長線ではなく、発想・仕組み・スケールが非連続的か
+3. **現実性**: すでに利用可能、もしくは具体的な提供開始時期や実動デモが提示されているか
+4. **信頼性**: 企業や研究機関などの公式発表、または信頼できる一次情報に裏付けられているか
+
+## 出力形式
+
+"""
+
+_PICK_FIELDS = """"title_ja": "日本語タイトル",
+  "summary": "3-5行の概要（誰が何を発表し、どのような特徴があり、いつ利用可能か）",
+  "surprise_reasons": [
+    "インパクト面での驚き（具体的に）",
+    "新規性（従来との違い）",
+    "現実性（使える/具体的ロードマップ）"
+  ],
+  "engineer_impact": "エンジニア視点での意味（開発・運用・アーキテクチャへの影響）",
+  "business_impact": "ビジネス視点での意味（コスト・収益・戦略への影響）",
+  "surprise_score": 85"""
+
+SINGLE_SYSTEM_PROMPT = _PROMPT_HEADER.format(
+    task="ユーザーが示す候補ニュースの中から、**サプライズ度が最も高いAI関連ニュースを1件だけ**選び、分析してください。"
+) + """以下のJSON形式で出力してください（selected_index は候補の番号）:
+
+```json
+{
+  "selected_index": 1,
+  """ + _PICK_FIELDS + """,
+  "other_candidates_comparison": "他候補と比較してなぜこれが最もサプライズか"
+}
+```
+
+必ずJSONのみを出力してください。
+"""
+
+RANKING_SYSTEM_PROMPT = _PROMPT_HEADER.format(
+    task="ユーザーが示す候補ニュースから、**サプライズ度が高いAI関連ニュースを指定された件数だけ**選び、"
+         "サプライズ度の高い順に並べて、それぞれを分析してください。同じ候補を2回選ばないでください。"
+) + """以下のJSON形式で出力してください（picks はサプライズ度の高い順、selected_index は候補の番号）:
+
+```json
+{
+  "picks": [
+    {
+      "selected_index": 3,
+      """ + _PICK_FIELDS.replace("\n", "\n    ") + """
+    }
+  ],
+  "other_candidates_comparison": "順位の理由と、選ばなかった候補との比較"
+}
+```
+
+必ずJSONのみを出力してください。
+"""
+
+
+def _recency(article: Dict) -> float:
+    """
+    同点時の優先度に使う公開時刻（日時がない記事は最も古いとみなす）
+    """
+    published = article.get('published')
+    return published.timestamp() if isinstance(published, datetime) else float('-inf')
+
+
+def _source_priority(article: Dict) -> int:
+    """
+    同点時の優先度に使うソースの種類（X の投稿よりもフィードの記事を優先する。フィード: 1, X: 0）
+    """
+    return 0 if is_x_post(article) else 1
+
 
 class SurpriseAnalyzer:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_dir: Optional[str] = None, picks: int = 1):
         """
         Args:
-            api_key: Groq APIキー
+            api_key: Groq APIキー（Noneの場合はキャッシュ済みの応答のみ使用）
+            cache_dir: LLM応答のキャッシュディレクトリ（同じリクエストの再分析でAPIを呼ばない）
+            picks: 選定する件数（2以上の場合は1回のAPI呼び出しでサプライズ度順のランキングを返す）
         """
         self.api_key = api_key
+        self.cache_dir = cache_dir
+        self.picks = max(1, picks)
+        self.max_candidates = max(MAX_CANDIDATES, self.picks * 2)
         self.api_url = "https://api.groq.com/openai/v1/chat/completions"
         # LLaMA 3.1 70B - 無料で高性能
         self.model = "llama-3.1-70b-versatile"
@@ -38,48 +143,113 @@ class SurpriseAnalyzer:
             return None
 
         # 候補を2-5件に絞る（APIコスト削減のため）
-        candidates = self._select_candidates(articles)
-        logger.info(f"Selected {len(candidates)} candidates for detailed analysis")
+        candidates = self.select_candidates(articles)
 
         # Claude Codeで詳細分析
-        analysis_result = self._analyze_with_claude(candidates)
+        analysis_result = self.analyze_candidates(candidates)
 
         return analysis_result
 
-    def _select_candidates(self, articles: List[Dict], max_candidates: int = 5) -> List[Dict]:
+    @profiled()
+    def select_candidates(self, articles: List[Dict], max_candidates: Optional[int] = None) -> List[Dict]:
         """
-        候補記事を選定（単純なキーワードスコアリング）
+        詳細分析に回す候補記事を選定
 
         Args:
             articles: 記事のリスト
-            max_candidates: 最大候補数
+            max_candidates: 最大候補数（既定: 5件、ランキング形式では選定件数の2倍以上）
 
         Returns:
             候補記事のリスト
         """
+        candidates = self._select_candidates(articles, max_candidates or self.max_candidates)
+        logger.info(f"Selected {len(candidates)} candidates for detailed analysis")
+        return candidates
+
+    @profiled()
+    def analyze_candidates(self, candidates: List[Dict], offline: bool = False,
+                           deadline: Optional[Deadline] = None) -> Dict:
+        """
+        候補記事を分析し、最もサプライズ度が高いものを選定
+
+        Args:
+            candidates: 候補記事のリスト
+            offline: Trueの場合はAPIを呼ばずキーワードスコアで選定
+            deadline: 分析の期限（過ぎている場合はAPIを呼ばずキーワードスコアで選定）
+
+        Returns:
+            分析結果
+        """
+        if offline:
+            logger.info("Offline mode: selecting by preliminary score without calling the API")
+            return self._fallback_selection(candidates)
+
+        deadline = deadline or unlimited()
+        if deadline.expired():
+            logger.warning("Analysis budget exhausted, selecting by preliminary score without calling the API")
+            return self._fallback_selection(candidates)
+
+        return self._analyze_with_claude(candidates, timeout=deadline.timeout(API_TIMEOUT))
+
+    def _select_candidates(self, articles: Iterable[Dict], max_candidates: int = 5) -> List[Dict]:
+        """
+        候補記事を選定（単純なキーワードスコアリング）
+
+        記事を1件ずつ読みながら上位 max_candidates 件だけをヒープに保持するため、
+        メモリは候補数分、計算量は O(n log K) で済む（記事のリストを丸ごとソートしない）。
+        同点の記事は、フィード（公式ブログ・メディア）の記事 → 新しい記事 → 先に現れた記事 の順に優先する。
+
+        Args:
+            articles: 記事のリストまたはイテレータ
+            max_candidates: 最大候補数
+
+        Returns:
+            候補記事のリスト（予備スコアの高い順。preliminary_score を付与するのは候補のみ）
+        """
         from news_sources import SURPRISE_KEYWORDS
+        from link_expander import social_bonus
+        from story_cluster import coverage_bonus
+        from trend_tracker import trend_bonus
+
+        if max_candidates <= 0:
+            return []
+
+        keywords = [(keyword.lower(), points) for keyword, points in SURPRISE_KEYWORDS.items()]
 
-        # 各記事にスコアを付与
-        for article in articles:
+        # 最小ヒープの先頭が「現在の候補の中で最も順位の低い記事」になる
+        heap = []
+        for index, article in enumerate(articles):
             score = 0
             text = f"{article['title']} {article['summary']}".lower()
 
-            for keyword, points in SURPRISE_KEYWORDS.items():
-                if keyword.lower() in text:
+            for keyword, points in keywords:
+                if keyword in text:
                     score += points
 
-            article['preliminary_score'] = score
+            # 多くのソースが短時間に報じたストーリー、普段より急に言及が増えた語を含む記事、
+            # X でリンク付きで紹介された記事は加点
+            score += coverage_bonus(article) + trend_bonus(article) + social_bonus(article)
+
+            # index は一意なので、記事の辞書同士が比較されることはない
+            entry = (score, _source_priority(article), _recency(article), -index, article)
+            if len(heap) < max_candidates:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
 
-        # スコアでソートして上位を取得
-        sorted_articles = sorted(articles, key=lambda x: x['preliminary_score'], reverse=True)
-        return sorted_articles[:max_candidates]
+        candidates = []
+        for score, _, _, _, article in sorted(heap, reverse=True):
+            article['preliminary_score'] = score
+            candidates.append(article)
+        return candidates
 
-    def _analyze_with_claude(self, candidates: List[Dict]) -> Dict:
+    def _analyze_with_claude(self, candidates: List[Dict], timeout: float = API_TIMEOUT) -> Dict:
         """
         Groq APIで候補記事を詳細分析
 
         Args:
             candidates: 候補記事のリスト
+            timeout: APIのタイムアウト（秒）
 
         Returns:
             分析結果
@@ -87,8 +257,8 @@ class SurpriseAnalyzer:
         # 候補記事をテキスト形式に整形
         candidates_text = self._format_candidates(candidates)
 
-        # プロンプト作成
-        prompt = self._create_analysis_prompt(candidates_text)
+        # メッセージ作成（固定のシステムメッセージ + 候補）
+        messages = self._create_messages(candidates_text)
 
         try:
             # Claude Codeを呼び出し（Groq API経由 - 直接HTTPリクエスト）
@@ -99,21 +269,27 @@ class SurpriseAnalyzer:
 
             payload = {
                 "model": self.model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                "messages": messages,
                 "temperature": 0.3,
-                "max_tokens": 2000
+                "max_tokens": 2000 if self.picks == 1 else 800 + TOKENS_PER_PICK * self.picks
             }
 
+            cached_text = self._load_cached_response(payload)
+            if cached_text is not None:
+                logger.info(f"Using cached Claude Code response: {len(cached_text)} chars")
+                result = self._parse_claude_response(cached_text, candidates)
+                result['llm_usage'] = {"prompt_version": PROMPT_VERSION, "cached_response": True}
+                return result
+
+            if not self.api_key:
+                logger.warning("No API key and no cached response, using fallback selection")
+                return self._fallback_selection(candidates)
+
             response = requests.post(
                 self.api_url,
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=timeout
             )
 
             response.raise_for_status()
@@ -121,10 +297,17 @@ class SurpriseAnalyzer:
             # レスポンスをパース
             response_data = response.json()
             response_text = response_data['choices'][0]['message']['content']
-            logger.info(f"Claude Code response received: {len(response_text)} chars")
+            usage = self._usage(response_data)
+            logger.info(
+                f"Claude Code response received: {len(response_text)} chars, "
+                f"{usage['prompt_tokens']} prompt tokens ({usage['cached_tokens']} cached), "
+                f"{usage['completion_tokens']} completion tokens"
+            )
+            self._store_cached_response(payload, response_text)
 
             # JSON形式で結果を抽出
             result = self._parse_claude_response(response_text, candidates)
+            result['llm_usage'] = usage
 
             return result
 
@@ -133,6 +316,42 @@ class SurpriseAnalyzer:
             # エラー時はフォールバック（最も preliminary_score が高いものを返す）
             return self._fallback_selection(candidates)
 
+    def _cache_path(self, payload: Dict) -> str:
+        """
+        リクエスト内容から決まるキャッシュファイルのパスを返す
+        """
+        key = hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_cached_response(self, payload: Dict) -> Optional[str]:
+        """
+        キャッシュ済みのLLM応答テキストを返す（キャッシュ無効・未登録の場合はNone）
+        """
+        if not self.cache_dir:
+            return None
+
+        path = self._cache_path(payload)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['response_text']
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring broken cache entry {path}: {e}")
+            return None
+
+    def _store_cached_response(self, payload: Dict, response_text: str):
+        """
+        LLM応答テキストをキャッシュに保存
+        """
+        if not self.cache_dir:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._cache_path(payload), 'w', encoding='utf-8') as f:
+            json.dump({"model": self.model, "response_text": response_text}, f, ensure_ascii=False)
+
     def _format_candidates(self, candidates: List[Dict]) -> str:
         """
         候補記事を分析用のテキストに整形
@@ -151,60 +370,121 @@ class SurpriseAnalyzer:
 タイトル: {article['title']}
 ソース: {article['source']}
 URL: {article['link']}
-公開日時: {article['published'].strftime('%Y-%m-%d %H:%M %Z')}
-要約: {article['summary'][:300]}
+公開日時: {article['published'].strftime('%Y-%m-%d %H:%M %Z')}{self._format_coverage(article)}{self._format_trend(article)}
+{self._format_body(article)}
 """)
 
         return "\n---\n".join(formatted)
 
-    def _create_analysis_prompt(self, candidates_text: str) -> str:
+    def _format_body(self, article: Dict) -> str:
         """
-        Claude Code用のプロンプトを作成
-
-        Args:
-            candidates_text: 候補記事のテキスト
+        本文を取得済みなら本文の冒頭、なければ要約
+        """
+        if article.get('content'):
+            return f"本文: {article['content'][:CONTENT_PROMPT_CHARS]}"
+        return f"要約: {article['summary'][:300]}"
 
-        Returns:
-            プロンプト文字列
+    def _format_coverage(self, article: Dict) -> str:
+        """
+        ストーリーの報道状況（他ソースでも報じられている場合のみ）
+        """
+        if article.get('coverage_breadth', 1) <= 1:
+            return ""
+        sources = ", ".join(dict.fromkeys(related['source'] for related in article.get('related', [])))
+        return (
+            f"\n報道状況: {article['coverage_breadth']}ソースが{article['story_size']}件報道"
+            f"（{article.get('coverage_velocity', 0)}件/時）: {sources}"
+        )
+
+    def _format_trend(self, article: Dict) -> str:
+        """
+        普段より言及が急増している語（スパイク語がある場合のみ）
         """
-        return f"""あなたはAIニュース特化のリサーチャー兼アナリストです。
+        if not article.get('trend_terms'):
+            return ""
+        return f"\n急上昇ワード: {', '.join(article['trend_terms'])}（スパイクスコア {article['trend_spike']}）"
 
-以下の候補ニュースの中から、**サプライズ度が最も高いAI関連ニュースを1件だけ**選び、分析してください。
+    def _create_messages(self, candidates_text: str) -> List[Dict]:
+        """
+        APIに送るメッセージを作成
 
-## 評価基準（サプライズ度）
+        システムメッセージ（役割・評価基準・出力形式）は、単一選定（SINGLE_SYSTEM_PROMPT）と
+        ランキング（RANKING_SYSTEM_PROMPT）の2種類の定数のどちらかで、同じモードの実行の間は先頭が毎回同じバイト列になり
+        プロバイダ側のプレフィックスキャッシュが効く（モードを切り替えた直後の1回はキャッシュに当たらない）。
+        実行ごとに変わる部分（候補・件数）はユーザーメッセージにのみ置く。
 
-1. **インパクト**: 性能・価格・ユーザー数・ビジネスインパクトが"桁違い"と言えるか
-2. **新規性**: 既存の延長線ではなく、発想・仕組み・スケールが非連続的か
-3. **現実性**: すでに利用可能、もしくは具体的な提供開始時期や実動デモが提示されているか
-4. **信頼性**: 企業や研究機関などの公式発表、または信頼できる一次情報に裏付けられているか
+        Args:
+            candidates_text: 候補記事のテキスト
 
-## 候補ニュース
+        Returns:
+            メッセージのリスト
+        """
+        if self.picks > 1:
+            system_prompt = RANKING_SYSTEM_PROMPT
+            instruction = f"上記の候補から上位{self.picks}件を選び、JSONのみを出力してください。"
+        else:
+            system_prompt = SINGLE_SYSTEM_PROMPT
+            instruction = "上記の候補から1件を選び、JSONのみを出力してください。"
+
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"## 候補ニュース\n{candidates_text}\n\n{instruction}"}
+        ]
+
+    def _usage(self, response_data: Dict) -> Dict:
+        """
+        APIレスポンスのトークン使用量（プレフィックスキャッシュに当たったトークン数を含む）
+        """
+        usage = response_data.get('usage') or {}
+        details = usage.get('prompt_tokens_details') or {}
+        return {
+            "prompt_version": PROMPT_VERSION,
+            "prompt_tokens": usage.get('prompt_tokens', 0),
+            "cached_tokens": details.get('cached_tokens') or 0,
+            "completion_tokens": usage.get('completion_tokens', 0),
+        }
 
-{candidates_text}
+    def _build_result(self, analyses: List[Dict], candidates: List[Dict], comparison: Optional[str] = None) -> Dict:
+        """
+        選定ごとの分析から結果を組み立てる
 
-## 出力形式
+        article / analysis は1位（従来の単一選定と同じ形式）、picks は順位順の全選定。
 
-以下のJSON形式で出力してください:
+        Args:
+            analyses: 選定ごとの分析（selected_index は1始まり、順位順）
+            candidates: 候補記事のリスト
+            comparison: 他候補との比較（1位の analysis に入れる）
 
-```json
-{{
-  "selected_index": 1,
-  "title_ja": "日本語タイトル",
-  "summary": "3-5行の概要（誰が何を発表し、どのような特徴があり、いつ利用可能か）",
-  "surprise_reasons": [
-    "インパクト面での驚き（具体的に）",
-    "新規性（従来との違い）",
-    "現実性（使える/具体的ロードマップ）"
-  ],
-  "engineer_impact": "エンジニア視点での意味（開発・運用・アーキテクチャへの影響）",
-  "business_impact": "ビジネス視点での意味（コスト・収益・戦略への影響）",
-  "surprise_score": 85,
-  "other_candidates_comparison": "他候補と比較してなぜこれが最もサプライズか"
-}}
-```
+        Returns:
+            分析結果
+        """
+        picks = []
+        seen = set()
+        for analysis in analyses:
+            try:
+                index = int(analysis.get('selected_index', 1)) - 1  # 0-indexed
+            except (TypeError, ValueError):
+                continue
+            if index < 0 or index >= len(candidates) or index in seen:
+                continue
+            seen.add(index)
+            picks.append({"rank": len(picks) + 1, "article": candidates[index], "analysis": analysis})
+            if len(picks) >= self.picks:
+                break
+
+        if not picks:
+            raise ValueError("No valid pick in response")
+
+        top = picks[0]["analysis"]
+        if comparison is not None:
+            top.setdefault('other_candidates_comparison', comparison)
 
-必ずJSONのみを出力してください。
-"""
+        return {
+            "article": picks[0]["article"],
+            "analysis": top,
+            "picks": picks,
+            "all_candidates": candidates
+        }
 
     def _parse_claude_response(self, response_text: str, candidates: List[Dict]) -> Dict:
         """
@@ -228,21 +508,21 @@ URL: {article['link']}
             json_text = response_text[json_start:json_end]
             analysis = json.loads(json_text)
 
-            # 選択された記事を取得
-            selected_index = analysis.get('selected_index', 1) - 1  # 0-indexed
-            if selected_index < 0 or selected_index >= len(candidates):
-                selected_index = 0
+            # ランキング形式（picks）と単一選定の両方を受け付ける
+            if isinstance(analysis.get('picks'), list):
+                return self._build_result(
+                    analysis['picks'], candidates, analysis.get('other_candidates_comparison')
+                )
 
-            selected_article = candidates[selected_index]
+            # 範囲外の番号は1番目の候補とみなす
+            try:
+                selected_index = int(analysis.get('selected_index', 1))
+            except (TypeError, ValueError):
+                selected_index = 1
+            if selected_index < 1 or selected_index > len(candidates):
+                analysis['selected_index'] = 1
 
-            # 結果を統合
-            result = {
-                "article": selected_article,
-                "analysis": analysis,
-                "all_candidates": candidates
-            }
-
-            return result
+            return self._build_result([analysis], candidates)
 
         except Exception as e:
             logger.error(f"Error parsing Claude response: {str(e)}")
@@ -258,23 +538,35 @@ URL: {article['link']}
         Returns:
             フォールバック結果
         """
-        # preliminary_scoreが最も高いものを選択
-        selected = candidates[0] if candidates else None
+        # preliminary_scoreが高い順（候補の並び順）に選択
+        picks = [
+            {
+                "rank": rank,
+                "article": selected,
+                "analysis": {
+                    "selected_index": rank,
+                    "title_ja": selected['title'],
+                    "summary": selected['summary'],
+                    "surprise_reasons": [
+                        "（自動分析失敗のため、キーワードスコアで選択）"
+                    ],
+                    "engineer_impact": "N/A",
+                    "business_impact": "N/A",
+                    "surprise_score": selected.get('preliminary_score', 0),
+                    "other_candidates_comparison": "N/A"
+                }
+            }
+            for rank, selected in enumerate(candidates[:self.picks], 1)
+        ]
 
         return {
-            "article": selected,
-            "analysis": {
-                "selected_index": 1,
-                "title_ja": selected['title'] if selected else "",
-                "summary": selected['summary'] if selected else "",
-                "surprise_reasons": [
-                    "（自動分析失敗のため、キーワードスコアで選択）"
-                ],
-                "engineer_impact": "N/A",
-                "business_impact": "N/A",
-                "surprise_score": selected.get('preliminary_score', 0) if selected else 0,
+            "article": picks[0]["article"] if picks else None,
+            "analysis": picks[0]["analysis"] if picks else {
+                "selected_index": 1, "title_ja": "", "summary": "", "surprise_reasons": [],
+                "engineer_impact": "N/A", "business_impact": "N/A", "surprise_score": 0,
                 "other_candidates_comparison": "N/A"
             },
+            "picks": picks,
             "all_candidates": candidates,
             "fallback": True
         }
@@ -0,0 +1,224 @@
+"""
+ベンチマーク・テスト用の合成コーパス生成
+
+実際のフィードに近い RSS 2.0 / Atom 文書と、解析済みの記事（英語・日本語、
+HTML要約付き）を再現可能な乱数で生成する。ネットワークには一切アクセスしない。
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+# 現在の1回の実行あたりの取得エントリ数の目安
+# （RSS 12ソース × 約20件 + X 12アカウント × 約5件）
+BASE_VOLUME = 300
+
+EN_SUBJECTS = ["OpenAI", "Anthropic", "Google DeepMind", "Meta AI", "Mistral", "NVIDIA", "Hugging Face",
+               "Microsoft", "Apple", "a startup", "Stanford researchers", "Amazon"]
+EN_VERBS = ["launches", "announces", "releases", "unveils", "open-sources", "teases", "delays", "updates"]
+EN_OBJECTS = ["a new LLM", "GPT-5 pricing", "Claude for enterprises", "Gemini 2 Ultra", "an open source model",
+              "a diffusion model for video", "a reinforcement learning agent", "AI chips",
+              "a breakthrough in reasoning", "a record-breaking benchmark", "a privacy policy", "a new phone"]
+EN_FILLER = ["The company said the model is available now to all users.",
+             "Analysts expect the move to reshape the market for generative AI.",
+             "Pricing starts at $20 per month, with an enterprise tier coming later.",
+             "The release includes weights under a permissive license.",
+             "Benchmarks show large gains in coding and math.",
+             "Critics raised concerns about safety and evaluation methodology.",
+             "The announcement comes a week after a competitor's launch."]
+
+JA_SUBJECTS = ["OpenAI", "グーグル", "ソフトバンク", "NTT", "国立情報学研究所", "楽天", "富士通", "Sakana AI",
+               "サイバーエージェント", "NEC", "LINEヤフー", "Preferred Networks"]
+JA_OBJECTS = ["新たな大規模言語モデル", "生成AIサービス", "画像生成AI", "音声合成エンジン", "対話AI",
+              "国産LLM", "AI半導体", "機械学習基盤", "深層学習フレームワーク", "社内向けチャットボット"]
+JA_VERBS = ["を発表", "を公開", "の提供開始", "をリリース", "をオープンソースで公開", "を世界初の手法で開発",
+            "の新料金を発表", "の実証実験を開始"]
+JA_FILLER = ["同社によると、すでに法人向けに提供を開始している。",
+             "日本語性能は従来モデルを大きく上回るという。",
+             "料金は月額3000円からで、API経由でも利用できる。",
+             "研究チームは画期的な成果だとしている。",
+             "今後は自治体や金融機関への導入を目指す。",
+             "専門家からは安全性の検証を求める声も上がっている。"]
+
+# 言語判定の精度評価用（中国語・韓国語の投稿、英語の製品名が多い日本語の投稿）
+ZH_TEXTS = ["OpenAI发布新一代大模型，推理能力大幅提升。", "百度宣布文心一言向所有用户开放。",
+            "阿里巴巴开源通义千问模型，支持多种语言。", "研究人员提出新的强化学习方法。",
+            "英伟达推出新款AI芯片，性能提升三倍。", "Anthropic发布Claude新版本，价格下调。"]
+KO_TEXTS = ["네이버가 새로운 초거대 AI 모델을 공개했다.", "삼성전자, 차세대 AI 반도체 양산 시작",
+            "카카오 생성형 AI 서비스 출시 예정", "OpenAI가 GPT-5를 발표했습니다.",
+            "LG AI연구원, 오픈소스 언어모델 공개"]
+JA_MIXED_TEXTS = ["OpenAIがGPT-5 Turbo APIをリリース、Function Callingにも対応",
+                  "Claude 3.5 SonnetのArtifacts機能を試してみた",
+                  "GitHub Copilot Workspaceがpublic previewに", "Llama 3をM2 MacBook Proで動かす",
+                  "Google I/O 2026まとめ：Gemini、Project Astra、Veo"]
+
+EN_SOURCES = ["TechCrunch AI", "VentureBeat AI", "The Verge AI", "MIT Technology Review AI", "OpenAI Blog",
+              "Anthropic News", "Hugging Face Blog", "DeepMind Blog", "X (@OpenAI)", "X (@karpathy)"]
+JA_SOURCES = ["ITmedia AI+", "AINOW", "Ledge.ai"]
+
+
+class SyntheticCorpus:
+    def __init__(self, seed: int = 42, now: Optional[datetime] = None, hours_lookback: int = 24,
+                 ja_ratio: float = 0.3, stale_ratio: float = 0.3, duplicate_ratio: float = 0.05):
+        """
+        Args:
+            seed: 乱数シード（同じシードなら同じコーパスを生成）
+            now: 基準時刻（既定: 現在時刻 UTC）
+            hours_lookback: 取得対象期間（この期間外の記事を stale_ratio の割合で混ぜる）
+            ja_ratio: 日本語記事の割合
+            stale_ratio: 取得対象期間より古い記事の割合
+            duplicate_ratio: URLが重複する記事の割合
+        """
+        self.random = random.Random(seed)
+        self.now = now or datetime.now(timezone.utc)
+        self.hours_lookback = hours_lookback
+        self.ja_ratio = ja_ratio
+        self.stale_ratio = stale_ratio
+        self.duplicate_ratio = duplicate_ratio
+        self._counter = 0
+
+    def _published(self) -> datetime:
+        if self.random.random() < self.stale_ratio:
+            hours = self.random.uniform(self.hours_lookback, self.hours_lookback * 7)
+        else:
+            hours = self.random.uniform(0, self.hours_lookback)
+        return self.now - timedelta(hours=hours)
+
+    def _text(self, language: str) -> Dict[str, str]:
+        rnd = self.random
+        if language == 'ja':
+            title = f"{rnd.choice(JA_SUBJECTS)}、{rnd.choice(JA_OBJECTS)}{rnd.choice(JA_VERBS)}"
+            body = [rnd.choice(JA_FILLER) for _ in range(rnd.randint(2, 5))]
+        else:
+            title = f"{rnd.choice(EN_SUBJECTS)} {rnd.choice(EN_VERBS)} {rnd.choice(EN_OBJECTS)}"
+            body = [rnd.choice(EN_FILLER) for _ in range(rnd.randint(2, 5))]
+        return {"title": title, "body": body}
+
+    def html_summary(self, language: str = 'en') -> str:
+        """
+        実際のフィードに近いHTML要約（段落・リンク・画像・強調・エンティティ参照を含む）を生成
+        """
+        text = self._text(language)
+        paragraphs = []
+        for i, sentence in enumerate(text["body"]):
+            if i == 0:
+                sentence = f"<strong>{escape(text['title'])}</strong> &mdash; {escape(sentence)}"
+            else:
+                sentence = escape(sentence)
+            paragraphs.append(f"<p>{sentence}</p>")
+
+        return (
+            f'<figure><img src="https://example.com/img/{self.random.randint(1, 10 ** 6)}.jpg" '
+            f'alt="" width="1200" height="675"/></figure>'
+            + "".join(paragraphs)
+            + f'<p>The post <a href="https://example.com/p/{self._counter}" rel="nofollow">'
+            f'{escape(text["title"])}</a> appeared first on Example.</p>'
+        )
+
+    def article(self) -> Dict:
+        """
+        解析済みの記事を1件生成（FeedCollector._parse_feed の出力と同じ形式）
+        """
+        language = 'ja' if self.random.random() < self.ja_ratio else 'en'
+        text = self._text(language)
+        self._counter += 1
+
+        if self._counter > 1 and self.random.random() < self.duplicate_ratio:
+            link_id = self.random.randint(1, self._counter - 1)
+        else:
+            link_id = self._counter
+
+        return {
+            "title": text["title"],
+            "link": f"https://news.example.com/{language}/{link_id}",
+            "published": self._published(),
+            "summary": " ".join(text["body"])[:500],
+            "source": self.random.choice(JA_SOURCES if language == 'ja' else EN_SOURCES),
+            "language": language
+        }
+
+    def articles(self, count: int) -> List[Dict]:
+        """
+        解析済みの記事を count 件生成
+        """
+        return [self.article() for _ in range(count)]
+
+    def labeled_text(self) -> Dict[str, str]:
+        """
+        正解ラベル付きのテキストを1件生成（言語判定の精度評価用）
+
+        Returns:
+            {"text": テキスト, "language": 'en' / 'ja' / 'zh' / 'ko'}
+        """
+        rnd = self.random
+        kind = rnd.choice(['en', 'ja', 'ja_mixed', 'zh', 'ko'])
+        if kind == 'zh':
+            return {"text": rnd.choice(ZH_TEXTS), "language": 'zh'}
+        if kind == 'ko':
+            return {"text": rnd.choice(KO_TEXTS), "language": 'ko'}
+        if kind == 'ja_mixed':
+            return {"text": rnd.choice(JA_MIXED_TEXTS), "language": 'ja'}
+
+        text = self._text(kind)
+        return {"text": f"{text['title']} {' '.join(text['body'])}", "language": kind}
+
+    def labeled_texts(self, count: int) -> List[Dict[str, str]]:
+        """
+        正解ラベル付きのテキストを count 件生成
+        """
+        return [self.labeled_text() for _ in range(count)]
+
+    def feed(self, entries: int, language: str = 'en', fmt: str = 'rss') -> bytes:
+        """
+        RSS 2.0 または Atom のフィード文書を生成
+
+        Args:
+            entries: エントリ数
+            language: 'en' または 'ja'
+            fmt: 'rss' または 'atom'
+
+        Returns:
+            フィード文書（UTF-8）
+        """
+        items = []
+        for _ in range(entries):
+            self._counter += 1
+            text = self._text(language)
+            link = f"https://news.example.com/{language}/{self._counter}"
+            published = self._published()
+            summary = escape(self.html_summary(language))
+            title = escape(text["title"])
+
+            if fmt == 'atom':
+                item = (
+                    f"<entry><title>{title}</title><link rel=\"alternate\" href=\"{link}\"/>"
+                    f"<id>{link}</id><published>{published.isoformat()}</published>"
+                    f"<updated>{published.isoformat()}</updated>"
+                    f"<summary type=\"html\">{summary}</summary></entry>"
+                )
+            else:
+                item = (
+                    f"<item><title>{title}</title><link>{link}</link><guid>{link}</guid>"
+                    f"<pubDate>{format_datetime(published)}</pubDate>"
+                    f"<description>{summary}</description></item>"
+                )
+            items.append((published, item))
+
+        # 実際のフィードと同様に新しい順に並べる
+        body = "".join(item for _, item in sorted(items, key=lambda x: x[0], reverse=True))
+
+        if fmt == 'atom':
+            return (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<feed xmlns="http://www.w3.org/2005/Atom"><title>Synthetic</title>'
+                f'<updated>{self.now.isoformat()}</updated>'
+                + body + '</feed>'
+            ).encode('utf-8')
+
+        return (
+            '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            f'<title>Synthetic</title><link>https://news.example.com/</link><language>{language}</language>'
+            + body + '</channel></rss>'
+        ).encode('utf-8')
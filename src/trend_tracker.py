@@ -0,0 +1,352 @@
+"""
+固有名詞の出現頻度の急上昇（トレンドスパイク）検出
+
+実行ごとの記事を1つの時間バケットとし、固有名詞ごとに「その名詞を含む記事数」を数える。
+過去のバケットは半減期で減衰させながら Count-Min Sketch（全語）と Space-Saving（頻出語）に畳み込み、
+平常時の出現率（ベースライン）とする。今回の出現数がベースラインからの期待値を大きく上回る語を
+スパイクとみなし、候補選定のスコアに加える。
+
+どちらの構造も固定サイズのため、状態ファイルの大きさは履歴の長さに関わらず一定に保たれる。
+"""
+
+import os
+import sys
+import gzip
+import json
+import math
+import zlib
+import base64
+import logging
+from array import array
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from profiling import profiled
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TREND_STATE_VERSION = 1
+
+# Count-Min Sketch の大きさ（幅 × 深さ。1日数千語の固有名詞に対し誤差が小さくなるよう設定）
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+
+# 減衰付き Space-Saving で追跡する頻出語の数
+HEAVY_HITTERS = 256
+
+# ベースラインの半減期（日）
+HALF_LIFE_DAYS = 7.0
+
+# スパイク判定の条件
+MIN_BASELINE_BUCKETS = 3   # これ未満のバケットしかない間はスパイクを出さない
+MIN_SPIKE_COUNT = 3        # 今回これ以上の記事に出現した語のみ対象
+SPIKE_THRESHOLD = 3.0      # (出現数 - 期待値) / sqrt(期待値 + 1) がこれ以上ならスパイク
+
+# 記事に付与するスパイク語の数
+MAX_TREND_TERMS = 3
+
+
+class CountMinSketch:
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH, table: Optional[array] = None):
+        """
+        Args:
+            width: 各行のカウンタ数
+            depth: 行数（ハッシュ関数の数）
+            table: 保存済みのカウンタ（width × depth）
+        """
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else array('f', bytes(4 * width * depth))
+
+    def _cells(self, key: str) -> List[int]:
+        # プロセス・実行をまたいで同じ位置になるよう、行ごとに初期値を変えた crc32 を使う
+        data = key.encode('utf-8')
+        return [row * self.width + zlib.crc32(data, row + 1) % self.width for row in range(self.depth)]
+
+    def add(self, key: str, count: float = 1.0):
+        """
+        カウントを加算（保守的更新: 最小のカウンタに合わせて必要な分だけ増やし、過大評価を抑える）
+        """
+        cells = self._cells(key)
+        target = min(self.table[cell] for cell in cells) + count
+        for cell in cells:
+            if self.table[cell] < target:
+                self.table[cell] = target
+
+    def estimate(self, key: str) -> float:
+        """
+        カウントの推定値（真の値を下回らない）
+        """
+        return min(self.table[cell] for cell in self._cells(key))
+
+    def scale(self, factor: float):
+        """
+        全カウンタに係数を掛ける（減衰）
+        """
+        for i in range(len(self.table)):
+            self.table[i] *= factor
+
+
+class DecayedHeavyHitters:
+    def __init__(self, capacity: int = HEAVY_HITTERS, counters: Optional[Dict[str, List[float]]] = None):
+        """
+        Args:
+            capacity: 追跡する語の数
+            counters: 保存済みのカウンタ（語 -> [カウント, 誤差]）
+        """
+        self.capacity = capacity
+        self.counters = counters if counters is not None else {}
+
+    def add(self, key: str, count: float = 1.0):
+        """
+        カウントを加算（満杯なら最小の語を置き換える Space-Saving）
+        """
+        if key in self.counters:
+            self.counters[key][0] += count
+            return
+
+        if len(self.counters) < self.capacity:
+            self.counters[key] = [count, 0.0]
+            return
+
+        evicted = min(self.counters, key=lambda term: self.counters[term][0])
+        floor = self.counters.pop(evicted)[0]
+        self.counters[key] = [floor + count, floor]
+
+    def estimate(self, key: str) -> Optional[float]:
+        """
+        カウントの推定値（追跡していない語はNone）
+        """
+        counter = self.counters.get(key)
+        return counter[0] if counter else None
+
+    def decay(self, factor: float):
+        for counter in self.counters.values():
+            counter[0] *= factor
+            counter[1] *= factor
+
+    def top(self, limit: int = 10) -> List[tuple]:
+        """
+        カウントの多い順に (語, カウント) を返す
+        """
+        ranked = sorted(self.counters.items(), key=lambda item: item[1][0], reverse=True)
+        return [(term, round(counter[0], 2)) for term, counter in ranked[:limit]]
+
+
+def article_terms(article: Dict) -> set:
+    """
+    記事から追跡対象の語（固有名詞）を抽出
+    """
+    from story_cluster import extract_entities
+
+    return extract_entities(f"{article.get('title', '')} {article.get('summary', '')[:300]}")
+
+
+class TrendTracker:
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH, capacity: int = HEAVY_HITTERS,
+                 half_life_days: float = HALF_LIFE_DAYS):
+        """
+        Args:
+            width: Count-Min Sketch の幅
+            depth: Count-Min Sketch の深さ
+            capacity: 頻出語として追跡する語の数
+            half_life_days: ベースラインの半減期（日）
+        """
+        self.half_life_days = half_life_days
+        self.sketch = CountMinSketch(width, depth)
+        self.heavy = DecayedHeavyHitters(capacity)
+        self.baseline_articles = 0.0
+        self.buckets = 0
+        self.last_bucket_id: Optional[str] = None
+        self.last_bucket_at: Optional[datetime] = None
+
+        # 今回のバケット（保存しない。1回の実行の記事数に比例するだけで履歴には依存しない）
+        self.current: Counter = Counter()
+        self.current_articles = 0
+
+    def observe(self, articles: Iterable[Dict]):
+        """
+        今回の記事の語を数える（1記事につき1語1回）
+        """
+        for article in articles:
+            self.current.update(article_terms(article))
+            self.current_articles += 1
+
+    def expected(self, term: str) -> Optional[float]:
+        """
+        ベースラインの出現率から見た、今回の記事数での期待出現数（ベースラインが不十分ならNone）
+        """
+        if self.buckets < MIN_BASELINE_BUCKETS or self.baseline_articles <= 0:
+            return None
+
+        # どちらも過大評価しかしないため、小さい方がより正確
+        count = self.sketch.estimate(term)
+        heavy = self.heavy.estimate(term)
+        if heavy is not None:
+            count = min(count, heavy)
+
+        return count / self.baseline_articles * self.current_articles
+
+    def spike_score(self, term: str) -> float:
+        """
+        語のスパイクスコア（期待値からの超過を Poisson の標準偏差で割ったもの。対象外は0）
+        """
+        count = self.current.get(term, 0)
+        if count < MIN_SPIKE_COUNT:
+            return 0.0
+
+        expected = self.expected(term)
+        if expected is None:
+            return 0.0
+
+        return round(max(count - expected, 0.0) / math.sqrt(expected + 1), 2)
+
+    def trending(self, limit: int = 10) -> List[Dict]:
+        """
+        今回スパイクしている語をスコア順に返す
+
+        Returns:
+            term / count / expected / score を含む辞書のリスト
+        """
+        rows = []
+        for term, count in self.current.items():
+            score = self.spike_score(term)
+            if score >= SPIKE_THRESHOLD:
+                rows.append({"term": term, "count": count, "expected": round(self.expected(term), 2), "score": score})
+        # 同点は語順（set の反復順に依存しないように）
+        rows.sort(key=lambda row: (-row["score"], row["term"]))
+        return rows[:limit]
+
+    @profiled()
+    def annotate(self, articles: List[Dict]) -> List[Dict]:
+        """
+        記事に trend_spike（含まれる語の最大スパイクスコア）と trend_terms（スパイク語）を付与
+
+        Args:
+            articles: 記事のリスト（その場で更新する）
+
+        Returns:
+            同じ記事のリスト
+        """
+        for article in articles:
+            scores = sorted(
+                ((self.spike_score(term), term) for term in article_terms(article)),
+                key=lambda pair: (-pair[0], pair[1])
+            )
+            article['trend_spike'] = scores[0][0] if scores else 0.0
+            article['trend_terms'] = [term for score, term in scores[:MAX_TREND_TERMS] if score >= SPIKE_THRESHOLD]
+        return articles
+
+    def commit(self, bucket_id: str, at: datetime) -> bool:
+        """
+        今回のバケットをベースラインに畳み込む（前回からの経過時間に応じて減衰させる）
+
+        Args:
+            bucket_id: バケットの ID（ラン ID。同じ ID の再実行では二重に数えない）
+            at: バケットの時刻
+
+        Returns:
+            畳み込んだ場合はTrue
+        """
+        if bucket_id == self.last_bucket_id:
+            logger.info(f"Trend bucket {bucket_id} already committed, skipping")
+            return False
+
+        if self.last_bucket_at is not None:
+            elapsed_days = max((at - self.last_bucket_at).total_seconds() / 86400, 0.0)
+            factor = 0.5 ** (elapsed_days / self.half_life_days)
+            self.sketch.scale(factor)
+            self.heavy.decay(factor)
+            self.baseline_articles *= factor
+
+        for term, count in self.current.items():
+            self.sketch.add(term, count)
+            self.heavy.add(term, count)
+        self.baseline_articles += self.current_articles
+        self.buckets += 1
+        self.last_bucket_id = bucket_id
+        self.last_bucket_at = at
+
+        return True
+
+    def save(self, path: str):
+        """
+        状態をgzip圧縮JSONで保存（一時ファイルに書いてから置き換える）
+        """
+        table = array('f', self.sketch.table)
+        if sys.byteorder != 'little':
+            table.byteswap()
+
+        state = {
+            "version": TREND_STATE_VERSION,
+            "width": self.sketch.width,
+            "depth": self.sketch.depth,
+            "half_life_days": self.half_life_days,
+            "sketch": base64.b64encode(table.tobytes()).decode('ascii'),
+            "heavy_capacity": self.heavy.capacity,
+            "heavy": self.heavy.counters,
+            "baseline_articles": self.baseline_articles,
+            "buckets": self.buckets,
+            "last_bucket_id": self.last_bucket_id,
+            "last_bucket_at": self.last_bucket_at.isoformat() if self.last_bucket_at else None,
+        }
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'TrendTracker':
+        """
+        保存済みの状態を読み込む（存在しない・互換性がない場合は空の状態）
+        """
+        tracker = cls()
+        if not os.path.exists(path):
+            return tracker
+
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable trend state {path}: {e}")
+            return tracker
+
+        if state.get("version") != TREND_STATE_VERSION:
+            logger.warning(f"Ignoring trend state {path} with version {state.get('version')}")
+            return tracker
+
+        table = array('f')
+        table.frombytes(base64.b64decode(state["sketch"]))
+        if sys.byteorder != 'little':
+            table.byteswap()
+
+        tracker.half_life_days = state["half_life_days"]
+        tracker.sketch = CountMinSketch(state["width"], state["depth"], table)
+        tracker.heavy = DecayedHeavyHitters(state["heavy_capacity"], state["heavy"])
+        tracker.baseline_articles = state["baseline_articles"]
+        tracker.buckets = state["buckets"]
+        tracker.last_bucket_id = state["last_bucket_id"]
+        tracker.last_bucket_at = datetime.fromisoformat(state["last_bucket_at"]) if state["last_bucket_at"] else None
+        return tracker
+
+
+def trend_bonus(article: Dict) -> int:
+    """
+    トレンドスパイクに応じた予備スコアの加点
+
+    Args:
+        article: TrendTracker.annotate() 済みの記事（未付与の記事は0点）
+
+    Returns:
+        加点（スパイクスコアが閾値以上なら2点、閾値の2倍以上なら3点）
+    """
+    spike = article.get('trend_spike', 0)
+    if spike >= SPIKE_THRESHOLD * 2:
+        return 3
+    if spike >= SPIKE_THRESHOLD:
+        return 2
+    return 0
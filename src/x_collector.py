@@ -3,118 +3,263 @@ X (Twitter) からAI関連の投稿を収集
 Nitter + RSSHub を使用した無料統合
 """
 
-# from ntscraper import Nitter
+import re
+import math
+import time
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional
 import pytz
 from bs4 import BeautifulSoup
 
+from language_detector import label_articles
+from x_search import SEARCH_TIMEOUT, SearchBackend, create_backend
+from deadline import Deadline, unlimited
+from source_health import SourceHealth
+from source_registry import slugify
+from profiling import profiled
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Nitter の日時表記（"Jan 1, 2025 · 12:00 PM UTC"）
+NITTER_DATE_PATTERN = re.compile(r'^(\w{3} \d{1,2}, \d{4})\s*·\s*(\d{1,2}:\d{2} [AP]M)(?:\s+UTC)?$')
+
 
 class XCollector:
-    def __init__(self, timezone: str = "Asia/Tokyo", hours_lookback: int = 24):
+    def __init__(self, timezone: str = "Asia/Tokyo", hours_lookback: int = 24,
+                 search_backend: Optional[SearchBackend] = None, search_workers: int = 8,
+                 health: Optional[SourceHealth] = None, search_timeout: float = SEARCH_TIMEOUT):
         """
         Args:
             timezone: タイムゾーン
             hours_lookback: 何時間前までの投稿を取得するか
+            search_backend: X検索バックエンド（既定: 環境変数から生成。未設定ならX検索を行わない）
+            search_workers: キーワードごとの検索を並列に実行するスレッド数
+            health: ソースの健全性の記録（指定した場合、失敗し続けるRSSHubのアカウントはバックオフ中の取得を見送る）
+            search_timeout: 1ページの検索リクエストのタイムアウト（秒。期限の残り時間がこれより短ければ残り時間）
         """
         self.timezone = pytz.timezone(timezone)
         self.hours_lookback = hours_lookback
         self.cutoff_time = datetime.now(self.timezone) - timedelta(hours=hours_lookback)
-
-        # Nitterインスタンス（X検索用）
-        # Nitter disabled (ntscraper dependency removed)
-        self.scraper = None
-
-    def collect_from_search(self, keywords: List[str], max_tweets: int = 50) -> List[Dict]:
+        self.search_backend = search_backend if search_backend is not None else create_backend()
+        self.search_workers = search_workers
+        self.search_timeout = search_timeout
+        self.health = health
+        # 直近の collect_from_search / fetch_rsshub_raw で収集できなかったソース（{"source", "reason"}）
+        self.skipped_sources: List[Dict] = []
+
+    @profiled()
+    def collect_from_search(self, keywords: List[str], max_tweets: int = 50,
+                            deadline: Optional[Deadline] = None) -> List[Dict]:
         """
-        Nitter経由でX検索から投稿を収集
+        X検索から投稿を収集（キーワードごとに並列に検索）
 
         Args:
             keywords: 検索キーワードリスト
-            max_tweets: 最大取得数
+            max_tweets: 全キーワード合計の最大取得数（キーワードごとに均等に割り振り、重複除去後に切り詰める）
+            deadline: 検索の期限（過ぎたら次のページ・未着手のキーワードは取得しない）
 
         Returns:
-            投稿のリスト
+            投稿のリスト（取得対象期間内のもののみ、URLで重複除去済み）
         """
-        if not self.scraper:
-            logger.warning("Nitter scraper not available, skipping X search")
+        self.skipped_sources = []
+        if not self.search_backend:
+            logger.warning("X search backend not configured, skipping X search")
             return []
 
         articles = []
+        seen_links = set()
+        per_keyword = math.ceil(max_tweets / max(1, len(keywords)))
 
-        # キーワードをOR検索クエリに変換
-        query = " OR ".join(keywords)
+        with ThreadPoolExecutor(max_workers=max(1, min(len(keywords), self.search_workers))) as executor:
+            results = executor.map(lambda keyword: self._search_keyword(keyword, per_keyword, deadline), keywords)
 
-        try:
-            logger.info(f"Searching X for: {query}")
+            for keyword_articles in results:
+                for article in keyword_articles:
+                    # 複数のキーワードに一致した投稿は1件にまとめる
+                    if article['link'] in seen_links:
+                        continue
+                    seen_links.add(article['link'])
+                    articles.append(article)
 
-            # Nitterで検索
-            tweets = self.scraper.get_tweets(query, mode='term', number=max_tweets)
+        articles = articles[:max_tweets]
+        label_articles(articles)
+        logger.info(f"Collected {len(articles)} tweets from X search ({self.search_backend.name})")
 
-            for tweet in tweets.get('tweets', []):
-                # 投稿日時を解析
-                published_date = self._parse_tweet_date(tweet.get('date'))
+        return articles
 
-                if not published_date or published_date < self.cutoff_time:
-                    continue
+    def _search_keyword(self, keyword: str, max_tweets: int, deadline: Optional[Deadline] = None) -> List[Dict]:
+        """
+        1キーワードの検索結果をページングしながら取得
 
-                # リンクを抽出
-                link = tweet.get('link', '')
-                if not link:
-                    continue
+        取得対象期間より古い投稿に達した時点、または期限を過ぎた時点で打ち切る（検索結果は新しい順）。
 
-                article = {
-                    'title': tweet.get('text', '')[:100],  # 最初の100文字をタイトルとして使用
-                    'link': link,
-                    'published': published_date,
-                    'summary': tweet.get('text', ''),
-                    'source': f"X (@{tweet.get('user', {}).get('name', 'unknown')})",
-                    'language': 'en' if self._is_english(tweet.get('text', '')) else 'ja'
-                }
+        Args:
+            keyword: 検索キーワード
+            max_tweets: 最大取得数
+            deadline: 検索の期限
 
-                articles.append(article)
+        Returns:
+            投稿のリスト
+        """
+        deadline = deadline or unlimited()
+        articles = []
+        cursor = None
+        pages = 0
 
-            logger.info(f"Collected {len(articles)} tweets from X search")
+        try:
+            while len(articles) < max_tweets:
+                if deadline.expired():
+                    if not pages:
+                        self.skipped_sources.append({"source": f"X search: {keyword}", "reason": "deadline"})
+                    break
+                page = self.search_backend.search(keyword, cursor, timeout=deadline.timeout(self.search_timeout))
+                pages += 1
+                reached_cutoff = False
+
+                for tweet in page.get('tweets', []):
+                    # 投稿日時を解析
+                    published_date = self._parse_tweet_date(tweet.get('date'))
+                    if not published_date:
+                        continue
+                    if published_date < self.cutoff_time:
+                        reached_cutoff = True
+                        continue
+
+                    # リンクを抽出
+                    link = tweet.get('link', '')
+                    if not link:
+                        continue
+
+                    articles.append({
+                        'title': tweet.get('text', '')[:100],  # 最初の100文字をタイトルとして使用
+                        'link': link,
+                        'published': published_date,
+                        'summary': tweet.get('text', ''),
+                        'source': f"X (@{tweet.get('user', {}).get('name', 'unknown')})",
+                        'language': None  # 収集後にまとめて判定
+                    })
+                    if len(articles) >= max_tweets:
+                        break
+
+                cursor = page.get('next_cursor')
+                if reached_cutoff or not cursor:
+                    break
 
         except Exception as e:
-            logger.error(f"Error collecting from X search: {str(e)}")
+            logger.error(f"Error searching X for '{keyword}': {str(e)}")
+            if not pages:
+                self.skipped_sources.append({"source": f"X search: {keyword}", "reason": "error"})
 
+        logger.info(f"X search '{keyword}': {len(articles)} tweets from {pages} pages")
         return articles
 
-    def collect_from_rsshub(self, accounts: List[str]) -> List[Dict]:
+    def collect_from_rsshub(self, accounts: List[Dict]) -> List[Dict]:
         """
         RSSHub経由で特定アカウントの投稿を収集
 
         Args:
-            accounts: Xアカウント名のリスト（@なし）
+            accounts: レジストリのXアカウントのリスト（id, account）
 
         Returns:
             投稿のリスト
         """
-        articles = []
+        return self.parse_rsshub_raw(self.fetch_rsshub_raw(accounts))
+
+    @profiled()
+    def fetch_rsshub_raw(self, accounts: List[Dict], deadline: Optional[Deadline] = None) -> List[Dict]:
+        """
+        RSSHub経由で各アカウントのフィード本文（未解析）を取得
+
+        Args:
+            accounts: レジストリのXアカウントのリスト（id, account。account は@なしのアカウント名）
+            deadline: 取得の期限（過ぎたら残りのアカウントは取得せず skipped_sources に記録）
+
+        Returns:
+            {"account": アカウント名, "content": フィード本文(bytes)} のリスト
+        """
+        deadline = deadline or unlimited()
+        self.skipped_sources = []
+        raw_feeds = []
 
         # 公開RSSHubインスタンス
         rsshub_base = "https://rsshub.app/twitter/user"
-
-        for account in accounts:
+        request_timeout = 10
+
+        for entry in accounts:
+            account = entry["account"]
+            if deadline.expired():
+                self.skipped_sources.append({"source": f"X (@{account})", "reason": "deadline"})
+                continue
+
+            source_id = self._source_id(entry)
+            if self.health and not self.health.should_attempt(source_id):
+                self.skipped_sources.append({"source": f"X (@{account})", "reason": "backoff"})
+                continue
+
+            capped = deadline.caps(request_timeout)
+            started = time.monotonic()
+            error = None
             try:
                 url = f"{rsshub_base}/{account}"
                 logger.info(f"Fetching RSS from RSSHub: {account}")
 
-                response = requests.get(url, timeout=10)
+                response = requests.get(url, timeout=deadline.timeout(request_timeout))
 
                 if response.status_code != 200:
                     logger.warning(f"Failed to fetch RSS for @{account}: {response.status_code}")
-                    continue
+                    error = f"HTTP {response.status_code}"
+                else:
+                    raw_feeds.append({"account": account, "content": response.content})
+
+            except Exception as e:
+                logger.error(f"Error collecting from @{account}: {str(e)}")
+                error = str(e)
 
+            # 期限の残り時間で短縮したタイムアウトのまま期限切れになった失敗は、健全性の失敗に数えない
+            cut_short = error is not None and capped and deadline.expired()
+            if error:
+                self.skipped_sources.append({"source": f"X (@{account})", "reason": "deadline" if cut_short else "error"})
+            if self.health and not cut_short:
+                if error:
+                    self.health.record_failure(source_id, error, time.monotonic() - started)
+                else:
+                    self.health.record_success(source_id, time.monotonic() - started)
+
+        return raw_feeds
+
+    def _source_id(self, entry: Dict) -> str:
+        """
+        健全性の記録に使うソース ID（レジストリの ID、なければアカウント名から生成）
+        """
+        return entry.get("id") or f"x-{slugify(entry['account'])}"
+
+    @profiled()
+    def parse_rsshub_raw(self, raw_feeds: List[Dict]) -> List[Dict]:
+        """
+        取得済みのRSSHubフィード本文を解析して投稿に変換
+
+        Args:
+            raw_feeds: fetch_rsshub_raw() の戻り値
+
+        Returns:
+            投稿のリスト
+        """
+        import feedparser
+
+        articles = []
+
+        for raw in raw_feeds:
+            account = raw["account"]
+            account_articles = []
+
+            try:
                 # RSSフィードを解析
-                import feedparser
-                feed = feedparser.parse(response.content)
+                feed = feedparser.parse(raw["content"])
 
                 for entry in feed.entries:
                     # 公開日時を取得
@@ -136,39 +281,66 @@ class XCollector:
                         'published': published_date,
                         'summary': summary,
                         'source': f"X (@{account})",
-                        'language': 'en' if self._is_english(summary) else 'ja'
+                        'language': None  # 収集後にまとめて判定
                     }
 
-                    articles.append(article)
+                    account_articles.append(article)
 
-                logger.info(f"Collected {len([a for a in articles if a['source'] == f'X (@{account})'])} tweets from @{account}")
+                logger.info(f"Collected {len(account_articles)} tweets from @{account}")
 
             except Exception as e:
-                logger.error(f"Error collecting from @{account}: {str(e)}")
+                logger.error(f"Error parsing RSS for @{account}: {str(e)}")
 
-        return articles
+            articles.extend(account_articles)
+
+        # 全アカウントの投稿の言語をまとめて判定
+        return label_articles(articles)
 
-    def _parse_tweet_date(self, date_str: str) -> datetime:
+    def _parse_tweet_date(self, date_str: str) -> Optional[datetime]:
         """
         ツイートの日時文字列を解析
 
+        対応形式:
+            Nitter:   "Jan 1, 2025 · 12:00 PM UTC"
+            ISO 8601: "2025-01-01T12:00:00Z" / "2025-01-01T21:00:00+09:00"
+            RFC 822:  "Wed, 01 Jan 2025 12:00:00 GMT"（Nitter の検索RSS）
+
         Args:
             date_str: 日時文字列
 
         Returns:
-            datetime オブジェクト
+            datetime オブジェクト（タイムゾーン付き。解析できない場合はNone）
         """
         if not date_str:
             return None
 
-        try:
-            # Nitterのフォーマット: "Jan 1, 2025 · 12:00 PM UTC"
-            # 簡略化のため、現在時刻を使用（より正確な解析は必要に応じて実装）
-            return datetime.now(self.timezone)
-        except Exception as e:
-            logger.warning(f"Failed to parse date: {date_str}, error: {e}")
+        text = date_str.strip()
+        dt = None
+
+        match = NITTER_DATE_PATTERN.match(text)
+        if match:
+            try:
+                dt = datetime.strptime(f"{match.group(1)} {match.group(2)}", "%b %d, %Y %I:%M %p")
+            except ValueError:
+                dt = None
+        else:
+            try:
+                dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+            except ValueError:
+                try:
+                    dt = parsedate_to_datetime(text)
+                except (TypeError, ValueError, IndexError):
+                    dt = None
+
+        if dt is None:
+            logger.warning(f"Failed to parse date: {date_str}")
             return None
 
+        # タイムゾーンの記載がない日時は UTC とみなす
+        if dt.tzinfo is None:
+            dt = pytz.utc.localize(dt)
+        return dt.astimezone(self.timezone)
+
     def _parse_date(self, entry) -> datetime:
         """
         RSSエントリから日時を解析
@@ -208,20 +380,3 @@ class XCollector:
         soup = BeautifulSoup(html_text, 'lxml')
         text = soup.get_text(separator=' ', strip=True)
         return text[:500]
-
-    def _is_english(self, text: str) -> bool:
-        """
-        テキストが英語かどうかを判定
-
-        Args:
-            text: テキスト
-
-        Returns:
-            英語ならTrue
-        """
-        if not text:
-            return True
-
-        # 簡易判定: ASCIIが70%以上なら英語
-        ascii_chars = sum(1 for c in text if ord(c) < 128)
-        return (ascii_chars / len(text)) > 0.7
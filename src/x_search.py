@@ -0,0 +1,136 @@
+"""
+X (Twitter) 検索のバックエンド
+
+XCollector.collect_from_search はキーワードごとに SearchBackend.search() を呼び出し、
+カーソルをたどってページングする。バックエンドは次の形式のページを返す:
+
+    {"tweets": [{"text": ..., "link": ..., "date": ..., "user": {"name": ...}}, ...],
+     "next_cursor": 次のページのカーソル（最後のページならNone）}
+
+投稿は新しい順に並んでいる前提で、取得対象期間より古い投稿に達した時点でページングを打ち切る。
+
+バックエンドは環境変数で選択する:
+    X_SEARCH_FIXTURE=path/to/tweets.json   ローカルのフィクスチャ（テスト・オフライン実行用）
+    NITTER_INSTANCE=https://nitter.example  Nitter の検索RSS
+"""
+
+import os
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 1ページの検索リクエストの既定のタイムアウト（秒）
+SEARCH_TIMEOUT = 10
+
+
+class SearchBackend(ABC):
+    """X検索バックエンドの基底クラス"""
+
+    name = "base"
+
+    @abstractmethod
+    def search(self, query: str, cursor: Optional[str] = None, timeout: Optional[float] = None) -> Dict:
+        """
+        1ページ分の検索結果を返す
+
+        Args:
+            query: 検索クエリ（1キーワード）
+            cursor: 前のページの next_cursor（最初のページはNone）
+            timeout: リクエストのタイムアウト（秒。Noneならバックエンドの既定値）
+
+        Returns:
+            {"tweets": 投稿のリスト（新しい順）, "next_cursor": 次のページのカーソル}
+        """
+
+
+class FixtureSearchBackend(SearchBackend):
+    """クエリ -> 投稿のリストを保持し、ページ単位で返すバックエンド（テスト・オフライン実行用）"""
+
+    name = "fixture"
+
+    def __init__(self, fixture, page_size: int = 20):
+        """
+        Args:
+            fixture: クエリ -> 投稿のリストの辞書、またはそれを保存したJSONファイルのパス
+            page_size: 1ページあたりの投稿数
+        """
+        if isinstance(fixture, str):
+            with open(fixture, 'r', encoding='utf-8') as f:
+                fixture = json.load(f)
+
+        self.fixture = fixture
+        self.page_size = page_size
+
+    def search(self, query: str, cursor: Optional[str] = None, timeout: Optional[float] = None) -> Dict:
+        tweets = self.fixture.get(query, [])
+        offset = int(cursor or 0)
+        end = offset + self.page_size
+        return {
+            "tweets": tweets[offset:end],
+            "next_cursor": str(end) if end < len(tweets) else None
+        }
+
+
+class NitterSearchBackend(SearchBackend):
+    """Nitter の検索RSS（/search/rss）を使うバックエンド"""
+
+    name = "nitter"
+
+    def __init__(self, instance: str, timeout: float = SEARCH_TIMEOUT):
+        """
+        Args:
+            instance: Nitter インスタンスのURL（例: https://nitter.example.com）
+            timeout: リクエストの既定のタイムアウト（秒）
+        """
+        self.instance = instance.rstrip('/')
+        self.timeout = timeout
+
+    def search(self, query: str, cursor: Optional[str] = None, timeout: Optional[float] = None) -> Dict:
+        import feedparser
+        import requests
+
+        params = {"f": "tweets", "q": query}
+        if cursor:
+            params["cursor"] = cursor
+
+        response = requests.get(f"{self.instance}/search/rss?{urlencode(params)}",
+                                timeout=timeout if timeout is not None else self.timeout)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content)
+
+        tweets = [
+            {
+                "text": entry.get('title', ''),
+                "link": entry.get('link', ''),
+                "date": entry.get('published', ''),
+                "user": {"name": entry.get('author', 'unknown').lstrip('@')},
+            }
+            for entry in feed.entries
+        ]
+
+        # Nitter は次のページのカーソルを Min-Id ヘッダで返す
+        next_cursor = response.headers.get('Min-Id') if tweets else None
+        return {"tweets": tweets, "next_cursor": next_cursor}
+
+
+def create_backend() -> Optional[SearchBackend]:
+    """
+    環境変数からX検索バックエンドを生成
+
+    Returns:
+        バックエンド（どちらも設定されていない場合はNone）
+    """
+    fixture = os.getenv('X_SEARCH_FIXTURE')
+    if fixture:
+        return FixtureSearchBackend(fixture)
+
+    instance = os.getenv('NITTER_INSTANCE')
+    if instance:
+        return NitterSearchBackend(instance)
+
+    return None
@@ -0,0 +1,147 @@
+"""
+候補記事の本文取得（本文抽出・キャッシュ・エンリッチメント）のテスト
+"""
+
+import sys
+import os
+import time
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from article_enricher import ArticleEnricher, ContentCache, canonical_url, drop_content, extract_main_text
+
+ARTICLE_HTML = """
+<html><head><title>t</title><script>var x = 1;</script></head>
+<body>
+  <nav><p>Home, News, About, Contact, Subscribe to our newsletter today</p></nav>
+  <div class="sidebar"><p>Related: another story about something, with commas, and more</p></div>
+  <div class="post-content">
+    <p>OpenAI released a new reasoning model today, claiming large gains on math benchmarks.</p>
+    <p>The model, available to API customers, uses a new training recipe, according to the company.</p>
+    <p>Researchers cautioned that independent evaluations, however, are still pending.</p>
+  </div>
+  <footer><p>Copyright 2026, Example Media, all rights reserved, everywhere</p></footer>
+</body></html>
+"""
+
+
+class StubEnricher(ArticleEnricher):
+    def __init__(self, cache_dir):
+        super().__init__(cache_dir=cache_dir, per_host_delay=0)
+        self.fetched = []
+
+    def _fetch(self, url, timeout):
+        self.fetched.append(url)
+        return ARTICLE_HTML
+
+
+def _articles():
+    return [
+        {"title": "a", "link": "https://news.example.com/a?utm_source=rss"},
+        {"title": "b", "link": "https://x.com/OpenAI/status/1"},
+        {"title": "c", "link": "https://blog.example.org/c"},
+        {"title": "d", "link": "https://news.example.com/d"},
+    ]
+
+
+def test_extracts_main_paragraphs():
+    text = extract_main_text(ARTICLE_HTML)
+
+    assert "new reasoning model" in text
+    assert "independent evaluations" in text
+    assert "newsletter" not in text
+    assert "Related" not in text
+    assert "Copyright" not in text
+
+
+def test_prefers_article_element():
+    html = "<html><body><div><p>Short teaser.</p></div><article><p>Body text.</p></article></body></html>"
+
+    assert extract_main_text(html) == "Body text."
+
+
+def test_xml_declaration():
+    body = '<html><body><article><p>{}</p></article></body></html>'
+
+    # デコード済みの str では宣言を無視し、bytes では宣言された文字コードでデコードする
+    assert extract_main_text('<?xml version="1.0" encoding="utf-8"?>' + body.format("Body text.")) == "Body text."
+    page = ('<?xml version="1.0" encoding="Shift_JIS"?>' + body.format("新しいモデルを発表。")).encode('shift_jis')
+    assert extract_main_text(page) == "新しいモデルを発表。"
+    assert extract_main_text(b'<?xml version="1.0" encoding="no-such-codec"?>' + body.encode()) == ""
+
+
+def test_empty_html():
+    assert extract_main_text("") == ""
+
+
+def test_canonical_url():
+    assert canonical_url("HTTPS://Example.com:443/news/item/?utm_source=x&b=2&a=1#top") == \
+        "https://example.com/news/item?a=1&b=2"
+
+
+def test_cache_ttl_and_eviction(tmp_path):
+    cache = ContentCache(str(tmp_path), ttl_hours=1, max_bytes=10 ** 6)
+    cache.put("https://example.com/a?utm_medium=rss", "body a")
+    assert cache.get("https://example.com/a")["content"] == "body a"
+
+    # 期限切れ
+    cache.ttl_seconds = -1
+    assert cache.get("https://example.com/a") is None
+    assert cache.evict() == 1
+
+    # サイズ超過時は最終利用が古いものから削除
+    cache = ContentCache(str(tmp_path), ttl_hours=1, max_bytes=10 ** 6)
+    cache.put("https://example.com/old", "x" * 100)
+    old_path = cache._path("https://example.com/old")
+    os.utime(old_path, (time.time() - 60, time.time() - 60))
+    cache.put("https://example.com/new", "y" * 100)
+    cache.max_bytes = os.path.getsize(old_path) + 10
+    assert cache.evict() == 1
+    assert cache.get("https://example.com/old") is None
+    assert cache.get("https://example.com/new") is not None
+
+
+def test_enrich_top_k_with_cache(tmp_path):
+    enricher = StubEnricher(str(tmp_path))
+    articles = enricher.enrich(_articles(), top_k=3)
+
+    # 上位3件のうちX以外の2件のみ取得
+    assert len(enricher.fetched) == 2
+    assert "new reasoning model" in articles[0]['content']
+    assert articles[0]['canonical_url'] == "https://news.example.com/a"
+    assert 'content' not in articles[1]
+    assert 'content' not in articles[3]
+
+    # 2回目はキャッシュから（トラッキングパラメータが違っても同じ記事）
+    enricher = StubEnricher(str(tmp_path))
+    articles = _articles()
+    articles[0]['link'] = "https://news.example.com/a/?utm_source=twitter"
+    enricher.enrich(articles, top_k=3)
+    assert enricher.fetched == []
+    assert 'content' in articles[2]
+
+
+def test_offline_uses_cache_only(tmp_path):
+    enricher = StubEnricher(str(tmp_path))
+    articles = enricher.enrich(_articles(), top_k=4, offline=True)
+
+    assert enricher.fetched == []
+    assert not any('content' in article for article in articles)
+
+
+def test_drop_and_restore_content(tmp_path):
+    enricher = StubEnricher(str(tmp_path))
+    articles = enricher.enrich(_articles(), top_k=1)
+    content = articles[0]['content']
+
+    drop_content(articles)
+    assert 'content' not in articles[0]
+    assert articles[0]['content_length'] == len(content)
+
+    # ハッシュが一致するキャッシュからのみ戻す
+    changed = dict(articles[0], content_sha256="0" * 64)
+    assert StubEnricher(str(tmp_path)).restore([articles[0], changed, articles[1]]) == 1
+    assert articles[0]['content'] == content
+    assert 'content_sha256' not in articles[0]
+    assert 'content' not in changed
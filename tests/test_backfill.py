@@ -0,0 +1,97 @@
+"""
+バックフィル（過去結果の再スコアリング）のテスト
+"""
+
+import sys
+import os
+import json
+from datetime import datetime, timedelta, timezone
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from backfill import format_report, list_result_files, run_backfill
+from checkpoint import CheckpointStore
+
+
+def _article(title, link, score=0, published="2026-04-03 18:47:00+09:00"):
+    return {
+        "title": title, "link": link, "published": published, "summary": "",
+        "source": "TechCrunch AI", "language": "en", "preliminary_score": score
+    }
+
+
+def _write_result(output_dir, name, pick, candidates, **extra):
+    with open(os.path.join(output_dir, name), 'w', encoding='utf-8') as f:
+        json.dump(dict({"article": pick, "analysis": {"surprise_score": 80}, "all_candidates": candidates}, **extra), f)
+
+
+def test_list_result_files_filters_by_date(tmp_path):
+    for name in ["analysis_20260101_005934.json", "analysis_20260102_005442.json", "report_20260102_005442.md"]:
+        (tmp_path / name).write_text("{}")
+
+    files = list_result_files(str(tmp_path), since="2026-01-02")
+
+    assert [os.path.basename(path) for path in files] == ["analysis_20260102_005442.json"]
+
+
+def test_backfill_compares_old_and_new_picks(tmp_path):
+    boring = _article("OpenAI hires a new CFO", "https://example.com/cfo")
+    launch = _article("OpenAI launches a breakthrough LLM", "https://example.com/llm")
+    _write_result(str(tmp_path), "analysis_20260403_011520.json", boring, [boring, launch])
+    _write_result(str(tmp_path), "analysis_20260404_010901.json", launch, [launch, boring])
+
+    summary = run_backfill(str(tmp_path), workers=2)
+
+    changed = {row["date"]: row["changed"] for row in summary["rows"]}
+    assert changed == {"20260403": True, "20260404": False}
+    assert summary["agreement"] == 0.5
+    assert all(row["new_pick"]["link"] == launch["link"] for row in summary["rows"])
+    assert "⚠️" in format_report(summary)
+
+
+def test_backfill_uses_analysis_picks(tmp_path):
+    titles = ["OpenAI launches a reasoning LLM", "Google unveils Gemini robotics", "Anthropic Claude tops AI benchmarks",
+              "Meta AI open-sources a vision model", "Nvidia ships new AI chips", "Mistral releases a coding agent"]
+    articles = [_article(title, f"https://example.com/{i}") for i, title in enumerate(titles)]
+    _write_result(str(tmp_path), "analysis_20260404_010901.json", articles[0], articles)
+
+    row = run_backfill(str(tmp_path), workers=1, picks=3)["rows"][0]
+
+    # 選定件数の2倍以上を候補にし、picks の全件を選び直す
+    assert len(row["new_candidates"]) == 6
+    assert len(row["new_picks"]) == 3
+    assert row["new_picks"][0] == row["new_pick"]["link"]
+
+
+def test_backfill_prefers_snapshot_pool(tmp_path):
+    snapshot_time = datetime(2026, 4, 4, 1, 0, tzinfo=timezone.utc)
+    parsed = [
+        dict(_article("OpenAI unveils a revolutionary model", "https://example.com/new"),
+             published=snapshot_time - timedelta(hours=2)),
+        dict(_article("Old AI news", "https://example.com/old"), published=snapshot_time - timedelta(days=3)),
+    ]
+    CheckpointStore("20260404", str(tmp_path / "checkpoints")).save("parsed", parsed, created_at=snapshot_time)
+    stale = _article("OpenAI hires a new CFO", "https://example.com/cfo")
+    _write_result(str(tmp_path), "analysis_20260404_010901.json", stale, [stale])
+
+    row = run_backfill(str(tmp_path), workers=1)["rows"][0]
+
+    assert row["pool"] == "snapshot"
+    assert row["new_candidates"] == ["https://example.com/new"]
+    assert row["changed"] is True
+
+
+def test_snapshot_is_looked_up_by_recorded_run_id(tmp_path):
+    snapshot_time = datetime(2026, 4, 4, 0, 30, tzinfo=timezone.utc)
+    parsed = [dict(_article("OpenAI unveils a revolutionary model", "https://example.com/new"),
+                   published=snapshot_time - timedelta(hours=2))]
+    CheckpointStore("20260404", str(tmp_path / "checkpoints")).save("parsed", parsed, created_at=snapshot_time)
+    stale = _article("OpenAI hires a new CFO", "https://example.com/cfo")
+    # ファイル名の日付（前日）ではなく、記録されたラン ID のチェックポイントを使う
+    _write_result(str(tmp_path), "analysis_20260403_233000.json", stale, [stale], run_id="20260404")
+
+    row = run_backfill(str(tmp_path), workers=1)["rows"][0]
+
+    assert row["pool"] == "snapshot"
+    assert row["new_candidates"] == ["https://example.com/new"]
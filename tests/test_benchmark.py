@@ -0,0 +1,55 @@
+"""
+合成コーパスとベンチマークスイートのテスト
+"""
+
+import sys
+import os
+from datetime import datetime, timezone
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import feedparser
+
+from benchmark import BENCHMARKS, compare, run_benchmark
+from synthetic_corpus import SyntheticCorpus
+
+
+def test_corpus_is_deterministic():
+    now = datetime(2026, 4, 4, tzinfo=timezone.utc)
+    assert SyntheticCorpus(seed=1, now=now).articles(20) == SyntheticCorpus(seed=1, now=now).articles(20)
+
+
+def test_generated_feeds_parse_with_feedparser():
+    corpus = SyntheticCorpus(seed=1)
+
+    for fmt in ('rss', 'atom'):
+        for language in ('en', 'ja'):
+            feed = feedparser.parse(corpus.feed(10, language=language, fmt=fmt))
+            assert not feed.bozo, (fmt, language)
+            assert len(feed.entries) == 10
+            assert feed.entries[0].published_parsed >= feed.entries[-1].published_parsed
+            assert '<p>' in feed.entries[0].summary
+
+
+def test_every_benchmark_runs_at_1x():
+    for name in BENCHMARKS:
+        result = run_benchmark(name, 1, repeat=1)
+        assert result["items"] > 0
+        assert result["throughput"] > 0
+
+
+def test_compare_flags_regressions():
+    baseline = {
+        "fast@1x": {"throughput": 1000.0, "peak_kb": 100.0},
+        "lean@1x": {"throughput": 1000.0, "peak_kb": 100.0},
+    }
+    results = {
+        "fast@1x": {"items": 10, "seconds": 0.02, "throughput": 500.0, "peak_kb": 100.0},
+        "lean@1x": {"items": 10, "seconds": 0.01, "throughput": 1000.0, "peak_kb": 400.0},
+        "other@1x": {"items": 10, "seconds": 0.01, "throughput": 1000.0, "peak_kb": 1.0},
+    }
+
+    status = {row["key"]: row["status"] for row in compare(results, baseline)}
+
+    assert status == {"fast@1x": "regression", "lean@1x": "regression", "other@1x": "new"}
@@ -0,0 +1,105 @@
+"""
+CLIのテスト（起動時のインポート時間バジェットを含む）
+"""
+
+import sys
+import os
+import json
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cli import HEAVY_MODULES, main, measure_import_time, parse_importtime, SRC_DIR
+
+# コールドスタートのインポート時間の上限（ミリ秒）。CI環境に合わせて環境変数で上書き可能
+IMPORT_BUDGET_MS = float(os.getenv('CLI_IMPORT_BUDGET_MS', '150'))
+
+
+def _write_result(path):
+    result = {
+        "article": {
+            "title": "OpenAI launches a new model",
+            "link": "https://example.com/a",
+            "published": "2026-04-03 18:47:00+09:00",
+            "summary": "summary",
+            "source": "TechCrunch AI",
+            "language": "en",
+            "preliminary_score": 2
+        },
+        "analysis": {"title_ja": "新モデル発表", "surprise_score": 80},
+        "all_candidates": [],
+    }
+    result["all_candidates"].append(dict(result["article"]))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       565 |      42231 |   bs4.element\n"
+        "import time:      1557 |     179883 | feed_collector\n"
+    )
+    timings = parse_importtime(stderr)
+    assert timings['feed_collector'] == 179883
+    assert 'bs4' in timings
+
+
+def test_cli_import_within_budget():
+    timings = measure_import_time('cli')
+
+    assert 'cli' in timings
+    assert timings['cli'] / 1000 < IMPORT_BUDGET_MS
+    assert not [name for name in HEAVY_MODULES if name in timings]
+
+
+def test_report_and_history_do_not_import_heavy_modules(tmp_path):
+    _write_result(tmp_path / 'analysis_20260404_010901.json')
+
+    for command in (['report'], ['history'], ['publish'], ['health']):
+        argv = [os.path.join(SRC_DIR, 'cli.py'), '--output-dir', str(tmp_path)] + command
+        timings = measure_import_time('cli', argv=argv)
+        assert not [name for name in HEAVY_MODULES if name in timings], command
+
+
+def test_report_regenerates_markdown(tmp_path):
+    _write_result(tmp_path / 'analysis_20260404_010901.json')
+
+    assert main(['--output-dir', str(tmp_path), 'report']) == 0
+
+    report = (tmp_path / 'report_20260404_010901.md').read_text(encoding='utf-8')
+    assert '新モデル発表' in report
+    assert '2026-04-03 18:47' in report
+
+
+def test_publish_adds_result_to_feeds(tmp_path):
+    _write_result(tmp_path / 'analysis_20260404_010901.json')
+
+    assert main(['--output-dir', str(tmp_path), 'publish', '--all']) == 0
+
+    feed = json.loads((tmp_path / 'feeds' / 'feed.json').read_text(encoding='utf-8'))
+    assert [item['id'] for item in feed['items']] == ['ai-news-analyzer:20260404']
+    assert (tmp_path / 'feeds' / 'digests' / '2026-W14.md').exists()
+
+
+def test_publish_uses_recorded_run_id(tmp_path):
+    path = tmp_path / 'analysis_20260404_003000.json'
+    _write_result(path)
+    result = json.loads(path.read_text(encoding='utf-8'))
+    result.update(run_id='20260403', created_at='2026-04-03T23:30:00+09:00')
+    path.write_text(json.dumps(result), encoding='utf-8')
+
+    assert main(['--output-dir', str(tmp_path), 'publish']) == 0
+
+    feed = json.loads((tmp_path / 'feeds' / 'feed.json').read_text(encoding='utf-8'))
+    assert [item['id'] for item in feed['items']] == ['ai-news-analyzer:20260403']
+    assert feed['items'][0]['date_published'].startswith('2026-04-03T23:30:00')
+
+
+def test_evaluate_writes_report(tmp_path):
+    _write_result(tmp_path / 'analysis_20260404_010901.json')
+
+    assert main(['--output-dir', str(tmp_path), 'evaluate', '--ks', '1,5']) == 0
+    assert list((tmp_path / 'evaluation').glob('evaluation_*.md'))
+
+    assert main(['--output-dir', str(tmp_path), 'evaluate', '--judge', 'labels']) == 1
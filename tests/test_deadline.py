@@ -0,0 +1,42 @@
+"""
+時間予算（デッドライン）のテスト
+"""
+
+import sys
+import os
+import time
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from deadline import MIN_REQUEST_TIMEOUT, Deadline, RunBudget
+
+
+def test_deadline_caps_request_timeout():
+    assert Deadline(None).timeout(30) == 30
+    assert Deadline(5).timeout(30) <= 5
+    assert Deadline(0).expired()
+    assert Deadline(0).timeout(30) == MIN_REQUEST_TIMEOUT
+
+
+def test_stage_budgets_share_remaining_time():
+    budget = RunBudget(100, shares={'raw': 0.5, 'analysis': 0.5})
+
+    raw = budget.stage('raw')
+    assert 49 < raw.remaining() <= 50
+
+    # 前のステージが使わなかった分は後のステージに回る
+    analysis = budget.stage('analysis')
+    assert 99 < analysis.remaining() <= 100
+
+    assert RunBudget(None).stage('raw').remaining() == float('inf')
+
+
+def test_child_splits_remaining_time():
+    parent = Deadline(10)
+    assert 4 < parent.child(0.5).remaining() <= 5
+    assert Deadline(None).child(0.5).remaining() == float('inf')
+
+    expired = Deadline(0.01)
+    time.sleep(0.02)
+    assert expired.child(0.5).expired()
@@ -0,0 +1,83 @@
+"""
+配信フィード（JSON Feed / RSS）と週次ダイジェストのテスト
+"""
+
+import sys
+import os
+import json
+from datetime import datetime, timedelta, timezone
+from xml.etree import ElementTree
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from feed_publisher import FeedPublisher, week_key
+
+JST = timezone(timedelta(hours=9))
+
+
+def _result(title, score=70):
+    return {
+        "article": {"title": title, "link": f"https://example.com/{title}", "summary": "summary",
+                    "source": "TechCrunch AI", "language": "en"},
+        "analysis": {"title_ja": f"{title}（訳）", "summary": "要約", "surprise_reasons": ["理由"],
+                     "surprise_score": score},
+        "all_candidates": [],
+    }
+
+
+def test_incremental_window_and_digest(tmp_path):
+    publisher = FeedPublisher(str(tmp_path), window=2)
+    start = datetime(2026, 10, 12, 9, 0, tzinfo=JST)  # 月曜
+    for day in range(3):
+        at = start + timedelta(days=day)
+        publisher.publish(_result(f"news{day}"), at.strftime('%Y%m%d'), at)
+
+    feed = json.loads((tmp_path / "feed.json").read_text(encoding='utf-8'))
+    assert [item['title'] for item in feed['items']] == ["news2（訳）", "news1（訳）"]
+
+    rss = ElementTree.parse(str(tmp_path / "feed.xml")).getroot()
+    assert [guid.text for guid in rss.iter('guid')] == ["ai-news-analyzer:20261014", "ai-news-analyzer:20261013"]
+
+    # 窓から外れた項目も週次ダイジェストには残る
+    text = (tmp_path / "digests" / f"{week_key(start)}.md").read_text(encoding='utf-8')
+    assert "3件の選定ニュース" in text
+    assert text.index("news0") < text.index("news2")
+
+
+def test_rerun_replaces_item(tmp_path):
+    publisher = FeedPublisher(str(tmp_path))
+    at = datetime(2026, 10, 19, 9, 0, tzinfo=JST)
+    publisher.publish(_result("first"), "20261019", at)
+    paths = publisher.publish(_result("second", score=90), "20261019", at + timedelta(minutes=5))
+
+    with open(paths["json_feed"], encoding='utf-8') as f:
+        items = json.load(f)['items']
+    assert len(items) == 1
+    assert items[0]['_ai_news_analyzer']['surprise_score'] == 90
+    assert paths["digest"].endswith("2026-W43.md")
+
+
+def test_publishes_all_picks(tmp_path):
+    publisher = FeedPublisher(str(tmp_path))
+    at = datetime(2026, 10, 19, 9, 0, tzinfo=JST)
+    result = _result("top", score=90)
+    result["picks"] = [
+        {"rank": rank, "article": _result(title)["article"], "analysis": _result(title, score)["analysis"]}
+        for rank, title, score in [(1, "top", 90), (2, "second", 80), (3, "third", 70)]
+    ]
+    publisher.publish(result, "20261019", at)
+
+    # 再実行で選定件数が減った場合は、前回の2位以降の項目も置き換える
+    result["picks"] = result["picks"][:2]
+    paths = publisher.publish(result, "20261019", at)
+
+    with open(paths["json_feed"], encoding='utf-8') as f:
+        items = json.load(f)['items']
+    assert [item['id'] for item in items] == ["ai-news-analyzer:20261019", "ai-news-analyzer:20261019:2"]
+    assert items[1]['_ai_news_analyzer']['surprise_score'] == 80
+
+    with open(paths["digest"], encoding='utf-8') as f:
+        text = f.read()
+    assert "2件の選定ニュース" in text
+    assert "second（訳）（2位）" in text
@@ -0,0 +1,52 @@
+"""
+言語判定のテスト
+"""
+
+import sys
+import os
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from language_detector import detect_language, detect_languages, label_articles
+
+
+def test_detects_each_language():
+    texts = [
+        "OpenAI launches a new reasoning model",
+        "富士通、国産LLMを公開",
+        "百度宣布文心一言向所有用户开放。",
+        "네이버가 새로운 초거대 AI 모델을 공개했다.",
+    ]
+
+    assert detect_languages(texts) == ['en', 'ja', 'zh', 'ko']
+
+
+def test_japanese_with_english_product_names():
+    # ASCIIが70%を超えるが、かなを含むため日本語
+    assert detect_language("OpenAIがGPT-5 Turbo APIをリリース、Function Callingにも対応") == 'ja'
+
+
+def test_english_with_a_few_cjk_characters():
+    assert detect_language("Great keynote in 東京 today about multimodal LLM agents") == 'en'
+    assert detect_language("") == 'en'
+
+
+def test_source_hint_resolves_han_only_text():
+    assert detect_language("生成AI新時代") == 'zh'
+    assert detect_languages(["生成AI新時代", "Sakana AI raises Series B"], hints=['ja', 'ja']) == ['ja', 'en']
+
+
+def test_label_articles_uses_title_and_summary():
+    articles = [
+        {"title": "Claude 3.5 Sonnet", "summary": "Artifacts機能を試してみた", "language": "en"},
+        {"title": "AI半導体", "summary": "", "language": "ja"},
+    ]
+
+    label_articles(articles, use_source_hint=True)
+
+    assert [article["language"] for article in articles] == ['ja', 'ja']
+
+
+def test_single_katakana_emoticon_is_not_japanese():
+    assert detect_language(r"New model dropped, benchmarks look mixed ¯\_(ツ)_/¯") == 'en'
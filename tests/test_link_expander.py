@@ -0,0 +1,123 @@
+"""
+X の投稿の外部リンク展開とフィード記事への統合のテスト（ローカルのリダイレクトサーバーを使用）
+"""
+
+import sys
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from link_expander import LinkExpander, extract_links, social_bonus
+
+
+class RedirectHandler(BaseHTTPRequestHandler):
+    """
+    短縮URL（/s/...）→ 中継（/r/...）→ 記事（/blog/...）とリダイレクトするローカルサーバー
+    """
+    requests_seen = []
+
+    def _respond(self, method):
+        self.requests_seen.append((method, self.path))
+        if self.path.startswith('/s/'):
+            self._redirect(301, '/r/' + self.path[3:])
+        elif self.path.startswith('/r/'):
+            self._redirect(302, '/blog/' + self.path[3:] + '?utm_source=twitter')
+        elif self.path == '/nohead' and method == 'HEAD':
+            self.send_response(405)
+            self.end_headers()
+        elif self.path == '/nohead':
+            self._redirect(301, '/blog/launch')
+        elif self.path.startswith('/blog/'):
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def _redirect(self, status, location):
+        self.send_response(status)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._respond('HEAD')
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RedirectHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def base(server):
+    RedirectHandler.requests_seen.clear()
+    return server
+
+
+def _articles(base):
+    return [
+        {"title": "OpenAI launches a new model", "link": f"{base}/blog/launch", "summary": "",
+         "source": "OpenAI Blog"},
+        {"title": "Big news", "link": "https://x.com/OpenAI/status/1",
+         "summary": f"We just shipped it {base}/s/launch", "source": "X (@OpenAI)"},
+        {"title": "Read more", "link": "https://x.com/sama/status/2",
+         "summary": f"see {base}/nohead", "source": "X (@sama)"},
+        {"title": "Unrelated", "link": "https://x.com/someone/status/3",
+         "summary": f"{base}/s/other", "source": "X (@someone)"},
+    ]
+
+
+def test_extracts_outbound_links():
+    text = ("New model: https://t.co/abc123. Details https://openai.com/index/new-model/… "
+            "pic https://pic.twitter.com/xyz https://x.com/OpenAI/status/1 https://t.co/abc123")
+
+    assert extract_links(text) == ["https://t.co/abc123", "https://openai.com/index/new-model/"]
+
+
+def test_merges_posts_into_feed_article(base, tmp_path):
+    cache_file = str(tmp_path / "link_cache.json")
+    articles = LinkExpander(cache_file=cache_file, max_workers=2).merge_posts(_articles(base))
+
+    assert [article['title'] for article in articles] == ["OpenAI launches a new model", "Unrelated"]
+    mentions = articles[0]['social_mentions']
+    assert [mention['source'] for mention in mentions] == ["X (@OpenAI)", "X (@sama)"]
+    assert social_bonus(articles[0]) == 2
+
+    # HEAD を受け付けないサーバーには GET で再試行
+    assert ('GET', '/nohead') in RedirectHandler.requests_seen
+
+    # 解決結果はキャッシュされ、次の実行ではリクエストしない
+    with open(cache_file, encoding='utf-8') as f:
+        links = json.load(f)["links"]
+    assert links[f"{base}/s/launch"]["resolved"] == f"{base}/blog/launch?utm_source=twitter"
+
+    RedirectHandler.requests_seen.clear()
+    articles = LinkExpander(cache_file=cache_file).merge_posts(_articles(base))
+    assert len(articles) == 2
+    assert RedirectHandler.requests_seen == []
+
+
+def test_offline_uses_cache_only(base, tmp_path):
+    articles = LinkExpander(cache_file=str(tmp_path / "link_cache.json")).merge_posts(_articles(base), offline=True)
+
+    assert len(articles) == 4
+    assert RedirectHandler.requests_seen == []
@@ -0,0 +1,244 @@
+"""
+チェックポイント付きパイプラインのテスト（ネットワークなし）
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from checkpoint import CheckpointStore, prune_checkpoints
+from pipeline import NewsPipeline, merge_shards
+from source_registry import shard_run_id
+
+SOURCE = {"name": "Test Feed", "url": "https://example.com/feed", "language": "en"}
+
+
+def _rss(published: datetime) -> bytes:
+    items = "".join(
+        f"""<item><title>{title}</title><link>https://example.com/{i}</link>
+        <pubDate>{format_datetime(published)}</pubDate><description>{summary}</description></item>"""
+        for i, (title, summary) in enumerate([
+            ("OpenAI unveils a breakthrough model", "A new LLM is available now"),
+            ("Gardening tips", "How to grow tomatoes"),
+        ])
+    )
+    return f"""<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{items}</channel></rss>""".encode()
+
+
+def _pipeline(tmp_path, run_id="20260404"):
+    pipeline = NewsPipeline(api_key="dummy", run_id=run_id, checkpoint_dir=str(tmp_path))
+    pipeline.x_collector.fetch_rsshub_raw = lambda accounts, deadline=None: []
+    return pipeline
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    store = CheckpointStore("run", str(tmp_path))
+    published = datetime(2026, 4, 3, 9, 0, tzinfo=timezone.utc)
+    store.save("raw", {"content": b"<rss/>", "published": published})
+
+    assert store.load("raw") == {"content": b"<rss/>", "published": published}
+    assert store.last_completed_stage() == "raw"
+    assert store.load("parsed") is None
+
+
+def test_resume_skips_fetch_after_analysis_failure(tmp_path):
+    calls = {"fetch": 0}
+    content = _rss(datetime.now(timezone.utc) - timedelta(hours=1))
+
+    def fetch(deadline=None):
+        calls["fetch"] += 1
+        return [{"source": SOURCE, "content": content}]
+
+    first = _pipeline(tmp_path)
+    first.collector.fetch_raw_feeds = fetch
+    first.analyzer._analyze_with_claude = lambda candidates, timeout: first.analyzer._fallback_selection(candidates)
+    result = first.run()
+
+    assert result["fallback"] is True
+    assert first.store.last_completed_stage() == "candidates"
+
+    second = _pipeline(tmp_path)
+    second.collector.fetch_raw_feeds = fetch
+    second.analyzer._analyze_with_claude = lambda candidates, timeout: {
+        "article": candidates[0], "analysis": {"surprise_score": 90}, "all_candidates": candidates
+    }
+    result = second.run()
+
+    assert calls["fetch"] == 1
+    assert result["analysis"]["surprise_score"] == 90
+    assert second.store.last_completed_stage() == "analysis"
+
+
+def test_replay_is_offline_and_uses_snapshot_time(tmp_path):
+    # 3日前のスナップショット（現在時刻基準なら時刻フィルタで全件落ちる）
+    snapshot_time = datetime.now(timezone.utc) - timedelta(days=3)
+    CheckpointStore("20260401", str(tmp_path)).save("raw", {
+        "rss": [{"source": SOURCE, "content": _rss(snapshot_time - timedelta(hours=1))}],
+        "x_search": [],
+        "x_accounts": [],
+    }, created_at=snapshot_time)
+
+    def forbidden(*args):
+        raise AssertionError("network used")
+
+    pipeline = _pipeline(tmp_path, run_id="replay")
+    pipeline.collector.fetch_raw_feeds = forbidden
+    pipeline.analyzer._analyze_with_claude = forbidden
+
+    result = pipeline.replay("20260401")
+
+    assert result["fallback"] is True
+    assert result["article"]["title"] == "OpenAI unveils a breakthrough model"
+    assert [c["title"] for c in result["all_candidates"]] == ["OpenAI unveils a breakthrough model"]
+    assert not os.path.exists(os.path.join(str(tmp_path), "replay"))
+
+
+def test_prune_checkpoints_keeps_newest(tmp_path):
+    for run_id in ["20260401", "20260402", "20260403"]:
+        CheckpointStore(run_id, str(tmp_path)).save("raw", {})
+
+    prune_checkpoints(str(tmp_path), keep=2)
+
+    assert sorted(os.listdir(tmp_path)) == ["20260402", "20260403"]
+
+
+def test_prune_checkpoints_counts_days_not_shards(tmp_path):
+    for run_id in ["20260401", "20260402", "20260402-retry", "20260403"]:
+        CheckpointStore(run_id, str(tmp_path)).save("raw", {})
+        for index in range(3):
+            CheckpointStore(shard_run_id(run_id, index, 3), str(tmp_path)).save("parsed", [])
+
+    prune_checkpoints(str(tmp_path), keep=2)
+
+    # シャードは保持数に数えず、同じ日のランは1日分として残す
+    assert sorted(os.listdir(tmp_path)) == ["20260402", "20260402-retry", "20260403"]
+    assert len(os.listdir(tmp_path / "20260403" / "shards")) == 3
+
+
+def test_sharded_collection_merges_into_resumable_run(tmp_path):
+    registry = {"feeds": [dict(SOURCE, id=f"feed-{i}", name=f"Feed {i}") for i in range(6)], "x_accounts": []}
+    content = _rss(datetime.now(timezone.utc) - timedelta(hours=1))
+    fetched = []
+
+    def fetch_source(source, timeout=None):
+        fetched.append(source["id"])
+        # 取得失敗（_fetch_source は例外を握りつぶして None を返す）
+        return None if source["id"] == "feed-0" else content
+
+    for index in range(3):
+        shard = NewsPipeline(api_key=None, run_id="20260404", checkpoint_dir=str(tmp_path),
+                             shard=(index, 3), registry=registry)
+        shard.x_collector.collect_from_search = lambda *args, **kwargs: []
+        shard.x_collector.fetch_rsshub_raw = lambda accounts, deadline=None: []
+        shard.collector._fetch_source = fetch_source
+        shard.run(until="parsed")
+
+    # 各ソースはちょうど1つのシャードが担当する
+    assert sorted(fetched) == sorted(feed["id"] for feed in registry["feeds"])
+    assert merge_shards("20260404", 4, str(tmp_path)) is None
+
+    # 全ソースが同じ記事を配信しているため、統合時に重複が除かれる
+    merged = merge_shards("20260404", 3, str(tmp_path))
+    assert len(merged) == 2
+
+    def forbidden(*args):
+        raise AssertionError("network used")
+
+    pipeline = _pipeline(tmp_path)
+    pipeline.collector.fetch_raw_feeds = forbidden
+    pipeline.analyzer._analyze_with_claude = lambda candidates, timeout: pipeline.analyzer._fallback_selection(candidates)
+    result = pipeline.run()
+
+    assert result["article"]["title"] == "OpenAI unveils a breakthrough model"
+    # シャードで収集できなかったソースは統合後のランの結果に残る
+    assert result["skipped_sources"] == [{"source": "Feed 0", "reason": "error"}]
+
+
+def test_run_budget_skips_remaining_sources(tmp_path):
+    import time
+
+    registry = {"feeds": [dict(SOURCE, id=f"feed-{i}", name=f"Feed {i}") for i in range(4)], "x_accounts": []}
+    content = _rss(datetime.now(timezone.utc) - timedelta(hours=1))
+    fetched = []
+
+    def slow_fetch(source, timeout=None):
+        fetched.append(source["name"])
+        time.sleep(0.2)
+        return content
+
+    pipeline = NewsPipeline(api_key="dummy", run_id="20260404", checkpoint_dir=str(tmp_path),
+                            registry=registry, run_budget=0.3)
+    pipeline.x_collector.collect_from_search = lambda *args, **kwargs: []
+    pipeline.collector._fetch_source = slow_fetch
+    pipeline.analyzer._analyze_with_claude = lambda candidates, timeout: pipeline.analyzer._fallback_selection(candidates)
+    result = pipeline.run()
+
+    # 予算を使い切った後のソースは取得せず、取得済みの記事で分析を続ける
+    assert fetched == ["Feed 0"]
+    assert result["article"]["title"] == "OpenAI unveils a breakthrough model"
+    assert [skipped["source"] for skipped in result["skipped_sources"]] == ["Feed 1", "Feed 2", "Feed 3"]
+    assert {skipped["reason"] for skipped in result["skipped_sources"]} == {"deadline"}
+
+
+def test_filtered_stage_merges_x_posts_into_feed_articles(tmp_path):
+    from link_expander import LinkCache
+
+    cache = LinkCache(str(tmp_path / "link_cache.json"))
+    cache.put("https://t.co/abc", "https://example.com/0?utm_source=twitter")
+    cache.save()
+
+    pipeline = NewsPipeline(api_key="dummy", run_id="20260404", checkpoint_dir=str(tmp_path),
+                            link_cache_file=str(tmp_path / "link_cache.json"))
+    pipeline.offline = True
+    now = datetime.now(timezone.utc)
+    articles = [
+        {"title": "OpenAI unveils a breakthrough model", "link": "https://example.com/0", "published": now,
+         "summary": "A new LLM", "source": "Test Feed", "language": "en"},
+        {"title": "OpenAI AI model is out", "link": "https://x.com/OpenAI/status/1", "published": now,
+         "summary": "New AI model https://t.co/abc", "source": "X (@OpenAI)", "language": "en"},
+    ]
+
+    filtered = pipeline._stage_filtered(articles)
+
+    assert [article["link"] for article in filtered] == ["https://example.com/0"]
+    assert filtered[0]["social_mentions"][0]["source"] == "X (@OpenAI)"
+
+
+def test_candidate_content_is_not_saved(tmp_path, monkeypatch):
+    import article_enricher
+
+    html = "<html><body><article><p>OpenAI released a new model today, with large gains, on many benchmarks.</p>" \
+           "</article></body></html>"
+    monkeypatch.setattr(article_enricher.ArticleEnricher, "_fetch", lambda self, url, timeout: html)
+    content = _rss(datetime.now(timezone.utc) - timedelta(hours=1))
+
+    first = NewsPipeline(api_key="dummy", run_id="20260404", checkpoint_dir=str(tmp_path), enrich_top_k=1,
+                         content_cache_dir=str(tmp_path / "content"))
+    first.x_collector.fetch_rsshub_raw = lambda accounts, deadline=None: []
+    first.collector.fetch_raw_feeds = lambda deadline=None: [{"source": SOURCE, "content": content}]
+    first.run(until="candidates")
+
+    # チェックポイントには本文の代わりにハッシュと文字数を保存する
+    saved = first.store.load("candidates")[0]
+    assert "content" not in saved
+    assert saved["content_length"] > 0
+
+    # 再開時はキャッシュから本文を戻して分析し、結果には本文を残さない
+    second = _pipeline(tmp_path)
+    second.content_cache_dir = str(tmp_path / "content")
+    prompts = []
+
+    def analyze(candidates, timeout):
+        prompts.append(candidates[0].get("content"))
+        return second.analyzer._fallback_selection(candidates)
+
+    second.analyzer._analyze_with_claude = analyze
+    result = second.run()
+
+    assert "OpenAI released a new model" in prompts[0]
+    assert "content" not in result["article"]
+    assert result["article"]["content_sha256"] == saved["content_sha256"]
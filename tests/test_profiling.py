@@ -0,0 +1,71 @@
+"""
+ステージ単位のプロファイリングのテスト
+"""
+
+import sys
+import os
+import json
+import pstats
+
+import pytest
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import profiling
+from profiling import parse_mode, profile_stage, profiled, profiling as enable_profiling
+
+
+@profiled('work')
+def _work(n):
+    return [str(i) * 10 for i in range(n)]
+
+
+def test_disabled_is_noop(tmp_path, monkeypatch):
+    monkeypatch.delenv('NEWS_PROFILE', raising=False)
+
+    with enable_profiling('20260404', output_dir=str(tmp_path)) as profiler:
+        assert profiler is None
+        assert profile_stage('raw') is profile_stage('parsed')
+        assert len(_work(3)) == 3
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_parse_mode():
+    assert parse_mode(None) is None
+    assert parse_mode('0') is None
+    assert parse_mode('1') == {"cpu": True, "memory": True}
+    assert parse_mode('cpu') == {"cpu": True, "memory": False}
+    with pytest.raises(ValueError):
+        parse_mode('gpu')
+
+
+def test_nested_stages_write_stats(tmp_path):
+    with enable_profiling('20260404', mode='all', output_dir=str(tmp_path)):
+        with profile_stage('raw'):
+            _work(1000)
+        with profile_stage('analysis'):
+            _work(10)
+
+    run_dir = tmp_path / '20260404'
+    summary = json.loads((run_dir / 'summary.json').read_text(encoding='utf-8'))
+    stages = [entry['stage'] for entry in summary['stages']]
+    # 子のステージが先に終わるため先に記録される
+    assert stages == ['raw/work', 'raw', 'analysis/work', 'analysis']
+
+    entry = summary['stages'][0]
+    assert entry['peak_kib'] > 0
+    assert pstats.Stats(str(run_dir / entry['pstats'])).total_calls > 0
+    assert (run_dir / entry['allocations']).read_text(encoding='utf-8').startswith('# raw/work')
+
+    # 親のピークメモリは子のピーク以上
+    assert summary['stages'][1]['peak_kib'] >= entry['peak_kib']
+    assert profiling._active is None
+
+
+def test_invalid_env_mode_disables_profiling(tmp_path, monkeypatch):
+    monkeypatch.setenv('NEWS_PROFILE', 'gpu')
+
+    with enable_profiling('20260404', output_dir=str(tmp_path)) as profiler:
+        assert profiler is None
@@ -0,0 +1,144 @@
+"""
+ソースの健全性記録とバックオフのテスト
+"""
+
+import sys
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from source_health import BACKOFF_MAX_HOURS, SourceHealth
+
+NOW = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+
+def test_backoff_grows_exponentially_and_probe_recovers(tmp_path):
+    health = SourceHealth(str(tmp_path / "health.json"))
+
+    health.record_failure("old-feed", "HTTP 404", 0.5, now=NOW)
+    assert health.should_attempt("old-feed", NOW)
+
+    # 2回連続で失敗したら1日、3回目で2日見送る
+    health.record_failure("old-feed", "HTTP 404", 0.5, now=NOW)
+    assert not health.should_attempt("old-feed", NOW + timedelta(hours=23))
+    assert health.should_attempt("old-feed", NOW + timedelta(hours=25))
+
+    health.record_failure("old-feed", "HTTP 404", 0.5, now=NOW)
+    assert not health.should_attempt("old-feed", NOW + timedelta(hours=47))
+    assert health.should_attempt("old-feed", NOW + timedelta(hours=49))
+
+    for _ in range(20):
+        health.record_failure("old-feed", "HTTP 404", 0.5, now=NOW)
+    assert health.should_attempt("old-feed", NOW + timedelta(hours=BACKOFF_MAX_HOURS + 1))
+
+    # プローブに成功すればバックオフを解除
+    health.record_success("old-feed", 0.2, now=NOW)
+    assert health.should_attempt("old-feed", NOW)
+    assert health.report(NOW)[0]["status"] == "healthy"
+
+
+def test_save_merges_records_from_other_processes(tmp_path):
+    path = str(tmp_path / "health.json")
+    first, second = SourceHealth(path), SourceHealth(path)
+
+    first.record_success("feed-a", 0.1, now=NOW)
+    first.save()
+    second.record_failure("feed-b", "timeout", now=NOW)
+    second.record_failure("feed-b", "timeout", now=NOW)
+    second.save()
+
+    rows = {row["source"]: row for row in SourceHealth(path).report(NOW)}
+    assert rows["feed-a"]["success_rate"] == 1.0
+    assert rows["feed-a"]["latency_ms"] == 100.0
+    assert rows["feed-b"]["status"] == "backoff"
+    assert rows["feed-b"]["last_error"] == "timeout"
+
+
+def test_concurrent_saves_keep_every_record(tmp_path):
+    path = str(tmp_path / "health.json")
+    sources = [f"feed-{i}" for i in range(8)]
+    start = threading.Barrier(len(sources))
+
+    def save(source):
+        health = SourceHealth(path)
+        health.record_success(source, 0.1, now=NOW)
+        start.wait()
+        for _ in range(20):
+            health.save()
+
+    # インスタンスごとに別のファイル記述子でロックするため、別プロセスからの保存と同じ条件になる
+    threads = [threading.Thread(target=save, args=(source,)) for source in sources]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(row["source"] for row in SourceHealth(path).report(NOW)) == sources
+
+
+def test_feed_collector_skips_sources_in_backoff(tmp_path):
+    from feed_collector import FeedCollector
+
+    health = SourceHealth(str(tmp_path / "health.json"))
+    sources = [{"id": "dead", "name": "Dead Feed", "url": "https://example.com/dead", "language": "en"}]
+    collector = FeedCollector(sources=sources, health=health)
+    calls = []
+    collector._fetch_source = lambda source, timeout=None: calls.append(source["id"])
+
+    for _ in range(3):
+        collector.fetch_raw_feeds()
+
+    assert calls == ["dead", "dead"]
+    assert collector.skipped_sources == [{"source": "Dead Feed", "reason": "backoff"}]
+
+
+def test_rsshub_health_uses_registry_ids(tmp_path, monkeypatch):
+    import x_collector
+    from x_collector import XCollector
+
+    def unreachable(url, timeout=None):
+        raise IOError("connection refused")
+
+    monkeypatch.setattr(x_collector.requests, "get", unreachable)
+    health = SourceHealth(str(tmp_path / "health.json"))
+    collector = XCollector(health=health, search_backend=None)
+
+    collector.fetch_rsshub_raw([{"id": "x-openai", "account": "OpenAI"}])
+
+    assert [row["source"] for row in health.report()] == ["x-openai"]
+
+
+def test_deadline_capped_timeouts_are_not_failures(tmp_path, monkeypatch):
+    import time
+    import x_collector
+    from deadline import Deadline
+    from feed_collector import FeedCollector
+    from x_collector import XCollector
+
+    def slow_fetch(source, timeout=None):
+        time.sleep(timeout)
+        return None
+
+    def slow_get(url, timeout=None):
+        time.sleep(timeout)
+        raise IOError("read timed out")
+
+    health = SourceHealth(str(tmp_path / "health.json"))
+    sources = [{"id": "slow", "name": "Slow Feed", "url": "https://example.com/slow", "language": "en"}]
+    collector = FeedCollector(sources=sources, health=health, request_timeout=30)
+    collector._fetch_source = slow_fetch
+
+    collector.fetch_raw_feeds(Deadline(0.5))
+
+    assert collector.skipped_sources == [{"source": "Slow Feed", "reason": "deadline"}]
+
+    monkeypatch.setattr(x_collector.requests, "get", slow_get)
+    x = XCollector(health=health, search_backend=None)
+
+    x.fetch_rsshub_raw([{"id": "x-openai", "account": "OpenAI"}], Deadline(0.5))
+
+    assert x.skipped_sources == [{"source": "X (@OpenAI)", "reason": "deadline"}]
+    assert health.report() == []
@@ -0,0 +1,59 @@
+"""
+ソースレジストリとシャーディングのテスト
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from source_registry import load_registry, parse_shard, select_shard
+
+
+def test_bundled_registry_matches_builtin_sources():
+    from news_sources import NEWS_SOURCES, X_ACCOUNTS
+
+    registry = load_registry()
+
+    assert [feed["url"] for feed in registry["feeds"]] == [
+        source["url"] for source in NEWS_SOURCES["english"] + NEWS_SOURCES["japanese"]
+    ]
+    assert [entry["account"] for entry in registry["x_accounts"]] == X_ACCOUNTS
+
+
+def test_missing_registry_falls_back_to_builtin_sources(tmp_path):
+    registry = load_registry(str(tmp_path / "missing.json"))
+
+    assert registry["feeds"][0]["id"] == "techcrunch-ai"
+    assert registry["x_accounts"][0]["id"] == "x-openai"
+
+
+def test_registry_rejects_duplicate_ids(tmp_path):
+    path = tmp_path / "sources.json"
+    feed = {"id": "dup", "name": "A", "url": "https://example.com/a", "language": "en"}
+    path.write_text(json.dumps({"version": 1, "feeds": [feed], "x_accounts": [{"id": "dup", "account": "a"}]}))
+
+    with pytest.raises(ValueError):
+        load_registry(str(path))
+
+
+def test_shards_partition_sources_stably():
+    registry = {"feeds": [{"id": f"feed-{i}"} for i in range(200)], "x_accounts": []}
+    shards = [select_shard(registry, index, 4)["feeds"] for index in range(4)]
+
+    assert sorted(feed["id"] for shard in shards for feed in shard) == sorted(f["id"] for f in registry["feeds"])
+    assert all(shards)
+
+    # ソースを追加しても既存ソースの割り当ては変わらない
+    grown = {"feeds": registry["feeds"] + [{"id": "feed-new"}], "x_accounts": []}
+    assert [f for f in select_shard(grown, 0, 4)["feeds"] if f["id"] != "feed-new"] == shards[0]
+
+
+@pytest.mark.parametrize("spec", ["4/4", "a/3", "1", "0/0"])
+def test_parse_shard_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
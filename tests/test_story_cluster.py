@@ -0,0 +1,77 @@
+"""
+ストーリー単位のクラスタリングのテスト
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from story_cluster import cluster_stories, extract_entities
+from surprise_analyzer import SurpriseAnalyzer
+
+NOW = datetime(2026, 4, 4, 12, 0, tzinfo=timezone.utc)
+
+
+def _article(title, source, hours_ago, summary=""):
+    return {
+        "title": title, "link": f"https://example.com/{source}/{title[:12]}", "summary": summary,
+        "source": source, "language": "en", "published": NOW - timedelta(hours=hours_ago)
+    }
+
+
+def _announcement():
+    return [
+        _article("Introducing GPT-5.5 Turbo", "OpenAI Blog", 5, "GPT-5.5 Turbo is available today in ChatGPT."),
+        _article("OpenAI launches GPT-5.5 Turbo with a 2M token context", "TechCrunch AI", 4),
+        _article("GPT-5.5 Turbo is here: everything OpenAI announced", "The Verge AI", 3.5),
+        _article("OpenAI、GPT-5.5 Turboを発表 ChatGPTで提供開始", "ITmedia AI+", 3),
+        _article("GPT-5.5 Turbo just dropped. ChatGPT feels different.", "X (@karpathy)", 2),
+    ]
+
+
+def test_groups_cross_source_coverage_into_one_story():
+    unrelated = [
+        _article("Mistral releases Codestral Mamba weights", "Hugging Face Blog", 6),
+        _article("NVIDIA shows off Blackwell Ultra at GTC", "VentureBeat AI", 1),
+    ]
+
+    stories = cluster_stories(_announcement() + unrelated)
+
+    assert len(stories) == 3
+    story = next(s for s in stories if s["story_size"] == 5)
+    assert story["source"] == "OpenAI Blog"
+    assert story["coverage_breadth"] == 5
+    assert story["coverage_velocity"] == round(4 / 3, 2)
+    assert len(story["related"]) == 4
+
+
+def test_similar_titles_far_apart_in_time_stay_separate():
+    stories = cluster_stories([
+        _article("Anthropic releases Claude Opus update", "Anthropic News", 1),
+        _article("Anthropic releases Claude Opus update", "X (@AnthropicAI)", 24 * 5),
+    ])
+
+    assert len(stories) == 2
+
+
+def test_coverage_wins_a_candidate_slot_once():
+    noise = [_article(title, f"Blog {i}", 1) for i, title in enumerate([
+        "Perplexity launches a shopping assistant", "Runway launches Gen-4 video model",
+        "Cohere launches Command R7 for enterprises", "Stability launches an audio model",
+        "Apple launches Private Cloud Compute audits", "Zoom launches AI Companion 3",
+    ])]
+
+    candidates = SurpriseAnalyzer(api_key=None)._select_candidates(cluster_stories(_announcement() + noise))
+
+    assert candidates[0]["title"] == "Introducing GPT-5.5 Turbo"
+    assert sum(1 for c in candidates if "GPT-5.5" in c["title"]) == 1
+
+
+def test_extract_entities():
+    entities = extract_entities("The new GPT-5 from OpenAI beats Gemini; ソフトバンク が出資")
+
+    assert {"gpt-5", "openai", "gemini", "ソフトバンク"} <= entities
+    assert "the" not in entities and "new" not in entities
@@ -0,0 +1,107 @@
+"""
+ストリーミングフィードパーサのテスト（ネットワークなし）
+"""
+
+import sys
+import os
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import feedparser
+import pytest
+
+import feed_collector
+from feed_collector import FeedCollector
+from stream_parser import StreamParseError, iter_feed_entries
+from synthetic_corpus import SyntheticCorpus
+
+NOW = datetime.now(timezone.utc)
+
+
+def _chunks(content: bytes, size: int = 4096):
+    for i in range(0, len(content), size):
+        yield content[i:i + size]
+
+
+class _FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.consumed = 0
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for chunk in _chunks(self.content, chunk_size):
+            self.consumed += len(chunk)
+            yield chunk
+
+    def close(self):
+        pass
+
+
+def test_matches_feedparser_for_rss_and_atom():
+    for fmt in ('rss', 'atom'):
+        content = SyntheticCorpus(seed=3, now=NOW).feed(20, language='ja', fmt=fmt)
+        expected = feedparser.parse(content).entries
+        entries = list(iter_feed_entries(_chunks(content)))
+
+        assert [e.title for e in entries] == [e.title for e in expected]
+        assert [e.link for e in entries] == [e.link for e in expected]
+        assert [e.published_parsed[:6] for e in entries] == [e.published_parsed[:6] for e in expected]
+        assert all('<p>' in e.summary for e in entries)
+
+
+def test_peak_memory_is_flat_regardless_of_feed_size():
+    def peak(entries: int) -> int:
+        content = SyntheticCorpus(seed=3, now=NOW).feed(entries)
+        tracemalloc.start()
+        try:
+            for _ in iter_feed_entries(_chunks(content, 64 * 1024)):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    assert peak(4000) < peak(200) * 2
+
+
+def test_malformed_feed_raises():
+    with pytest.raises(StreamParseError):
+        list(iter_feed_entries([b"<rss><channel><item><title>a&nbsp;b</title></item></channel></rss>"]))
+
+
+def test_collector_stops_early_and_respects_cap(monkeypatch):
+    content = SyntheticCorpus(seed=3, now=NOW, stale_ratio=0.5).feed(3000)
+    response = _FakeResponse(content)
+    monkeypatch.setattr(feed_collector.requests, 'get', lambda *args, **kwargs: response)
+
+    collector = FeedCollector(stream=True)
+    articles = collector._collect_from_source({"name": "Big", "url": "https://example.com", "language": "en"})
+
+    assert articles
+    assert all(article["published"] >= collector.cutoff_time for article in articles)
+    assert response.consumed < len(content)
+
+    capped = collector._collect_from_source(
+        {"name": "Big", "url": "https://example.com", "language": "en", "max_entries": 5}
+    )
+    assert len(capped) == 5
+
+
+def test_collector_falls_back_to_feedparser(monkeypatch):
+    published = (NOW - timedelta(hours=1)).strftime('%a, %d %b %Y %H:%M:%S +0000')
+    content = (
+        "<rss version='2.0'><channel><item><title>OpenAI&nbsp;news</title>"
+        f"<link>https://example.com/1</link><pubDate>{published}</pubDate></item></channel></rss>"
+    ).encode()
+    monkeypatch.setattr(feed_collector.requests, 'get', lambda *args, **kwargs: _FakeResponse(content))
+
+    articles = FeedCollector(stream=True)._collect_from_source(
+        {"name": "Broken", "url": "https://example.com", "language": "en"}
+    )
+
+    assert [article["link"] for article in articles] == ["https://example.com/1"]
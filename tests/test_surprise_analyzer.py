@@ -0,0 +1,145 @@
+"""
+サプライズ度分析（ランキング形式）のテスト（ネットワークなし）
+"""
+
+import sys
+import os
+import json
+from datetime import datetime, timezone
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import surprise_analyzer
+from surprise_analyzer import SurpriseAnalyzer
+from analyzer import generate_report
+
+
+def _candidates(n=6):
+    return [
+        {"title": f"News {i}", "link": f"https://example.com/{i}", "summary": f"summary {i}",
+         "source": "TechCrunch AI", "language": "en", "preliminary_score": 10 - i,
+         "published": datetime(2026, 10, 19, 0, i, tzinfo=timezone.utc)}
+        for i in range(1, n + 1)
+    ]
+
+
+def _pick(index, score):
+    return {"selected_index": index, "title_ja": f"ニュース{index}", "summary": f"概要{index}",
+            "surprise_reasons": [f"理由{index}"], "engineer_impact": "e", "business_impact": "b",
+            "surprise_score": score}
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            "choices": [{"message": {"content": self.text}}],
+            "usage": {"prompt_tokens": 1200, "completion_tokens": 900,
+                      "prompt_tokens_details": {"cached_tokens": 1024}},
+        }
+
+
+def test_ranked_picks_in_one_call(monkeypatch):
+    response = json.dumps({
+        "picks": [_pick(3, 92), _pick(3, 90), _pick(9, 80), _pick(1, 75), _pick(5, 60)],
+        "other_candidates_comparison": "比較",
+    }, ensure_ascii=False)
+    calls = []
+
+    def post(url, headers, json, timeout):
+        calls.append(json)
+        return _Response(response)
+
+    monkeypatch.setattr(surprise_analyzer.requests, 'post', post)
+    analyzer = SurpriseAnalyzer(api_key="dummy", picks=3)
+    result = analyzer.analyze_candidates(_candidates())
+
+    assert len(calls) == 1
+    assert "上位3件" in calls[0]["messages"][-1]["content"]
+    assert result["llm_usage"]["cached_tokens"] == 1024
+    # 重複・範囲外の番号は除き、順位順に最大3件
+    assert [pick["article"]["title"] for pick in result["picks"]] == ["News 3", "News 1", "News 5"]
+    assert [pick["rank"] for pick in result["picks"]] == [1, 2, 3]
+    assert result["article"]["title"] == "News 3"
+    assert result["analysis"]["surprise_score"] == 92
+    assert result["analysis"]["other_candidates_comparison"] == "比較"
+
+
+def test_system_prefix_is_stable_across_calls():
+    first = SurpriseAnalyzer(api_key=None)._create_messages("候補1: A")
+    second = SurpriseAnalyzer(api_key=None)._create_messages("候補1: B\n---\n候補2: C")
+    assert first[0] == second[0]
+    assert first[0]["role"] == "system"
+    assert "候補1: A" not in first[0]["content"]
+
+    # ランキング形式は件数によらず同じシステムメッセージ
+    top3 = SurpriseAnalyzer(api_key=None, picks=3)._create_messages("候補1: A")
+    top5 = SurpriseAnalyzer(api_key=None, picks=5)._create_messages("候補1: A")
+    assert top3[0] == top5[0]
+    assert "上位5件" in top5[1]["content"]
+
+
+def test_single_pick_response_keeps_schema():
+    analyzer = SurpriseAnalyzer(api_key=None)
+    result = analyzer._parse_claude_response(json.dumps(_pick(2, 88)), _candidates(3))
+
+    assert result["article"]["title"] == "News 2"
+    assert [pick["rank"] for pick in result["picks"]] == [1]
+    assert analyzer.max_candidates == 5
+
+
+def test_fallback_returns_top_candidates_as_picks():
+    analyzer = SurpriseAnalyzer(api_key=None, picks=3)
+    assert analyzer.max_candidates == 6
+
+    result = analyzer._fallback_selection(_candidates())
+
+    assert result["fallback"] is True
+    assert [pick["article"]["title"] for pick in result["picks"]] == ["News 1", "News 2", "News 3"]
+    assert result["analysis"]["surprise_score"] == 9
+
+
+def test_report_lists_other_picks(tmp_path):
+    candidates = _candidates(3)
+    result = SurpriseAnalyzer(api_key=None, picks=2)._parse_claude_response(
+        json.dumps({"picks": [_pick(2, 90), _pick(1, 70)]}), candidates
+    )
+    output_file = tmp_path / "report.md"
+    generate_report(result, str(output_file))
+
+    report = output_file.read_text(encoding='utf-8')
+    assert "ニュース2" in report
+    assert "2位: ニュース1" in report
+
+
+def test_streaming_top_k_selection_with_tie_breaks():
+    def articles():
+        # 同点（キーワードなし）の記事: X の投稿よりフィードの記事、同じ種類なら新しい記事、さらに同じなら先の記事を優先
+        yield {"title": "old", "summary": "", "source": "TechCrunch AI", "link": "https://example.com/old",
+               "published": datetime(2026, 10, 18, tzinfo=timezone.utc)}
+        yield {"title": "post", "summary": "", "source": "X (@OpenAI)", "link": "https://x.com/1",
+               "published": datetime(2026, 10, 19, tzinfo=timezone.utc)}
+        yield {"title": "blog", "summary": "", "source": "OpenAI Blog", "link": "https://example.com/blog",
+               "published": datetime(2026, 10, 19, tzinfo=timezone.utc)}
+        yield {"title": "blog2", "summary": "", "source": "OpenAI Blog", "link": "https://example.com/blog2",
+               "published": datetime(2026, 10, 19, tzinfo=timezone.utc)}
+        yield {"title": "undated", "summary": "", "source": "OpenAI Blog", "link": "https://example.com/undated"}
+
+    analyzer = SurpriseAnalyzer(api_key=None)
+    ranked = analyzer._select_candidates(articles(), max_candidates=5)
+    assert [article['title'] for article in ranked] == ["blog", "blog2", "old", "undated", "post"]
+
+    # 上位K件のみを保持し、予備スコアは候補にだけ付与する
+    pool = list(articles())
+    pool[0]['summary'] = "surprise breakthrough"
+    top = analyzer._select_candidates(iter(pool), max_candidates=2)
+    assert [article['title'] for article in top] == ["old", "blog"]
+    assert top[0]['preliminary_score'] > top[1]['preliminary_score']
+    assert 'preliminary_score' not in pool[1]
+    assert analyzer._select_candidates(iter(pool), max_candidates=0) == []
@@ -0,0 +1,89 @@
+"""
+トレンドスパイク検出のテスト
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trend_tracker import CountMinSketch, DecayedHeavyHitters, TrendTracker, trend_bonus
+
+START = datetime(2026, 4, 1, 0, 0, tzinfo=timezone.utc)
+
+
+def _day(gemini_mentions, total=40):
+    articles = [{"title": f"Gemini update {i}", "summary": "Google ships a Gemini feature"}
+                for i in range(gemini_mentions)]
+    articles += [{"title": f"OpenAI news {i}", "summary": "ChatGPT gets a feature"}
+                 for i in range(total - gemini_mentions)]
+    return articles
+
+
+def _tracker_with_baseline(days=5):
+    tracker = TrendTracker()
+    for day in range(days):
+        tracker.observe(_day(gemini_mentions=2))
+        tracker.commit(f"2026040{day}", START + timedelta(days=day))
+        tracker.current.clear()
+        tracker.current_articles = 0
+    return tracker
+
+
+def test_count_min_sketch_never_underestimates():
+    sketch = CountMinSketch(width=64, depth=4)
+    for i in range(500):
+        sketch.add(f"term-{i % 50}")
+
+    assert all(sketch.estimate(f"term-{i}") >= 10 for i in range(50))
+
+
+def test_heavy_hitters_keep_frequent_terms_within_capacity():
+    heavy = DecayedHeavyHitters(capacity=5)
+    for i in range(200):
+        heavy.add("gemini")
+        heavy.add(f"rare-{i}")
+
+    assert len(heavy.counters) == 5
+    assert heavy.top(1)[0][0] == "gemini"
+
+
+def test_spike_is_flagged_against_baseline():
+    tracker = _tracker_with_baseline()
+    tracker.observe(_day(gemini_mentions=20))
+
+    articles = tracker.annotate([{"title": "Gemini 3 launches", "summary": ""},
+                                 {"title": "OpenAI news", "summary": "ChatGPT"}])
+
+    assert tracker.trending()[0]["term"] == "gemini"
+    assert articles[0]["trend_terms"] == ["gemini"]
+    assert trend_bonus(articles[0]) > 0
+    assert trend_bonus(articles[1]) == 0
+
+
+def test_no_spikes_until_baseline_is_warm():
+    tracker = _tracker_with_baseline(days=1)
+    tracker.observe(_day(gemini_mentions=20))
+
+    assert tracker.trending() == []
+
+
+def test_state_size_is_constant_and_commit_is_idempotent(tmp_path):
+    path = str(tmp_path / "trends.json.gz")
+    tracker = TrendTracker()
+    sizes = []
+
+    for day in range(30):
+        tracker = TrendTracker.load(path)
+        tracker.observe([{"title": f"Model{day}-{i} from Lab{i}", "summary": ""} for i in range(50)])
+        assert tracker.commit(f"day{day}", START + timedelta(days=day))
+        assert not tracker.commit(f"day{day}", START + timedelta(days=day))
+        tracker.save(path)
+        sizes.append(len(TrendTracker.load(path).heavy.counters))
+
+    reloaded = TrendTracker.load(path)
+    assert reloaded.buckets == 30
+    assert max(sizes) <= reloaded.heavy.capacity
+    assert len(reloaded.sketch.table) == reloaded.sketch.width * reloaded.sketch.depth
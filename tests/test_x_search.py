@@ -0,0 +1,158 @@
+"""
+X検索（バックエンド・ページング・日時解析）のテスト
+"""
+
+import sys
+import os
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# srcディレクトリをパスに追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from deadline import Deadline
+from x_collector import XCollector
+from x_search import FixtureSearchBackend, SearchBackend, create_backend
+
+
+def _tweets(prefix, hours_ago):
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "text": f"{prefix} news {i}",
+            "link": f"https://x.com/{prefix}/status/{i}",
+            "date": (now - timedelta(hours=hours)).isoformat(),
+            "user": {"name": prefix},
+        }
+        for i, hours in enumerate(hours_ago)
+    ]
+
+
+class RecordingBackend(FixtureSearchBackend):
+    def __init__(self, fixture, page_size):
+        super().__init__(fixture, page_size)
+        self.calls = []
+
+    def search(self, query, cursor=None, timeout=None):
+        self.calls.append((query, cursor))
+        return super().search(query, cursor, timeout)
+
+
+class SlowBackend(FixtureSearchBackend):
+    """1ページごとに delay 秒かかり、渡されたタイムアウトを記録するバックエンド"""
+
+    def __init__(self, fixture, page_size, delay):
+        super().__init__(fixture, page_size)
+        self.delay = delay
+        self.timeouts = []
+
+    def search(self, query, cursor=None, timeout=None):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        return super().search(query, cursor, timeout)
+
+
+def test_searches_each_keyword_and_paginates():
+    backend = RecordingBackend({"Claude": _tweets("claude", range(1, 8)), "Gemini": _tweets("gemini", [1, 2])},
+                               page_size=3)
+    collector = XCollector(hours_lookback=24, search_backend=backend)
+
+    articles = collector.collect_from_search(["Claude", "Gemini"], max_tweets=5)
+
+    # max_tweets は全キーワード合計の上限（キーワードあたり3件まで）
+    assert {query for query, _ in backend.calls} == {"Claude", "Gemini"}
+    assert sum(1 for a in articles if "claude" in a["link"]) == 3
+    assert sum(1 for a in articles if "gemini" in a["link"]) == 2
+    assert all(a["language"] == "en" for a in articles)
+
+
+def test_max_tweets_caps_the_total():
+    backend = FixtureSearchBackend({keyword: _tweets(keyword.lower(), range(1, 6))
+                                    for keyword in ["OpenAI", "Claude", "Gemini"]})
+    collector = XCollector(hours_lookback=24, search_backend=backend)
+
+    articles = collector.collect_from_search(["OpenAI", "Claude", "Gemini"], max_tweets=4)
+
+    assert len(articles) == 4
+    assert [a["link"].split("/")[3] for a in articles] == ["openai", "openai", "claude", "claude"]
+
+
+def test_stops_paginating_at_cutoff():
+    # 新しい順に 1, 2, 30, 31, ... 時間前（3件目以降は取得対象外）
+    backend = RecordingBackend({"LLM": _tweets("llm", [1, 2, 30, 31, 32, 33, 34, 35])}, page_size=3)
+    collector = XCollector(hours_lookback=24, search_backend=backend)
+
+    articles = collector.collect_from_search(["LLM"], max_tweets=50)
+
+    assert [a["link"] for a in articles] == ["https://x.com/llm/status/0", "https://x.com/llm/status/1"]
+    assert len(backend.calls) == 1
+
+
+def test_search_timeout_is_capped_by_deadline():
+    backend = SlowBackend({"AI": _tweets("ai", [1] * 10)}, page_size=1, delay=0.2)
+    collector = XCollector(hours_lookback=24, search_backend=backend, search_timeout=10)
+
+    articles = collector.collect_from_search(["AI"], deadline=Deadline(0.5))
+
+    # 各ページのタイムアウトは既定値ではなく期限の残り時間以下になり、期限切れ後は次のページを取得しない
+    assert all(timeout <= 0.5 for timeout in backend.timeouts)
+    assert backend.timeouts == sorted(backend.timeouts, reverse=True)
+    assert 1 <= len(articles) == len(backend.timeouts) < 10
+
+
+def test_skipped_sources_reset_per_call():
+    class FailingBackend(FixtureSearchBackend):
+        def search(self, query, cursor=None, timeout=None):
+            raise IOError("instance down")
+
+    collector = XCollector(search_backend=FailingBackend({}))
+
+    collector.collect_from_search(["AI"])
+    collector.collect_from_search(["AI"])
+    assert collector.skipped_sources == [{"source": "X search: AI", "reason": "error"}]
+
+    expired = Deadline(0)
+    accounts = [{"id": "x-openai", "account": "OpenAI"}]
+    collector.fetch_rsshub_raw(accounts, deadline=expired)
+    collector.fetch_rsshub_raw(accounts, deadline=expired)
+    assert collector.skipped_sources == [{"source": "X (@OpenAI)", "reason": "deadline"}]
+
+
+def test_duplicate_tweets_across_keywords_are_merged():
+    tweets = _tweets("openai", [1])
+    collector = XCollector(search_backend=FixtureSearchBackend({"OpenAI": tweets, "GPT-5": tweets}))
+
+    assert len(collector.collect_from_search(["OpenAI", "GPT-5"])) == 1
+
+
+def test_backend_must_implement_search():
+    class IncompleteBackend(SearchBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+def test_parse_tweet_date_formats():
+    collector = XCollector(timezone="Asia/Tokyo", search_backend=FixtureSearchBackend({}))
+    expected = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    for text in ["Jan 1, 2025 · 12:00 PM UTC", "2025-01-01T12:00:00Z", "2025-01-01T21:00:00+09:00",
+                 "Wed, 01 Jan 2025 12:00:00 GMT"]:
+        assert collector._parse_tweet_date(text) == expected, text
+
+    assert collector._parse_tweet_date("yesterday") is None
+    assert collector._parse_tweet_date("") is None
+
+
+def test_create_backend_from_fixture_file(tmp_path, monkeypatch):
+    path = tmp_path / "tweets.json"
+    path.write_text(json.dumps({"AI": _tweets("ai", [1])}))
+    monkeypatch.setenv("X_SEARCH_FIXTURE", str(path))
+
+    collector = XCollector(search_backend=create_backend())
+
+    assert len(collector.collect_from_search(["AI"])) == 1